@@ -15,14 +15,64 @@ def get_args():
 
     parser = argparse.ArgumentParser()
 
-    parser.add_argument('source', default=None, nargs='?', help='RSS feed URL')
+    parser.add_argument('source', default=[], nargs='*', help='RSS feed URL(s)')
+    parser.add_argument('--feed-list', help='Read additional RSS feed URLs from this file, one per line.')
+    parser.add_argument('--workers', type=int, default=16, help='Maximum amount of feeds fetched at once.')
+    parser.add_argument('--per-host', type=int, default=4,
+                        help='Maximum amount of simultaneous connections to a single host.')
+    parser.add_argument('--connect-timeout', type=float, default=5.0,
+                        help='Seconds to wait for a connection to a server.')
+    parser.add_argument('--read-timeout', type=float, default=30.0,
+                        help='Seconds to wait for a server to send data.')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Amount of retries of a request which failed with status 429 or 5xx.')
+    parser.add_argument('--parse-workers', type=int,
+                        help='Parse the feeds on this many processes and cache them in batches. '
+                             'Sources may also be paths of saved RSS files.')
     parser.add_argument('-v', '--verbose', action='store_true', help='Show all program logs to the user.')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print a table of the time spent in every stage of the program and of its counters.')
+    parser.add_argument('--metrics', help='Write the timers and counters of the program to this file, '
+                                          'in JSON format if its name ends with .json and in Prometheus text '
+                                          'format otherwise.')
     parser.add_argument('-j', '--json', action='store_true', help='Print the result of the program in JSON format.')
+    parser.add_argument('--jsonl', action='store_true',
+                        help='Print the result of the program in JSON Lines format, one item per line.')
+    parser.add_argument('-o', '--output', help='Write the result of the program to this file instead of the console.')
     parser.add_argument('-d', '--date', help='Get cached news by this date.')
+    parser.add_argument('--from', dest='date_from', help='Get cached news published on this date or later.')
+    parser.add_argument('--to', dest='date_to', help='Get cached news published on this date or earlier.')
+    parser.add_argument('--search', help='Search cached news by the words of their titles and descriptions, '
+                                         'may be combined with the date filters, a source and --limit.')
     parser.add_argument('-V', '--version', action='store_true',
                         help='Will output current version of the program and exit.')
     parser.add_argument('-l', '--limit', help='Specify the amount of articles shown.')
+    parser.add_argument('--stream', action='store_true',
+                        help='Parse items while the feed is downloaded and stop reading once the limit is reached.')
+    parser.add_argument('--engine', choices=['bs4', 'lxml'], default='bs4',
+                        help='Engine used to extract the fields of the items.')
+    parser.add_argument('--cache-backend', choices=['sqlite', 'pickle'], default='sqlite',
+                        help='Storage used to cache the fetched news.')
+    parser.add_argument('--cache-gc', action='store_true',
+                        help='Remove the cached news and images beyond the retention limits, compact the cache '
+                             'and report the reclaimed space.')
+    parser.add_argument('--max-age', type=int, help='Days for which cached news are kept after their publication.')
+    parser.add_argument('--max-items', type=int, help='Amount of the latest news kept in the cache for every feed.')
+    parser.add_argument('--image-budget', type=float,
+                        help='Megabytes of cached images, the least recently used images are removed above it.')
+    parser.add_argument('--gc-on-write', action='store_true',
+                        help='Enforce the retention limits every time news are cached.')
+    parser.add_argument('--image-workers', type=int, default=8, help='Maximum amount of images downloaded at once.')
+    parser.add_argument('--background-images', action='store_true',
+                        help='Download images of the news while the results are shown.')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Keep polling the given feeds and caching their new items until interrupted.')
+    parser.add_argument('--poll-interval', type=float, default=900,
+                        help='Initial interval between two polls of a feed in daemon mode, in seconds.')
     parser.add_argument('--to-pdf', help='Convert the results to PDF and save to given path.')
     parser.add_argument('--to-html', help='Convert the results to HTML and save to given path.')
+    parser.add_argument('--pdf-chunk-size', type=int, default=200,
+                        help='Amount of news converted to PDF at once, it bounds the memory of the conversion.')
+    parser.add_argument('--pdf-workers', type=int, help='Amount of processes converting PDF chunks at once.')
 
     return parser.parse_args()
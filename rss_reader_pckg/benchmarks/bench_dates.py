@@ -0,0 +1,65 @@
+"""
+This module benchmarks the date normalization against parsing every date with dateutil.
+
+Run it with: python -m rss_reader_pckg.benchmarks.bench_dates [--dates DATES] [--distinct DISTINCT]
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from dateutil import parser
+
+from rss_reader_pckg.rss.dates import format_date, parse_date
+
+
+def sample_dates(count: int, distinct: int) -> list[str]:
+    """
+    This function creates publish dates in the formats found in feeds, repeating like they do across items and runs.
+    :param count: The amount of dates.
+    :param distinct: The amount of different dates among them.
+    :return: A list of date strings.
+    """
+    start = datetime(2022, 6, 1, tzinfo=timezone(timedelta(hours=3)))
+    formats = ['%a, %d %b %Y %H:%M:%S %z'] * 8 + ['%Y-%m-%dT%H:%M:%S%z', '%B %d, %Y %I:%M %p']
+    rng = random.Random(0)
+    pool = [(start + timedelta(minutes=rng.randrange(60 * 24 * 90))).strftime(rng.choice(formats))
+            for _ in range(distinct)]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def bench(function, dates: list[str]) -> float:
+    """
+    :param function: The function normalizing a single date.
+    :param dates: The dates to normalize.
+    :return: Seconds spent normalizing all dates.
+    """
+    start = time.perf_counter()
+    for date in dates:
+        function(date)
+    return time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Compare the date normalization with dateutil.')
+    arg_parser.add_argument('--dates', type=int, default=100000, help='Amount of normalized dates.')
+    arg_parser.add_argument('--distinct', type=int, default=5000, help='Amount of different dates.')
+    args = arg_parser.parse_args()
+
+    dates = sample_dates(args.dates, args.distinct)
+    dateutil_time = bench(lambda date: parser.parse(date).strftime('%Y-%m-%d %H:%M:%S'), dates)
+    distinct_dates = list(dict.fromkeys(dates))
+    parse_date.cache_clear()
+    cold_time = bench(format_date, distinct_dates)
+    parse_date.cache_clear()
+    normalized_time = bench(format_date, dates)
+    print(f'Dates: {args.dates}, distinct: {args.distinct}')
+    print(f'dateutil:             {dateutil_time * 1e6 / len(dates):.1f} us/date')
+    print(f'normalized, no memo:  {cold_time * 1e6 / len(distinct_dates):.1f} us/date')
+    print(f'normalized, memoized: {normalized_time * 1e6 / len(dates):.1f} us/date')
+    print(f'Speedup: {dateutil_time / normalized_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
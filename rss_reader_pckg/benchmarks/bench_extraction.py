@@ -0,0 +1,80 @@
+"""
+This module benchmarks the bs4 item parsing against the lxml extraction engine.
+The bundled test_rss.xml is scaled up by repeating its items.
+
+Run it with: python -m rss_reader_pckg.benchmarks.bench_extraction [--items ITEMS]
+"""
+
+import argparse
+import logging
+import os
+import time
+
+from bs4 import BeautifulSoup
+
+from rss_reader_pckg.rss.lxml_extractor import extract_item
+from rss_reader_pckg.rss.rss_parser import RSSParser
+from rss_reader_pckg.rss.stream_parser import StreamParser
+
+TEST_RSS_PATH = f'{os.path.dirname(os.path.dirname(os.path.abspath(__file__)))}/tests/test_rss.xml'
+
+
+def scaled_feed(item_count: int) -> bytes:
+    """
+    This function builds an RSS document with `item_count` items by repeating the items of test_rss.xml.
+    :param item_count: The amount of items in the document.
+    :return: The RSS document.
+    """
+    with open(TEST_RSS_PATH, 'rb') as f:
+        content = f.read()
+    start, end = content.index(b'<item>'), content.rindex(b'</item>') + len(b'</item>')
+    items = content[start:end].split(b'</item>')[:-1]
+    items = [item + b'</item>' for item in items]
+    scaled_items = b''.join(items[index % len(items)] for index in range(item_count))
+    return content[:start] + scaled_items + content[end:]
+
+
+def bench_bs4(content: bytes) -> float:
+    """
+    :param content: An RSS document.
+    :return: Seconds spent parsing all items of the document with bs4.
+    """
+    start = time.perf_counter()
+    rss_parser = RSSParser.__new__(RSSParser)
+    rss_parser.soup = BeautifulSoup(content, features='xml')
+    items = [rss_parser._parse_item(item) for item in rss_parser.soup.find_all('item')]
+    elapsed = time.perf_counter() - start
+    assert items
+    return elapsed
+
+
+def bench_lxml(content: bytes) -> float:
+    """
+    :param content: An RSS document.
+    :return: Seconds spent parsing all items of the document with the lxml engine.
+    """
+    start = time.perf_counter()
+    items = [extract_item(element) for element in StreamParser().iter_items([content])]
+    elapsed = time.perf_counter() - start
+    assert items
+    return elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Compare the bs4 and lxml item extraction engines.')
+    arg_parser.add_argument('--items', type=int, default=5000, help='Amount of items in the benchmarked feed.')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Amount of runs, the fastest one is reported.')
+    args = arg_parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    content = scaled_feed(args.items)
+    bs4_time = min(bench_bs4(content) for _ in range(args.repeat))
+    lxml_time = min(bench_lxml(content) for _ in range(args.repeat))
+    print(f'Items: {args.items}, feed size: {len(content) / 1024 / 1024:.1f} MB')
+    print(f'bs4:  {bs4_time:.3f}s ({args.items / bs4_time:.0f} items/s)')
+    print(f'lxml: {lxml_time:.3f}s ({args.items / lxml_time:.0f} items/s)')
+    print(f'Speedup: {bs4_time / lxml_time:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
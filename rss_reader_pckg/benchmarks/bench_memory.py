@@ -0,0 +1,79 @@
+"""
+This module measures the memory used by cached items, comparing the slotted Item
+with the previous dataclass Item which kept every value in its own Element.
+
+Run it with: python -m rss_reader_pckg.benchmarks.bench_memory [--items ITEMS]
+"""
+
+import argparse
+import logging
+import pickle
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from rss_reader_pckg.benchmarks.bench_extraction import scaled_feed
+from rss_reader_pckg.rss.lxml_extractor import extract_item
+from rss_reader_pckg.rss.rss_classes import Element, ElementCollection, ElementType, Item
+from rss_reader_pckg.rss.stream_parser import StreamParser
+
+
+@dataclass
+class LegacyItem:
+    """
+    The Item as it was before the slots were introduced.
+    """
+    title: Element
+    date: Element
+    link: Element
+    description: Element
+    media_links: ElementCollection
+    image_links: ElementCollection
+    timestamp: Optional[float] = None
+
+
+def legacy_item(record: tuple) -> LegacyItem:
+    """
+    :param record: A record of an Item.
+    :return: The LegacyItem with the values of the record.
+    """
+    title, date, link, description, media, images, timestamp = record
+    return LegacyItem(Element(ElementType.TITLE, title), Element(ElementType.PUB_DATE, date),
+                      Element(ElementType.LINK, link), Element(ElementType.DESCRIPTION, description),
+                      ElementCollection(ElementType.MEDIA, [Element(ElementType.MEDIA, url) for url in media]),
+                      ElementCollection(ElementType.IMAGE, [Element(ElementType.IMAGE, url) for url in images]),
+                      timestamp)
+
+
+def measure(factory: Callable[[tuple], object], records: list[tuple]) -> tuple[float, float]:
+    """
+    :param factory: The function creating an item from a record.
+    :param records: The records of the items.
+    :return: Bytes of memory and bytes of pickle used per item, without the strings shared by both models.
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    items = [factory(record) for record in records]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    memory = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    pickled = len(pickle.dumps(items, protocol=pickle.HIGHEST_PROTOCOL))
+    return memory / len(records), pickled / len(records)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Compare the memory used by the legacy and slotted items.')
+    arg_parser.add_argument('--items', type=int, default=20000, help='Amount of measured items.')
+    args = arg_parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    records = [extract_item(element).to_record() for element in StreamParser().iter_items([scaled_feed(args.items)])]
+    legacy_memory, legacy_pickle = measure(legacy_item, records)
+    slotted_memory, slotted_pickle = measure(Item.from_record, records)
+    print(f'Items: {len(records)}')
+    print(f'legacy:  {legacy_memory:.0f} bytes/item in memory, {legacy_pickle:.0f} bytes/item pickled')
+    print(f'slotted: {slotted_memory:.0f} bytes/item in memory, {slotted_pickle:.0f} bytes/item pickled')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+This module benchmarks the throughput of the ingestion pipeline with a growing amount of parsing processes.
+A local corpus of saved feed files is built from test_rss.xml, so the results do not depend on the network.
+
+Run it with: python -m rss_reader_pckg.benchmarks.bench_pipeline [--feeds FEEDS] [--items ITEMS]
+                                                                 [--workers 1 2 4] [--engine {bs4,lxml}]
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+
+from rss_reader_pckg.benchmarks.bench_extraction import scaled_feed
+from rss_reader_pckg.rss.pipeline import IngestPipeline, IngestStats
+from rss_reader_pckg.rss.rss_cache import CacheReader
+
+
+def write_corpus(directory: str, feed_count: int, item_count: int) -> list[str]:
+    """
+    This function saves feed files with distinct titles and item titles into a directory.
+    :param directory: The directory of the corpus.
+    :param feed_count: The amount of feed files.
+    :param item_count: The amount of items in every feed.
+    :return: Paths of the feed files.
+    """
+    content = scaled_feed(item_count)
+    paths = []
+    for index in range(feed_count):
+        path = os.path.join(directory, f'feed_{index}.xml')
+        with open(path, 'wb') as f:
+            f.write(content.replace(b'<title>', f'<title>{index} '.encode()))
+        paths.append(path)
+    return paths
+
+
+def bench(paths: list[str], workers: int, engine: str, directory: str) -> IngestStats:
+    """
+    :param paths: Paths of the feed files.
+    :param workers: The amount of parsing processes.
+    :param engine: The extraction engine.
+    :param directory: The directory holding the cache of the run.
+    :return: The totals of ingesting all feed files into an empty cache.
+    """
+    rss_cache = CacheReader(cache_dir=os.path.join(directory, f'cache_{workers}'))
+    rss_cache.download_images = lambda items: None
+    _, stats = IngestPipeline(rss_cache, parse_workers=workers, engine=engine).run(paths)
+    return stats
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Measure the pipeline throughput by the amount of processes.')
+    arg_parser.add_argument('--feeds', type=int, default=32, help='Amount of feed files in the corpus.')
+    arg_parser.add_argument('--items', type=int, default=500, help='Amount of items in every feed file.')
+    arg_parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Amounts of processes.')
+    arg_parser.add_argument('--engine', choices=['bs4', 'lxml'], default='bs4', help='Extraction engine.')
+    args = arg_parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_corpus(directory, args.feeds, args.items)
+        print(f'Feeds: {args.feeds}, items per feed: {args.items}, engine: {args.engine}, CPUs: {os.cpu_count()}')
+        baseline = None
+        for workers in args.workers:
+            stats = bench(paths, workers, args.engine, directory)
+            baseline = baseline or stats.items_per_second
+            print(f'{workers:>3} process(es): {stats.seconds:7.2f}s, {stats.items_per_second:9.0f} items/s, '
+                  f'{stats.items_per_second / baseline:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+This module measures `--search` on a large SQLite cache: the time of caching the items together with their
+full-text index, and the time of queries of common, rare and prefix words, with and without filters.
+
+Run it with: python -m rss_reader_pckg.benchmarks.bench_search [--items ITEMS] [--batch BATCH]
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+from rss_reader_pckg.benchmarks.corpus import START_DATE, WORDS
+from rss_reader_pckg.rss.cache_backends import SQLiteCacheBackend
+from rss_reader_pckg.rss.rss_classes import Feed, Item
+
+FEED_URL = 'http://localhost/feed.xml'
+RARE_WORDS = ('lynx', 'blizzard', 'roundabout', 'hydrogen')
+QUERIES = (('common word', 'driver', None, None, None),
+           ('two words', 'electric winter', None, None, None),
+           ('rare word', 'lynx', None, None, None),
+           ('prefix', 'hydro*', None, None, None),
+           ('common, one day', 'driver', '20220626', '20220626', None),
+           ('common, feed', 'driver', None, None, FEED_URL))
+
+
+def generate_items(start: int, count: int, rng: random.Random) -> list[Item]:
+    """
+    :param start: The number of the first item.
+    :param count: The amount of items.
+    :param rng: The random generator of the corpus.
+    :return: Items with random titles and descriptions, one in a thousand of them mentioning a rare word.
+    """
+    items = []
+    for index in range(start, start + count):
+        words = [rng.choice(WORDS) for _ in range(40)]
+        if index % 1000 == 0:
+            words[rng.randrange(len(words))] = rng.choice(RARE_WORDS)
+        date = (START_DATE - timedelta(minutes=index)).isoformat()
+        items.append(Item(f'News {index}: {" ".join(words[:6])}', date, f'http://localhost/news/{index}',
+                          ' '.join(words[6:]), (), ()))
+    return items
+
+
+def fill(backend: SQLiteCacheBackend, items: int, batch: int) -> float:
+    """
+    This function caches the items in batches, like consecutive runs of the reader would.
+    :param backend: An empty cache.
+    :param items: The amount of cached items.
+    :param batch: The amount of items cached at once.
+    :return: The amount of items cached per second.
+    """
+    rng = random.Random(0)
+    elapsed = 0.0
+    for start in range(0, items, batch):
+        feed = Feed('Synthetic feed', FEED_URL, generate_items(start, min(batch, items - start), rng))
+        begin = time.perf_counter()
+        backend.append(feed)
+        elapsed += time.perf_counter() - begin
+    return items / elapsed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Measure full-text search on a large cache.')
+    arg_parser.add_argument('--items', type=int, default=100000, help='Amount of cached items.')
+    arg_parser.add_argument('--batch', type=int, default=10000, help='Amount of items cached at once.')
+    arg_parser.add_argument('--limit', type=int, default=20, help='Limit of the results of every query.')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='Runs of every query.')
+    args = arg_parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as directory:
+        backend = SQLiteCacheBackend(os.path.join(directory, SQLiteCacheBackend.default_file))
+        rate = fill(backend, args.items, args.batch)
+        size = os.path.getsize(backend.path)
+        print(f'Items: {args.items}, cached at {rate:.0f} items/s, database of {size / 1024 / 1024:.1f} MiB')
+        print(f'{"query":<18}{"results":>9}{"median ms":>12}')
+        for name, query, start, end, url in QUERIES:
+            durations = []
+            for _ in range(args.repeat):
+                begin = time.perf_counter()
+                results = backend.search(query, start, end, url, args.limit)
+                durations.append(time.perf_counter() - begin)
+            print(f'{name:<18}{len(results):>9}{statistics.median(durations) * 1000:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+This module times every stage of turning a feed into reports: `request_soup`, `items`, the parsing of
+`parse_items`, `cache_results`, `fetch_by_filters`, `to_json`, `html_feed` and `pdf_feed`.
+A synthetic feed of the requested shape is served with its images by a local HTTP server, so the results
+do not depend on the network. Results are written as JSON, and a previous result can be given to report
+the stages which became slower.
+
+Run it with: python -m rss_reader_pckg.benchmarks.bench_stages [--items ITEMS] [--format {rss,atom}]
+                                                               [--output results.json] [--compare old.json]
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+from rss_reader_pckg.benchmarks.corpus import DATE_STYLES, FORMATS, CorpusShape, generate_feed, image_paths
+from rss_reader_pckg.rss.dates import day_key
+from rss_reader_pckg.rss.fetcher import FeedFetcher
+from rss_reader_pckg.rss.html_converter import html_feed
+from rss_reader_pckg.rss.pdf_converter import pdf_feed_chunks
+from rss_reader_pckg.rss.rss_cache import CacheReader
+from rss_reader_pckg.rss.rss_classes import Feed
+from rss_reader_pckg.rss.rss_parser import RSSParser
+from rss_reader_pckg.rss.transport import Transport
+from rss_reader_pckg.tests.local_server import LocalFeedServer
+
+STAGES = ('request_soup', 'items', 'parse_items', 'cache_results', 'fetch_by_filters', 'to_json', 'html_feed',
+          'pdf_feed')
+PNG = bytes.fromhex('89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c4890000000b49444154789c63f80f'
+                    '040009fb03fdfb5e6b2b0000000049454e44ae426082')
+
+
+def timed(timings: dict[str, list[float]], stage: str, function: Callable):
+    """
+    This function calls a stage and records its duration.
+    :param timings: Durations of the stages in seconds, by stage.
+    :param stage: The name of the stage.
+    :param function: The stage.
+    :return: The result of the stage.
+    """
+    start = time.perf_counter()
+    result = function()
+    timings.setdefault(stage, []).append(time.perf_counter() - start)
+    return result
+
+
+def run_stages(url: str, directory: str, pdf_items: int, timings: dict[str, list[float]]) -> int:
+    """
+    This function runs all stages once against an empty cache.
+    `parse_items` is timed without the caching done by `RSSParser.parse_items`, which is timed as `cache_results`.
+    :param url: The url of the feed.
+    :param directory: The directory of the cache of the run.
+    :param pdf_items: The amount of items converted to PDF.
+    :param timings: Durations of the stages in seconds, by stage.
+    :return: The amount of parsed items.
+    """
+    rss_cache = CacheReader(cache_dir=directory)
+    rss_parser = RSSParser(rss_cache, FeedFetcher(transport=Transport()))
+    timed(timings, 'request_soup', lambda: rss_parser.request_soup(url, conditional=False))
+    items = timed(timings, 'items', rss_parser.items)
+    rss_parser.parsed_items = timed(timings, 'parse_items', lambda: [rss_parser._parse_item(item) for item in items])
+    feed = rss_parser.feed
+    timed(timings, 'cache_results', lambda: rss_cache.cache_results(feed))
+    day = day_key(feed.items[0].date_text) if feed.items else '20220626'
+    timed(timings, 'fetch_by_filters', lambda: rss_cache.fetch_by_filters(day, None))
+    timed(timings, 'to_json', feed.to_json)
+    timed(timings, 'html_feed', lambda: html_feed(feed, is_cache=True, image_store=rss_cache.image_store))
+    pdf_feed = Feed(feed.title, feed.url, feed.items[:pdf_items])
+    timed(timings, 'pdf_feed', lambda: pdf_feed_chunks(pdf_feed, io.BytesIO(), rss_cache.image_store, workers=1))
+    return len(feed.items)
+
+
+def git_commit() -> Optional[str]:
+    """
+    :return: The commit of the benchmarked code, or None if it is not a git checkout.
+    """
+    try:
+        process = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                 cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return process.stdout.strip() or None
+
+
+def bench(shape: CorpusShape, repeat: int, pdf_items: int) -> dict:
+    """
+    This function serves a synthetic feed and runs all stages `repeat` times.
+    :param shape: The shape of the feed.
+    :param repeat: The amount of runs.
+    :param pdf_items: The amount of items converted to PDF.
+    :return: The results, with the durations of every run and their minimum and median by stage.
+    """
+    timings: dict[str, list[float]] = {}
+    with LocalFeedServer({}) as server, tempfile.TemporaryDirectory() as directory:
+        server.routes['/feed.xml'] = generate_feed(shape, server.base_url)
+        for path in image_paths(shape):
+            server.routes[path] = PNG
+        for run in range(repeat):
+            item_count = run_stages(server.url('/feed.xml'), os.path.join(directory, f'cache_{run}'), pdf_items,
+                                    timings)
+    stages = {}
+    for stage in STAGES:
+        median = statistics.median(timings[stage])
+        stages[stage] = {'runs': timings[stage], 'min': min(timings[stage]), 'median': median,
+                         'items_per_second': item_count / median if median else None}
+    return {'commit': git_commit(), 'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'shape': shape.to_dict(), 'items': item_count, 'pdf_items': min(pdf_items, item_count),
+            'stages': stages}
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    :param results: The results of this run.
+    :param baseline: The results of a previous run.
+    :param threshold: The ratio of the fastest durations above which a stage counts as slower.
+    :return: The stages which became slower.
+    """
+    if baseline.get('shape') != results['shape']:
+        print('Warning: the baseline was measured on a feed of a different shape.')
+    regressions = []
+    print(f'{"stage":<18}{"baseline ms":>13}{"current ms":>12}{"ratio":>8}')
+    for stage, result in results['stages'].items():
+        if stage not in baseline.get('stages', {}):
+            continue
+        old, new = baseline['stages'][stage]['min'], result['min']
+        ratio = new / old if old else float('inf')
+        is_slower = ratio > threshold
+        regressions += [stage] if is_slower else []
+        print(f'{stage:<18}{old * 1000:>13.1f}{new * 1000:>12.1f}{ratio:>8.2f}{"  slower" if is_slower else ""}')
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Time every stage of the reader on a synthetic feed.')
+    arg_parser.add_argument('--items', type=int, default=1000, help='Amount of items in the feed.')
+    arg_parser.add_argument('--format', choices=FORMATS, default='rss', help='Format of the feed.')
+    arg_parser.add_argument('--media', type=int, default=3, help='Amount of media links per item.')
+    arg_parser.add_argument('--images', type=int, default=1, help='Amount of images per item.')
+    arg_parser.add_argument('--image-pool', type=int, default=50, help='Amount of distinct images in the feed.')
+    arg_parser.add_argument('--words', type=int, default=80, help='Amount of words per description.')
+    arg_parser.add_argument('--dates', choices=DATE_STYLES, default='mixed', help='Style of the item dates.')
+    arg_parser.add_argument('--seed', type=int, default=0, help='Seed of the feed generator.')
+    arg_parser.add_argument('--pdf-items', type=int, default=100, help='Amount of items converted to PDF.')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs of every stage.')
+    arg_parser.add_argument('-o', '--output', help='Write the results to this JSON file.')
+    arg_parser.add_argument('--compare', help='Compare the results with a previous JSON file.')
+    arg_parser.add_argument('--threshold', type=float, default=1.2,
+                            help='Ratio of durations above which a stage counts as slower.')
+    args = arg_parser.parse_args()
+    logging.disable(logging.ERROR)
+
+    shape = CorpusShape(args.items, args.format, args.media, args.images, args.image_pool, args.words, args.dates,
+                        args.seed)
+    results = bench(shape, args.repeat, args.pdf_items)
+    print(f'Items: {results["items"]} of {args.items}, format: {args.format}, runs: {args.repeat}, '
+          f'commit: {(results["commit"] or "unknown")[:10]}')
+    print(f'{"stage":<18}{"min ms":>10}{"median ms":>12}{"items/s":>12}')
+    for stage, result in results['stages'].items():
+        rate = f'{result["items_per_second"]:.0f}' if result['items_per_second'] else '-'
+        print(f'{stage:<18}{result["min"] * 1000:>10.1f}{result["median"] * 1000:>12.1f}{rate:>12}')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
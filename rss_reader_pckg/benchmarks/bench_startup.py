@@ -0,0 +1,121 @@
+"""
+This module benchmarks the cold start of the CLI with `python -X importtime`.
+Every command is run in a fresh interpreter against a local copy of `test_rss.xml`. The time spent importing
+modules, apart from the ones every interpreter imports at startup, is compared with the budget of the command,
+and heavy modules the command should never load are reported.
+The exit status is 1 if any command goes over its budget or loads a module it should not.
+
+Run it with: python -m rss_reader_pckg.benchmarks.bench_startup [--repeat REPEAT] [--budget-scale SCALE]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import NamedTuple
+
+from rss_reader_pckg.tests.local_server import LocalFeedServer
+
+TEST_RSS_PATH = f'{os.path.dirname(os.path.dirname(os.path.abspath(__file__)))}/tests/test_rss.xml'
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+FEED_URL = '{base_url}/feed.xml'
+HEAVY_MODULES = ('bs4', 'lxml', 'requests', 'airium', 'xhtml2pdf')
+
+
+class Command(NamedTuple):
+    """
+    A command of the benchmark with its arguments, the modules it must not import and its budget.
+    """
+    name: str
+    args: tuple[str, ...]
+    forbidden: tuple[str, ...]
+    budget_ms: float
+
+
+COMMANDS = (
+    Command('--version', ('-V',), HEAVY_MODULES, 80),
+    Command('-d', ('-d', '20220626'), ('requests', 'airium', 'xhtml2pdf'), 200),
+    Command('fetch', (FEED_URL,), ('airium', 'xhtml2pdf'), 350),
+    Command('--to-html', (FEED_URL, '--to-html', './'), ('xhtml2pdf',), 450),
+    Command('--to-pdf', (FEED_URL, '--to-pdf', './'), (), 1500),
+)
+
+
+def import_times(report: str) -> dict[str, int]:
+    """
+    This function reads the report of `python -X importtime`.
+    :param report: The standard error of the interpreter.
+    :return: The cumulative import time in microseconds of every top level import, by module name.
+    """
+    times = {}
+    for line in report.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name[1:].startswith(' '):
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def interpreter_imports() -> set[str]:
+    """
+    :return: The names of the modules every interpreter imports at startup, before running any code.
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'pass'], capture_output=True, text=True)
+    return set(import_times(process.stderr))
+
+
+def run_command(command: Command, base_url: str, directory: str,
+                startup_modules: set[str]) -> tuple[float, float, set[str]]:
+    """
+    This function runs a command of the CLI in a fresh interpreter.
+    :param command: The command to run.
+    :param base_url: The address of the local feed server.
+    :param directory: The working directory, holding the cache of the run.
+    :param startup_modules: The modules imported by every interpreter, which are not counted.
+    :return: The import time and the wall time in milliseconds, and the names of all imported modules.
+    """
+    args = [arg.format(base_url=base_url) for arg in command.args]
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT)
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'rss_reader_pckg.rss_reader', *args],
+                             cwd=directory, env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    modules = {line.split('|')[2].strip() for line in process.stderr.splitlines()
+               if line.startswith('import time:') and 'cumulative' not in line}
+    times = import_times(process.stderr)
+    import_ms = sum(us for module, us in times.items() if module not in startup_modules) / 1000
+    return import_ms, wall_ms, modules
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description='Measure the cold start of the CLI commands.')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs of every command, the fastest one counts.')
+    arg_parser.add_argument('--budget-scale', type=float, default=1.0,
+                            help='Multiplier of all budgets, e.g. 2 on a slow machine.')
+    args = arg_parser.parse_args()
+
+    with open(TEST_RSS_PATH, 'rb') as f:
+        rss = f.read()
+    with LocalFeedServer({}) as server, tempfile.TemporaryDirectory() as directory:
+        server.routes['/feed.xml'] = rss.replace(b'https://content.onliner.by', server.base_url.encode())
+        startup_modules = interpreter_imports()
+        run_command(COMMANDS[2], server.base_url, directory, startup_modules)
+        failures = 0
+        print(f'{"command":<12}{"imports ms":>12}{"wall ms":>10}{"budget ms":>11}  result')
+        for command in COMMANDS:
+            runs = [run_command(command, server.base_url, directory, startup_modules) for _ in range(args.repeat)]
+            import_ms, wall_ms = min(run[0] for run in runs), min(run[1] for run in runs)
+            budget_ms = command.budget_ms * args.budget_scale
+            loaded = sorted(module for module in command.forbidden if module in runs[0][2])
+            problems = (['over budget'] if import_ms > budget_ms else []) + [f'loads {module}' for module in loaded]
+            failures += bool(problems)
+            print(f'{command.name:<12}{import_ms:>12.1f}{wall_ms:>10.1f}{budget_ms:>11.0f}  '
+                  f'{", ".join(problems) or "ok"}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+This module generates synthetic RSS 2.0 and Atom feeds for the benchmarks.
+The shape of a feed is configurable: the amount of items, of media links and images per item,
+the length of the descriptions and the style of the dates. Generation is seeded, so a shape always
+produces the same document and results of different commits stay comparable.
+"""
+
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from html import escape
+
+FORMATS = ('rss', 'atom')
+DATE_STYLES = ('rfc822', 'iso', 'odd', 'mixed')
+WORDS = ('road', 'car', 'driver', 'engine', 'minsk', 'traffic', 'electric', 'winter', 'tires', 'police',
+         'fuel', 'price', 'bus', 'route', 'bridge', 'repair', 'accident', 'license', 'parking', 'speed')
+ODD_DATE_FORMATS = ('%a, %d %b %Y %H:%M GMT', '%d %b %Y %H:%M:%S %z', '%A, %B %d, %Y %I:%M %p',
+                    '%Y/%m/%d %H:%M:%S', '%a %b %d %H:%M:%S %Y')
+START_DATE = datetime(2022, 6, 26, 12, 0, tzinfo=timezone(timedelta(hours=3)))
+
+
+@dataclass
+class CorpusShape:
+    """
+    A class to represent the shape of a synthetic feed.
+    """
+    items: int = 1000
+    feed_format: str = 'rss'
+    media_per_item: int = 3
+    images_per_item: int = 1
+    image_pool: int = 50
+    description_words: int = 80
+    date_style: str = 'mixed'
+    seed: int = 0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def format_date(date: datetime, style: str, rng: random.Random) -> str:
+    """
+    :param date: The publish date of an item.
+    :param style: One of DATE_STYLES, `mixed` picks any style for every item.
+    :param rng: The random generator of the feed.
+    :return: The date written in the given style.
+    """
+    if style == 'mixed':
+        style = rng.choice(DATE_STYLES[:-1])
+    if style == 'rfc822':
+        return date.strftime('%a, %d %b %Y %H:%M:%S %z')
+    if style == 'iso':
+        return date.isoformat()
+    return date.strftime(rng.choice(ODD_DATE_FORMATS))
+
+
+def description(rng: random.Random, words: int, links: list[str], images: list[str]) -> str:
+    """
+    :param rng: The random generator of the feed.
+    :param words: The amount of words of the description.
+    :param links: Urls linked from the description.
+    :param images: Urls of the images shown in the description.
+    :return: The HTML of the description.
+    """
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    anchors = ''.join(f' <a href="{escape(link)}">more</a>' for link in links)
+    pictures = ''.join(f'<img src="{escape(image)}" alt="" />' for image in images)
+    return f'<p>{pictures}</p><p>{escape(text)} &mdash; {anchors}</p>'
+
+
+def image_paths(shape: CorpusShape) -> list[str]:
+    """
+    :param shape: The shape of the feed.
+    :return: The paths of all images the feed links to, to be served by a local server.
+    """
+    return [f'/images/{index}.png' for index in range(shape.image_pool)]
+
+
+def generate_feed(shape: CorpusShape, base_url: str = 'http://localhost') -> bytes:
+    """
+    This function generates a feed document of the given shape.
+    :param shape: The shape of the feed.
+    :param base_url: The address which serves the images and the articles of the feed.
+    :return: The feed document.
+    """
+    if shape.feed_format not in FORMATS or shape.date_style not in DATE_STYLES:
+        raise ValueError(f'Format must be one of {FORMATS} and date style one of {DATE_STYLES}.')
+    rng = random.Random(shape.seed)
+    images = [f'{base_url}{path}' for path in image_paths(shape)]
+    entries = []
+    for index in range(shape.items):
+        link = f'{base_url}/news/{index}'
+        media = [f'{base_url}/media/{index}/{position}' for position in range(shape.media_per_item)]
+        item_images = rng.sample(images, min(shape.images_per_item, len(images)))
+        date = format_date(START_DATE - timedelta(minutes=37 * index), shape.date_style, rng)
+        title = escape(f'News {index}: ' + ' '.join(rng.choice(WORDS) for _ in range(6)))
+        body = escape(description(rng, shape.description_words, media, item_images[1:]))
+        thumbnail = f'<media:thumbnail url="{escape(item_images[0])}"/>' if item_images else ''
+        if shape.feed_format == 'rss':
+            entries.append(f'<item><title>{title}</title><link>{link}</link><guid>{link}</guid>'
+                           f'<pubDate>{date}</pubDate><description>{body}</description>{thumbnail}</item>')
+        else:
+            entries.append(f'<entry><title>{title}</title><link href="{link}"/><id>{link}</id>'
+                           f'<updated>{date}</updated><summary type="html">{body}</summary>{thumbnail}</entry>')
+    media_namespace = 'xmlns:media="http://search.yahoo.com/mrss/"'
+    if shape.feed_format == 'rss':
+        document = (f'<rss version="2.0" {media_namespace}><channel><title>Synthetic feed</title>'
+                    f'<link>{base_url}</link><description>Benchmark corpus</description>'
+                    f'{"".join(entries)}</channel></rss>')
+    else:
+        document = (f'<feed xmlns="http://www.w3.org/2005/Atom" {media_namespace}><title>Synthetic feed</title>'
+                    f'<id>{base_url}/</id>{"".join(entries)}</feed>')
+    return f'<?xml version="1.0" encoding="UTF-8"?>\n{document}'.encode()
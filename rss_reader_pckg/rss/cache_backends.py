@@ -0,0 +1,783 @@
+"""
+This module contains the storage backends which are used by the CacheReader to persist RSS Feeds.
+"""
+
+import json
+import logging
+import os
+import pickle
+import re
+import sqlite3
+import struct
+import sys
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Optional
+
+from rss_reader_pckg.rss.dates import day_key
+from rss_reader_pckg.rss.rss_classes import Feed, Item
+
+
+def pub_day(item: Item) -> Optional[str]:
+    """
+    :param item: An RSS Item object.
+    :return: The publish day of the item in the format of YYYYMMDD.
+    """
+    return day_key(item.date_text) if item.date_text else None
+
+
+@dataclass
+class RSSCache:
+    """
+    A class to represent the RSS feed for caching and its methods.
+    Along with the feeds it keeps a date index, which maps every publish day in the format of YYYYMMDD
+    to the positions of the feeds in `rss_feeds` and the positions of the items published that day.
+    Feeds are found by their url through `feed_positions`, and the keys of the cached items of every feed
+    are kept in `item_keys`, so merging a fetched feed costs O(new items) whatever the size of the cache.
+    """
+    rss_feeds: list[Feed]
+    date_index: dict[str, dict[int, list[int]]] = field(default_factory=dict)
+    feed_positions: dict[str, int] = field(default_factory=dict)
+    item_keys: dict[int, set[str]] = field(default_factory=dict)
+
+    def append(self, new_feed: Feed) -> list[Item]:
+        """
+        This method appends the items of a new parsed feed which are not cached yet to an existing RSSCache object.
+        :param new_feed: A new parsed Feed object
+        :return: The items of the feed which were not cached before.
+        """
+        feed_position = self.feed_positions.get(new_feed.url)
+        if feed_position is None:
+            feed_position = len(self.rss_feeds)
+            self.rss_feeds.append(Feed(new_feed.title, new_feed.url, []))
+            self.feed_positions[new_feed.url] = feed_position
+            self.item_keys[feed_position] = set()
+        feed = self.rss_feeds[feed_position]
+        keys = self.item_keys[feed_position]
+        new_items = []
+        for item in new_feed.items:
+            key = item.key
+            if key not in keys:
+                keys.add(key)
+                new_items.append(item)
+        self._index_items(feed_position, len(feed.items), new_items)
+        feed.items += new_items
+        return new_items
+
+    def _index_items(self, feed_position: int, first_item_position: int, items: list[Item]):
+        """
+        This method adds items of a feed to the date index.
+        :param feed_position: Position of the feed in `rss_feeds`.
+        :param first_item_position: Position of the first of the items in the items of the feed.
+        :param items: RSS Items list
+        """
+        for item_position, item in enumerate(items, first_item_position):
+            day = pub_day(item)
+            if day:
+                self.date_index.setdefault(day, {}).setdefault(feed_position, []).append(item_position)
+
+    def build_date_index(self):
+        """
+        This method builds the date index from scratch, it is used for caches pickled without an index.
+        """
+        logging.info('Building the date index of the cache.')
+        self.date_index = {}
+        for feed_position, feed in enumerate(self.rss_feeds):
+            self._index_items(feed_position, 0, feed.items)
+
+    def build_key_index(self):
+        """
+        This method builds the url and item key lookups from scratch, it is used for caches pickled without them.
+        """
+        logging.info('Building the item keys of the cache.')
+        self.feed_positions = {}
+        self.item_keys = {}
+        for feed_position, feed in enumerate(self.rss_feeds):
+            self.feed_positions.setdefault(feed.url, feed_position)
+            self.item_keys[feed_position] = {item.key for item in feed.items}
+
+    def evict(self, oldest_day: Optional[str], max_items: Optional[int]) -> int:
+        """
+        This method removes the items published before a day and all but the latest items of every feed.
+        Feeds left without items are removed as well, and the indexes are built again.
+        :param oldest_day: The first day of the kept items in the format of YYYYMMDD, items without a date are kept.
+        :param max_items: The amount of the most recently published items kept of every feed.
+        :return: The amount of removed items.
+        """
+        removed = 0
+        feeds = []
+        for feed in self.rss_feeds:
+            items = feed.items
+            if oldest_day:
+                items = [item for item in items if (pub_day(item) or oldest_day) >= oldest_day]
+            if max_items is not None and len(items) > max_items:
+                latest = sorted(range(len(items)), key=lambda position: (
+                    pub_day(items[position]) or '', items[position].timestamp or float('-inf'), position))
+                kept = sorted(latest[len(items) - max_items:])
+                items = [items[position] for position in kept]
+            removed += len(feed.items) - len(items)
+            if items:
+                feeds.append(Feed(feed.title, feed.url, items))
+        if removed or len(feeds) < len(self.rss_feeds):
+            self.rss_feeds = feeds
+            self.build_date_index()
+            self.build_key_index()
+        return removed
+
+    def image_urls(self) -> set[str]:
+        """
+        :return: The urls of the images of all cached items.
+        """
+        return {url for feed in self.rss_feeds for item in feed.items for url in item.image_urls}
+
+    def fetch_by_dates(self, start: str, end: str, url: Optional[str], limit: Optional[int] = None) -> list[Item]:
+        """
+        This method fetches items published between two days through the date index.
+        :param start: The first day in the format of YYYYMMDD.
+        :param end: The last day in the format of YYYYMMDD.
+        :param url: An RSS url, if not given items of all feeds are fetched.
+        :param limit: The amount of items to fetch, if not given all items are fetched.
+        :return: A list of Item objects.
+        """
+        feed_position = self.feed_positions.get(url, -1) if url else None
+        items = []
+        for day in sorted(day for day in self.date_index if start <= day <= end):
+            for position, item_positions in self.date_index[day].items():
+                if feed_position is not None and position != feed_position:
+                    continue
+                feed_items = self.rss_feeds[position].items
+                items += [feed_items[item_position] for item_position in item_positions]
+                if limit and len(items) >= limit:
+                    return items[:limit]
+        return items
+
+
+class CacheBackend(ABC):
+    """
+    An abstract class for the storages of cached RSS Feeds.
+    """
+    name: str
+    default_file: str
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def exists(self) -> bool:
+        """
+        :return: Whether anything was cached into this storage yet.
+        """
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+    @abstractmethod
+    def append(self, feed: Feed):
+        """
+        This method stores the items of a feed which are not cached yet.
+        :param feed: A new parsed Feed object.
+        """
+
+    def append_many(self, feeds: list[Feed]):
+        """
+        This method stores the items of several feeds which are not cached yet in a single write.
+        :param feeds: New parsed Feed objects.
+        """
+        for feed in feeds:
+            self.append(feed)
+
+    def fetch_by_filters(self, date: str, url: Optional[str], limit: Optional[int] = None) -> list[Item]:
+        """
+        This method fetches news from cache by date and url.
+        If nothing was cached yet FileNotFoundError is raised.
+        :param date: A date string in the format of YYYYMMDD.
+        :param url: An RSS url, if not given items of all feeds are fetched.
+        :param limit: The amount of news to fetch, if not given all news of the day are fetched.
+        :return: A list of Item objects.
+        """
+        return self.fetch_by_dates(date, date, url, limit)
+
+    @abstractmethod
+    def fetch_by_dates(self, start: str, end: str, url: Optional[str], limit: Optional[int] = None) -> list[Item]:
+        """
+        This method fetches news from cache published between two days, both days included.
+        Storages stop reading once the limit is reached, so a limited query only decodes the news it returns.
+        If nothing was cached yet FileNotFoundError is raised.
+        :param start: The first day in the format of YYYYMMDD.
+        :param end: The last day in the format of YYYYMMDD.
+        :param url: An RSS url, if not given items of all feeds are fetched.
+        :param limit: The amount of news to fetch, the earliest published first, if not given all news are fetched.
+        :return: A list of Item objects ordered by their publish day.
+        """
+
+    @abstractmethod
+    def fetch_feed(self, url: str) -> Optional[Feed]:
+        """
+        This method fetches a whole feed from cache by its url.
+        :param url: An RSS url.
+        :return: The cached Feed object, or None if the feed was never cached.
+        """
+
+    def search(self, query: str, start: Optional[str], end: Optional[str], url: Optional[str],
+               limit: Optional[int]) -> list[Item]:
+        """
+        This method finds cached news containing all words of a query in their titles or descriptions.
+        If the storage can not be searched NotImplementedError is raised.
+        :param query: The searched words, a word ending with `*` matches every word starting with it.
+        :param start: The first day in the format of YYYYMMDD, if not given news of all days are searched.
+        :param end: The last day in the format of YYYYMMDD, if not given news of all days are searched.
+        :param url: An RSS url, if not given items of all feeds are searched.
+        :param limit: The amount of news to find, if not given all matching news are found.
+        :return: A list of Item objects, the best matches first.
+        """
+        raise NotImplementedError(f'The {self.name} cache can not be searched.')
+
+    @abstractmethod
+    def evict(self, oldest_day: Optional[str], max_items: Optional[int]) -> int:
+        """
+        This method removes the items published before a day and all but the latest items of every feed.
+        Items without a publish date are never too old, but they are the first to go when a feed has too many items.
+        :param oldest_day: The first day of the kept items in the format of YYYYMMDD, if not given no item is too old.
+        :param max_items: The amount of the most recently published items kept of every feed, if not given all.
+        :return: The amount of removed items.
+        """
+
+    @abstractmethod
+    def compact(self):
+        """
+        This method rewrites the storage without the space left by removed items.
+        """
+
+    @abstractmethod
+    def image_urls(self) -> set[str]:
+        """
+        :return: The urls of the images of all cached items.
+        """
+
+    def files(self) -> list[str]:
+        """
+        :return: Paths of all files of the storage.
+        """
+        return [self.path]
+
+
+class PickleCacheBackend(CacheBackend):
+    """
+    This backend keeps the cache as a pickled RSSCache snapshot and an append-only write-ahead log.
+    Every write appends only the new items of its feeds to the log, as length-prefixed pickled frames,
+    so writes cost O(new data). Readers load the snapshot and replay the log over it.
+    Once the log outgrows the snapshot, both are compacted into a new snapshot, which is written to a temporary
+    file and renamed over the old one, so a crash never leaves a truncated snapshot. A frame torn by a crash
+    is ignored when the log is replayed and overwritten by the next write.
+    The loaded cache is kept in memory and only read again when the files were changed by another process.
+    """
+    name = 'pickle'
+    default_file = 'rss_cache.bin'
+    FRAME_HEADER = struct.Struct('>Q')
+    COMPACT_MIN_BYTES = 1024 * 1024
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.log_path = f'{path}.wal'
+        self._loaded: Optional[RSSCache] = None
+        self._loaded_stat: Optional[tuple] = None
+        self._log_size = 0
+
+    @staticmethod
+    def _file_stat(path: str) -> Optional[tuple[int, int]]:
+        """
+        :param path: Path of a file.
+        :return: The modification time and the size of the file, or None if it does not exist.
+        """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _stat(self) -> tuple:
+        """
+        :return: The modification times and the sizes of the snapshot and the log.
+        """
+        return self._file_stat(self.path), self._file_stat(self.log_path)
+
+    def exists(self) -> bool:
+        return super().exists() or (os.path.exists(self.log_path) and os.path.getsize(self.log_path) > 0)
+
+    def _replay_log(self, cache: RSSCache) -> int:
+        """
+        This method appends the feeds stored in the log to a cache, stopping at a frame torn by a crash.
+        :param cache: The cache loaded from the snapshot.
+        :return: The size of the complete frames of the log in bytes.
+        """
+        if not os.path.exists(self.log_path):
+            return 0
+        with open(self.log_path, 'rb') as log:
+            data = log.read()
+        position = 0
+        while position + self.FRAME_HEADER.size <= len(data):
+            (frame_size,) = self.FRAME_HEADER.unpack_from(data, position)
+            frame_end = position + self.FRAME_HEADER.size + frame_size
+            if frame_end > len(data):
+                break
+            try:
+                feed = pickle.loads(data[position + self.FRAME_HEADER.size:frame_end])
+            except Exception:
+                break
+            cache.append(feed)
+            position = frame_end
+        if position < len(data):
+            logging.error(f'Ignoring {len(data) - position} byte(s) of an incomplete write in {self.log_path}.')
+        return position
+
+    @property
+    def cache(self) -> RSSCache:
+        """
+        This cache property retrieves the RSS feed data from the snapshot and the log.
+        :return: An instance of the RSSCache class.
+        """
+        logging.info('Reading cached results.')
+        if not self.exists():
+            raise FileNotFoundError
+        if self._loaded is not None and self._loaded_stat == self._stat():
+            return self._loaded
+        cache = RSSCache([])
+        if super().exists():
+            with open(self.path, 'rb') as c:
+                logging.info('Loading cached data.')
+                cache = pickle.load(c)
+            if not hasattr(cache, 'date_index'):
+                cache.build_date_index()
+            if not hasattr(cache, 'item_keys'):
+                cache.build_key_index()
+        self._log_size = self._replay_log(cache)
+        self._loaded, self._loaded_stat = cache, self._stat()
+        return cache
+
+    @cache.setter
+    def cache(self, obj: RSSCache):
+        """
+        This cache setter is used to store the RSS feed data as a new snapshot, which replaces the log.
+        :param obj:RSSCache: RSSCache object to be stored in the cache file.
+        """
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'wb') as c:
+            sys.setrecursionlimit(10000)
+            pickle.dump(obj, c, protocol=pickle.HIGHEST_PROTOCOL)
+            c.flush()
+            os.fsync(c.fileno())
+        os.replace(tmp_path, self.path)
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        logging.info('Finished caching data.')
+        self._loaded, self._loaded_stat, self._log_size = obj, self._stat(), 0
+
+    def files(self) -> list[str]:
+        return [self.path, self.log_path]
+
+    def compact(self):
+        """
+        This method merges the log into a new snapshot.
+        """
+        if self.exists():
+            self.cache = self.cache
+
+    def evict(self, oldest_day: Optional[str], max_items: Optional[int]) -> int:
+        if not self.exists():
+            return 0
+        cache = self.cache
+        removed = cache.evict(oldest_day, max_items)
+        if removed:
+            logging.info(f'Removed {removed} item(s) from the cache.')
+            self.cache = cache
+        return removed
+
+    def image_urls(self) -> set[str]:
+        return self.cache.image_urls() if self.exists() else set()
+
+    def _append_frames(self, frames: list[bytes]):
+        """
+        This method durably appends frames to the log, dropping any torn frame left by a crash first.
+        :param frames: Pickled feeds.
+        """
+        with open(self.log_path, 'ab') as log:
+            if log.tell() > self._log_size:
+                log.truncate(self._log_size)
+            for frame in frames:
+                log.write(self.FRAME_HEADER.pack(len(frame)) + frame)
+            log.flush()
+            os.fsync(log.fileno())
+        self._log_size += sum(self.FRAME_HEADER.size + len(frame) for frame in frames)
+
+    def append(self, feed: Feed):
+        self.append_many([feed])
+
+    def append_many(self, feeds: list[Feed]):
+        if not self.exists():
+            self._log_size = 0
+        existing_cache = self.cache if self.exists() else RSSCache([])
+        frames = []
+        for feed in feeds:
+            new_items = existing_cache.append(feed)
+            if new_items:
+                frames.append(pickle.dumps(Feed(feed.title, feed.url, new_items), protocol=pickle.HIGHEST_PROTOCOL))
+        if not frames:
+            return
+        self._append_frames(frames)
+        self._loaded, self._loaded_stat = existing_cache, self._stat()
+        snapshot_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if self._log_size >= max(self.COMPACT_MIN_BYTES, snapshot_size):
+            logging.info('Compacting the cache log into a new snapshot.')
+            self.cache = existing_cache
+
+    def fetch_by_dates(self, start: str, end: str, url: Optional[str], limit: Optional[int] = None) -> list[Item]:
+        return self.cache.fetch_by_dates(start, end, url, limit)
+
+    def fetch_feed(self, url: str) -> Optional[Feed]:
+        if not self.exists():
+            return None
+        cache = self.cache
+        feed_position = cache.feed_positions.get(url)
+        return cache.rss_feeds[feed_position] if feed_position is not None else None
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    This backend stores feeds and items as rows of an SQLite database.
+    Items are indexed by their feed and publish day, so writes and date lookups only touch the affected rows.
+    A full-text index of the titles and descriptions of the items, kept in sync by triggers, serves `search`.
+    """
+    name = 'sqlite'
+    default_file = 'rss_cache.db'
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS feeds (
+            id INTEGER PRIMARY KEY,
+            url TEXT UNIQUE,
+            title TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY,
+            feed_id INTEGER NOT NULL REFERENCES feeds(id),
+            item_key TEXT NOT NULL,
+            pub_day TEXT,
+            pub_ts REAL,
+            title TEXT,
+            date TEXT,
+            link TEXT,
+            description TEXT,
+            media TEXT NOT NULL,
+            images TEXT NOT NULL,
+            guid TEXT
+        );
+        CREATE INDEX IF NOT EXISTS items_feed_day ON items(feed_id, pub_day);
+        CREATE INDEX IF NOT EXISTS items_day ON items(pub_day);
+        CREATE UNIQUE INDEX IF NOT EXISTS items_identity ON items(feed_id, item_key);
+    """
+    ADDED_COLUMNS = (('items', 'pub_ts', 'REAL'), ('items', 'guid', 'TEXT'))
+    ITEM_COLUMNS = ('items.title, items.date, items.link, items.description, items.media, items.images,'
+                    ' items.pub_ts, items.guid')
+    # The full-text index of titles and descriptions is kept up to date by triggers, so every write updates it.
+    SEARCH_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+            title, description, content='items', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+        );
+        CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items BEGIN
+            INSERT INTO items_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items BEGIN
+            INSERT INTO items_fts (items_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END;
+        CREATE TRIGGER IF NOT EXISTS items_fts_update AFTER UPDATE OF title, description ON items BEGIN
+            INSERT INTO items_fts (items_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO items_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+        END;
+    """
+    # Matches in titles weigh ten times more than matches in descriptions. Searches without filters order by
+    # the rank column configured with these weights, so FTS5 keeps only the best `limit` matches while ranking.
+    # Filtered searches rank by the same expression, so it is only computed for the matches which pass the filters.
+    SEARCH_RANK_CONFIG = 'bm25(10.0, 1.0)'
+    SEARCH_RANK = 'bm25(items_fts, 10.0, 1.0)'
+    # Pages of the database are read through a memory map of up to this size instead of being copied by read calls,
+    # so a query only touches the pages of the rows it returns and they are shared with the page cache of the OS.
+    MMAP_SIZE = 256 * 1024 * 1024
+    # Version 1 identifies items by Item.key, older databases identified them by their title.
+    # Version 2 has the full-text index of the items.
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.has_search = True
+        self._is_set_up = False
+        self._setup_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        This method returns the connection of the calling thread to the database, opening it on first use.
+        The schema is created and migrated by the first connection of this backend only, and again if the database
+        file was removed since. The full-text index is left out if SQLite was built without FTS5.
+        :return: An SQLite connection.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and os.path.exists(self.path):
+            return connection
+        if connection is not None:
+            connection.close()
+        with self._setup_lock:
+            needs_setup = not (self._is_set_up and os.path.exists(self.path))
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute(f'PRAGMA mmap_size={self.MMAP_SIZE}')
+            if needs_setup:
+                self._set_up(connection)
+                self._is_set_up = True
+        self._local.connection = connection
+        return connection
+
+    def _set_up(self, connection: sqlite3.Connection):
+        """
+        This method creates the schema of the database, its full-text index if SQLite supports it,
+        and migrates databases created by older versions.
+        :param connection: An SQLite connection.
+        """
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.executescript(self.SCHEMA)
+        try:
+            connection.executescript(self.SEARCH_SCHEMA)
+        except sqlite3.OperationalError as e:
+            if self.has_search:
+                logging.info(f'Cached news can not be searched: {e}')
+            self.has_search = False
+        if self.has_search:
+            rank = connection.execute("SELECT v FROM items_fts_config WHERE k = 'rank'").fetchone()
+            if rank is None or rank[0] != self.SEARCH_RANK_CONFIG:
+                with connection:
+                    connection.execute("INSERT INTO items_fts (items_fts, rank) VALUES ('rank', ?)",
+                                       (self.SEARCH_RANK_CONFIG,))
+        self._migrate(connection)
+
+    def close(self):
+        """
+        This method closes the connection of the calling thread, the next call opens a new one.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _migrate(self, connection: sqlite3.Connection):
+        """
+        This method adds the columns which are missing in databases created by older versions,
+        replaces the title keys of their items by item keys and indexes their items for search.
+        :param connection: An SQLite connection.
+        """
+        for table, column, column_type in self.ADDED_COLUMNS:
+            columns = {row[1] for row in connection.execute(f'PRAGMA table_info({table})')}
+            if column not in columns:
+                logging.info(f'Adding column {column} to the cached {table}.')
+                with connection:
+                    connection.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+        version = connection.execute('PRAGMA user_version').fetchone()[0]
+        if version >= self.SCHEMA_VERSION or (version == 1 and not self.has_search):
+            return
+        with connection:
+            if version < 1:
+                self._rekey_items(connection)
+            if self.has_search:
+                logging.info('Indexing the cached news for search.')
+                connection.execute("INSERT INTO items_fts (items_fts) VALUES ('rebuild')")
+            connection.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION if self.has_search else 1}')
+
+    def _rekey_items(self, connection: sqlite3.Connection):
+        """
+        This method identifies the cached items by their item keys. Of the items which now share a key
+        inside a feed, the first cached one is kept.
+        :param connection: An SQLite connection inside a transaction.
+        """
+        seen: set[tuple[int, str]] = set()
+        updates, duplicates = [], []
+        rows = connection.execute(f'SELECT items.id, items.feed_id, {self.ITEM_COLUMNS} FROM items ORDER BY id')
+        for row in rows:
+            identity = (row[1], self._item_key(self._row_to_item(row[2:])))
+            if identity in seen:
+                duplicates.append((row[0],))
+            else:
+                seen.add(identity)
+                updates.append((f'\x01{identity[1]}', row[0]))
+        if not updates:
+            return
+        logging.info(f'Replacing the title keys of {len(updates)} cached item(s).')
+        connection.executemany('DELETE FROM items WHERE id = ?', duplicates)
+        # Keys are set in two steps, so no new key collides with an old key of another item on the way.
+        connection.executemany('UPDATE items SET item_key = ? WHERE id = ?', updates)
+        connection.execute('UPDATE items SET item_key = substr(item_key, 2)')
+
+    @staticmethod
+    def _item_key(item: Item) -> str:
+        """
+        :param item: An RSS Item object.
+        :return: The value which identifies an item inside its feed.
+        """
+        return item.key
+
+    @staticmethod
+    def _row_to_item(row: tuple) -> Item:
+        """
+        This method recreates an Item object from a database row.
+        :param row: A row with the columns of ITEM_COLUMNS.
+        :return: The cached Item.
+        """
+        title, date, link, description, media, images, pub_ts, guid = row
+        return Item(title, date, link, description, json.loads(media), json.loads(images), pub_ts, guid)
+
+    def _insert_feed(self, connection: sqlite3.Connection, feed: Feed) -> int:
+        """
+        This method inserts a feed and its items which are not cached yet.
+        :param connection: An SQLite connection inside a transaction.
+        :param feed: A new parsed Feed object.
+        :return: The amount of inserted items.
+        """
+        row = connection.execute('SELECT id FROM feeds WHERE url IS ?', (feed.url,)).fetchone()
+        if row:
+            feed_id = row[0]
+        else:
+            feed_id = connection.execute('INSERT INTO feeds (url, title) VALUES (?, ?)',
+                                         (feed.url, feed.title)).lastrowid
+        rows = [(feed_id, self._item_key(item), pub_day(item), item.timestamp, item.title_text,
+                 item.date_text, item.link_text, item.description_text, json.dumps(item.media_urls),
+                 json.dumps(item.image_urls), item.guid)
+                for item in feed.items]
+        return connection.executemany(
+            'INSERT OR IGNORE INTO items (feed_id, item_key, pub_day, pub_ts, title, date, link,'
+            ' description, media, images, guid) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows).rowcount
+
+    def append(self, feed: Feed):
+        self.append_many([feed])
+
+    def append_many(self, feeds: list[Feed]):
+        connection = self._connect()
+        with connection:
+            inserted = [self._insert_feed(connection, feed) for feed in feeds]
+        for feed, inserted_count in zip(feeds, inserted):
+            logging.info(f'Cached {inserted_count} new item(s) of {feed.url}.')
+
+    def fetch_by_dates(self, start: str, end: str, url: Optional[str], limit: Optional[int] = None) -> list[Item]:
+        if not self.exists():
+            raise FileNotFoundError
+        query = f'SELECT {self.ITEM_COLUMNS} FROM items'
+        if url:
+            query += ' JOIN feeds ON feeds.id = items.feed_id WHERE feeds.url = ? AND items.pub_day BETWEEN ? AND ?'
+            params = (url, start, end)
+        else:
+            query += ' WHERE items.pub_day BETWEEN ? AND ?'
+            params = (start, end)
+        # The day indexes hold the items in this order, so SQLite walks them without sorting
+        # and stops reading after the limit; -1 means no limit.
+        query += ' ORDER BY items.pub_day, items.id LIMIT ?'
+        connection = self._connect()
+        rows = connection.execute(query, (*params, limit or -1)).fetchall()
+        return [self._row_to_item(row) for row in rows]
+
+    def fetch_feed(self, url: str) -> Optional[Feed]:
+        if not self.exists():
+            return None
+        connection = self._connect()
+        feed_row = connection.execute('SELECT id, title FROM feeds WHERE url = ?', (url,)).fetchone()
+        if feed_row is None:
+            return None
+        rows = connection.execute(f'SELECT {self.ITEM_COLUMNS} FROM items WHERE feed_id = ? ORDER BY id',
+                                  (feed_row[0],)).fetchall()
+        return Feed(feed_row[1], url, [self._row_to_item(row) for row in rows])
+
+    def files(self) -> list[str]:
+        return [self.path, f'{self.path}-wal', f'{self.path}-shm']
+
+    def evict(self, oldest_day: Optional[str], max_items: Optional[int]) -> int:
+        if not self.exists():
+            return 0
+        connection = self._connect()
+        with connection:
+            removed = 0
+            if oldest_day:
+                removed += connection.execute('DELETE FROM items WHERE pub_day < ?', (oldest_day,)).rowcount
+            if max_items is not None:
+                removed += connection.execute(
+                    'DELETE FROM items WHERE id IN (SELECT id FROM (SELECT id, row_number() OVER ('
+                    'PARTITION BY feed_id ORDER BY pub_day DESC, pub_ts DESC, id DESC) AS position FROM items) '
+                    'WHERE position > ?)', (max_items,)).rowcount
+            connection.execute('DELETE FROM feeds WHERE id NOT IN (SELECT feed_id FROM items)')
+        if removed:
+            logging.info(f'Removed {removed} item(s) from the cache.')
+        return removed
+
+    def compact(self):
+        """
+        This method merges the segments of the full-text index and rebuilds the database file without free pages.
+        """
+        if not self.exists():
+            return
+        connection = self._connect()
+        if self.has_search:
+            with connection:
+                connection.execute("INSERT INTO items_fts (items_fts) VALUES ('optimize')")
+        connection.execute('VACUUM')
+        connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        logging.info('Compacted the cache database.')
+
+    def image_urls(self) -> set[str]:
+        if not self.exists():
+            return set()
+        connection = self._connect()
+        return {url for (images,) in connection.execute('SELECT images FROM items') for url in json.loads(images)}
+
+    @staticmethod
+    def _match_expression(query: str) -> Optional[str]:
+        """
+        This method turns the words of a query into an FTS5 expression matching news with all of them.
+        Words are quoted, so characters of the query syntax never cause errors.
+        :param query: The searched words.
+        :return: The expression, or None if the query has no words.
+        """
+        terms = [f'"{word}"' + ('*' if star else '') for word, star in re.findall(r'(\w+)(\*?)', query)]
+        return ' '.join(terms) or None
+
+    def search(self, query: str, start: Optional[str], end: Optional[str], url: Optional[str],
+               limit: Optional[int]) -> list[Item]:
+        if not self.exists():
+            raise FileNotFoundError
+        expression = self._match_expression(query)
+        tables = 'items_fts JOIN items ON items.id = items_fts.rowid'
+        conditions, params = ['items_fts MATCH ?'], [expression]
+        if url:
+            tables += ' JOIN feeds ON feeds.id = items.feed_id'
+            conditions.append('feeds.url = ?')
+            params.append(url)
+        connection = self._connect()
+        if not self.has_search:
+            raise NotImplementedError('SQLite was built without full-text search.')
+        if expression is None:
+            return []
+        if start or end:
+            # Items are cached roughly in the order of their dates, so the ids of the items of the dates
+            # bound the part of the index which has to be read.
+            days = (start or '00000000', end or '99999999')
+            first, last = connection.execute('SELECT min(id), max(id) FROM items WHERE pub_day BETWEEN ? AND ?',
+                                             days).fetchone()
+            if first is None:
+                return []
+            conditions += ['items_fts.rowid BETWEEN ? AND ?', 'items.pub_day BETWEEN ? AND ?']
+            params += [first, last, *days]
+        if start or end or url:
+            sql = (f'SELECT {self.ITEM_COLUMNS} FROM {tables} WHERE {" AND ".join(conditions)} '
+                   f'ORDER BY {self.SEARCH_RANK} LIMIT ?')
+        else:
+            sql = (f'SELECT {self.ITEM_COLUMNS} FROM (SELECT rowid, rank FROM items_fts WHERE items_fts MATCH ? '
+                   f'ORDER BY rank LIMIT ?) AS matches JOIN items ON items.id = matches.rowid ORDER BY matches.rank')
+        rows = connection.execute(sql, (*params, limit or -1)).fetchall()
+        return [self._row_to_item(row) for row in rows]
+
+
+CACHE_BACKENDS: dict[str, type[CacheBackend]] = {
+    PickleCacheBackend.name: PickleCacheBackend,
+    SQLiteCacheBackend.name: SQLiteCacheBackend,
+}
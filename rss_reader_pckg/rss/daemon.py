@@ -0,0 +1,245 @@
+"""
+This module contains the PollingDaemon class which keeps polling RSS feeds and caching their new items.
+"""
+
+import heapq
+import itertools
+import logging
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from rss_reader_pckg.rss.fetcher import FeedFetcher, FetchResult
+from rss_reader_pckg.rss.rss_cache import CacheReader
+from rss_reader_pckg.rss.rss_classes import Item
+from rss_reader_pckg.rss.rss_parser import RSSParser
+
+DEFAULT_INTERVAL = 15 * 60.0
+MIN_INTERVAL = 60.0
+MAX_INTERVAL = 24 * 60 * 60.0
+IDLE_GROWTH = 1.5
+MAX_BACKOFF_EXPONENT = 6
+# Keys of more items than this are forgotten, the oldest first, but never the keys of the latest poll.
+MAX_SEEN_KEYS = 1000
+
+
+@dataclass
+class FeedSchedule:
+    """
+    A class to represent the polling state of a single feed.
+    `seen` holds the keys of the recently polled items in the order they were last seen.
+    """
+    url: str
+    interval: float = DEFAULT_INTERVAL
+    failures: int = 0
+    ttl: Optional[int] = None
+    skip_hours: frozenset[int] = frozenset()
+    seen: dict[str, None] = field(default_factory=dict)
+    polls: int = 0
+
+    def remember(self, keys: list[str]) -> int:
+        """
+        This method records the keys of the items found by a poll, forgetting the keys seen longest ago
+        once more than `MAX_SEEN_KEYS` are kept.
+        :param keys: The keys of the items of the feed.
+        :return: The amount of keys which were not seen before.
+        """
+        new_count = len(set(keys).difference(self.seen))
+        for key in keys:
+            self.seen.pop(key, None)
+            self.seen[key] = None
+        for key in list(itertools.islice(self.seen, max(0, len(self.seen) - max(MAX_SEEN_KEYS, len(keys))))):
+            del self.seen[key]
+        return new_count
+
+
+def publish_period(items: list[Item]) -> Optional[float]:
+    """
+    This function estimates how often a feed publishes from the dates of its items.
+    :param items: The items of the feed.
+    :return: The median amount of seconds between two consecutive items, or None if it cannot be estimated.
+    """
+    timestamps = sorted({item.timestamp for item in items if item.timestamp is not None}, reverse=True)
+    gaps = [newer - older for newer, older in zip(timestamps, timestamps[1:])]
+    return statistics.median(gaps) if gaps else None
+
+
+def after_skip_hours(when: float, skip_hours: frozenset[int]) -> float:
+    """
+    This function moves a poll out of the hours in which the feed asks not to be read.
+    :param when: The planned POSIX time of the poll.
+    :param skip_hours: The hours of the day in GMT from the `<skipHours>` of the channel.
+    :return: The planned time, or the start of the first hour which is not skipped.
+    """
+    if not skip_hours or len(skip_hours) >= 24:
+        return when
+    moment = datetime.fromtimestamp(when, timezone.utc)
+    while moment.hour in skip_hours:
+        moment = moment.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    return max(when, moment.timestamp())
+
+
+class PollingDaemon:
+    """
+    This class polls a set of RSS feeds for as long as it runs, keeping the cache, the validators
+    and the HTTP connections in memory between polls.
+    Feeds are kept in a priority queue by the time of their next poll. The interval of every feed adapts
+    to how often it publishes, grows while the feed has nothing new, never drops below its `<ttl>`,
+    skips its `<skipHours>` and backs off exponentially while the feed cannot be fetched.
+    """
+
+    def __init__(self, urls: list[str], rss_cache: CacheReader, fetcher: FeedFetcher, stream: bool = False,
+                 engine: str = 'bs4', interval: float = DEFAULT_INTERVAL, min_interval: float = MIN_INTERVAL,
+                 max_interval: float = MAX_INTERVAL, clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rss_cache = rss_cache
+        self.fetcher = fetcher
+        self.stream = stream
+        self.engine = engine
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.clock = clock
+        self.sleep = sleep
+        self.schedules = {url: FeedSchedule(url, self._clamp(interval)) for url in dict.fromkeys(urls)}
+        self._queue: list[tuple[float, int, str]] = []
+        self._order = itertools.count()
+        self._running = False
+        now = self.clock()
+        for url in self.schedules:
+            self._push(url, now)
+
+    def _push(self, url: str, when: float):
+        """
+        This method plans the next poll of a feed.
+        :param url: The url of the RSS feed.
+        :param when: The POSIX time of the poll.
+        """
+        heapq.heappush(self._queue, (when, next(self._order), url))
+
+    @property
+    def next_poll(self) -> Optional[float]:
+        """
+        :return: The POSIX time of the earliest planned poll, or None if there are no feeds.
+        """
+        return self._queue[0][0] if self._queue else None
+
+    def _clamp(self, interval: float, ttl: Optional[int] = None) -> float:
+        """
+        :param interval: A poll interval in seconds.
+        :param ttl: The `<ttl>` of the channel in minutes.
+        :return: The interval limited to the allowed range, and to at least the `<ttl>` of the channel.
+        """
+        lowest = max(self.min_interval, ttl * 60.0 if ttl else 0.0)
+        return min(max(interval, lowest), max(self.max_interval, lowest))
+
+    def adapt_interval(self, schedule: FeedSchedule, items: list[Item], new_count: int) -> float:
+        """
+        This method calculates the interval of a feed after a successful poll.
+        If the poll found new items, the feed is polled as often as it publishes, or twice as often as before
+        if its publishing period is unknown. If nothing was new, the interval grows.
+        :param schedule: The polling state of the feed.
+        :param items: The items of the feed found by the poll.
+        :param new_count: The amount of items which were not seen before.
+        :return: The new interval in seconds.
+        """
+        if new_count:
+            period = publish_period(items)
+            interval = period if period else schedule.interval / 2
+        else:
+            interval = schedule.interval * IDLE_GROWTH
+        return self._clamp(interval, schedule.ttl)
+
+    def backoff_delay(self, schedule: FeedSchedule) -> float:
+        """
+        :param schedule: The polling state of a feed which failed to be fetched.
+        :return: The delay until the next attempt, doubling with every consecutive failure.
+        """
+        exponent = min(schedule.failures, MAX_BACKOFF_EXPONENT)
+        return min(schedule.interval * 2 ** exponent, max(self.max_interval, schedule.interval))
+
+    def _parse(self, schedule: FeedSchedule, result: FetchResult) -> list[Item]:
+        """
+        This method parses and caches a fetched feed, recording the schedule hints of its channel.
+        :param schedule: The polling state of the feed.
+        :param result: The successful result of fetching the feed.
+        :return: The items of the feed.
+        """
+        feed_parser = RSSParser(self.rss_cache, self.fetcher, self.stream, self.engine)
+        feed_parser.url = result.url
+        if not feed_parser.stream and self.engine != 'lxml':
+            feed_parser.load_soup(result.content)
+        feed = feed_parser.parse_result(result)
+        schedule.ttl = feed_parser.ttl
+        schedule.skip_hours = feed_parser.skip_hours
+        return feed.items
+
+    def _poll_result(self, schedule: FeedSchedule, result: FetchResult, now: float) -> float:
+        """
+        This method handles the result of polling a feed.
+        :param schedule: The polling state of the feed.
+        :param result: The result of fetching the feed.
+        :param now: The POSIX time of the poll.
+        :return: The POSIX time of the next poll of the feed.
+        """
+        schedule.polls += 1
+        if result.not_modified:
+            result.close()
+            schedule.failures = 0
+            schedule.interval = self.adapt_interval(schedule, [], 0)
+            logging.info(f'{schedule.url} was not modified, polling it again in {schedule.interval:.0f}s.')
+            return after_skip_hours(now + schedule.interval, schedule.skip_hours)
+        try:
+            if not result.ok:
+                raise ConnectionError(result.error or f'status {result.status}')
+            items = self._parse(schedule, result)
+        except Exception as e:
+            schedule.failures += 1
+            delay = self.backoff_delay(schedule)
+            logging.error(f'Polling {schedule.url} failed ({e}), retrying in {delay:.0f}s.')
+            return now + delay
+        new_count = schedule.remember([item.key for item in items])
+        schedule.failures = 0
+        schedule.interval = self.adapt_interval(schedule, items, new_count)
+        logging.info(f'{schedule.url} had {new_count} new item(s), polling it again in {schedule.interval:.0f}s.')
+        return after_skip_hours(now + schedule.interval, schedule.skip_hours)
+
+    def poll_due(self) -> int:
+        """
+        This method polls all feeds which are due concurrently and plans their next polls.
+        :return: The amount of polled feeds.
+        """
+        now = self.clock()
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            due.append(heapq.heappop(self._queue)[2])
+        if not due:
+            return 0
+        validators = {url: self.rss_cache.validators.get(url) for url in due}
+        for result in self.fetcher.fetch_all(due, validators):
+            self._push(result.url, self._poll_result(self.schedules[result.url], result, now))
+        self.rss_cache.image_store.wait()
+        return len(due)
+
+    def run(self, max_rounds: Optional[int] = None):
+        """
+        This method polls the feeds until `stop` is called or the given amount of rounds is done,
+        sleeping until the next poll is due in between.
+        :param max_rounds: The amount of rounds in which feeds are polled, unlimited by default.
+        """
+        self._running = True
+        rounds = 0
+        logging.info(f'Polling {len(self.schedules)} feed(s).')
+        while self._running and self._queue and (max_rounds is None or rounds < max_rounds):
+            if self.poll_due():
+                rounds += 1
+                continue
+            self.sleep(max(self.next_poll - self.clock(), 0))
+        self._running = False
+
+    def stop(self):
+        """
+        This method makes `run` return before the next round of polls.
+        """
+        self._running = False
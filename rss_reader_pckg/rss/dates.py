@@ -0,0 +1,62 @@
+"""
+This module contains functions to normalize the dates found in RSS feeds.
+Feeds almost always use RFC 822 or ISO 8601 dates, so those are parsed directly,
+dateutil is only used for the dates which match neither of the formats.
+Parsed dates are memoized, as the same dates repeat across items and runs. The helpers copy the dates into plain
+strings first, so a memoized bs4 string never keeps the whole document it belongs to alive.
+"""
+
+import re
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+DAY_FORMAT = '%Y%m%d'
+RFC_822_PATTERN = re.compile(r'(?:[A-Za-z]{3},\s*)?\d{1,2}\s+[A-Za-z]{3}\s+\d{2,4}\s+'
+                             r'\d{1,2}:\d{2}(?::\d{2})?(?:\s+\S+)?$')
+
+
+@lru_cache(maxsize=8192)
+def parse_date(value: str) -> datetime:
+    """
+    This function parses a date string, trying RFC 822 and ISO 8601 before falling back to dateutil.
+    :param value: The date string.
+    :return: The parsed datetime, aware if the date had a timezone.
+    """
+    value = value.strip()
+    if RFC_822_PATTERN.match(value):
+        try:
+            return parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            pass
+    try:
+        return datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+    except ValueError:
+        pass
+    from dateutil import parser
+    return parser.parse(value)
+
+
+def format_date(value: str) -> str:
+    """
+    :param value: The date string.
+    :return: The date in the format of YYYY-mm-dd HH:MM:SS, in the timezone the date was given in.
+    """
+    return parse_date(str(value)).strftime(DATE_FORMAT)
+
+
+def day_key(value: str) -> str:
+    """
+    :param value: The date string.
+    :return: The day of the date in the format of YYYYMMDD, in the timezone the date was given in.
+    """
+    return parse_date(str(value)).strftime(DAY_FORMAT)
+
+
+def timestamp(value: str) -> float:
+    """
+    :param value: The date string.
+    :return: The POSIX timestamp of the date, dates without timezone are taken as local time.
+    """
+    return parse_date(str(value)).timestamp()
@@ -0,0 +1,101 @@
+"""
+This module describes the feed formats understood by the parsers: RSS 2.0, RSS 1.0 and Atom.
+The format of a document is detected from the name of its root element, or of a single item, and tells
+the extraction engines which elements hold the fields of an Item, so every format fills the same Item model.
+"""
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Optional
+
+ATOM_NAMESPACE = 'http://www.w3.org/2005/Atom'
+RSS_1_NAMESPACE = 'http://purl.org/rss/1.0/'
+
+
+@dataclass(frozen=True)
+class FeedFormat:
+    """
+    A class to represent the elements of a feed format.
+    Fields with several candidate elements list them in the order of preference. Elements are matched by their
+    local name; if the format has a namespace, only the `foreign_tags` may come from other namespaces,
+    so e.g. `<media:content>` is never taken for the `<content>` of an Atom entry.
+    """
+    name: str
+    item_tag: str
+    channel_tag: str
+    date_tags: tuple[str, ...]
+    description_tags: tuple[str, ...]
+    image_tags: tuple[str, ...]
+    guid_tag: Optional[str] = None
+    link_attribute: Optional[str] = None
+    namespace: Optional[str] = None
+    foreign_tags: frozenset[str] = frozenset()
+
+    @cached_property
+    def field_tags(self) -> frozenset[str]:
+        """
+        :return: Local names of all elements which hold fields of an item.
+        """
+        tags = ('title', 'link', 'image', *self.date_tags, *self.description_tags, *self.image_tags)
+        return frozenset(tags + ((self.guid_tag,) if self.guid_tag else ()))
+
+    def accepts(self, name: str, namespace: Optional[str]) -> bool:
+        """
+        :param name: The local name of an element of an item.
+        :param namespace: The namespace of the element.
+        :return: Whether the element holds a field of the item in this format.
+        """
+        return self.namespace is None or namespace == self.namespace or name in self.foreign_tags
+
+    def is_link(self, attributes) -> bool:
+        """
+        :param attributes: The attributes of a `<link>` element.
+        :return: Whether the element is the link of the item, Atom entries also link their enclosures and related pages.
+        """
+        return self.link_attribute is None or attributes.get('rel', 'alternate') == 'alternate'
+
+    def image_link(self, attributes) -> Optional[str]:
+        """
+        :param attributes: The attributes of a `<link>` element.
+        :return: The url of the image the element links as an enclosure, if it does.
+        """
+        if self.link_attribute and attributes.get('rel') == 'enclosure' and \
+                attributes.get('type', '').startswith('image/'):
+            return attributes.get(self.link_attribute)
+        return None
+
+
+RSS_2 = FeedFormat('rss', 'item', 'channel', date_tags=('pubDate', 'date'), description_tags=('description',),
+                   image_tags=('enclosure', 'content', 'thumbnail'), guid_tag='guid')
+RSS_1 = FeedFormat('rss1', 'item', 'channel', date_tags=('date',), description_tags=('description',),
+                   image_tags=('enclosure', 'content', 'thumbnail'), namespace=RSS_1_NAMESPACE,
+                   foreign_tags=frozenset(('date', 'image', 'enclosure', 'content', 'thumbnail')))
+ATOM = FeedFormat('atom', 'entry', 'feed', date_tags=('published', 'updated'), description_tags=('summary', 'content'),
+                  image_tags=('thumbnail',), guid_tag='id', link_attribute='href', namespace=ATOM_NAMESPACE,
+                  foreign_tags=frozenset(('thumbnail', 'image')))
+FORMATS = (RSS_2, RSS_1, ATOM)
+
+
+def detect_format(root_name: str) -> FeedFormat:
+    """
+    :param root_name: The local name of the root element of a feed document.
+    :return: The format of the document, RSS 2.0 unless the root is an Atom `<feed>` or an RSS 1.0 `<RDF>`.
+    """
+    if root_name == 'feed':
+        return ATOM
+    if root_name == 'RDF':
+        return RSS_1
+    return RSS_2
+
+
+def item_format(name: str, namespace: Optional[str]) -> FeedFormat:
+    """
+    :param name: The local name of an item element.
+    :param namespace: The namespace of the item element.
+    :return: The format of the feed of the item.
+    """
+    if name == 'entry':
+        return ATOM
+    if namespace == RSS_1_NAMESPACE:
+        return RSS_1
+    return RSS_2
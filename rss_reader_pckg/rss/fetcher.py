@@ -0,0 +1,159 @@
+"""
+This module contains the FeedFetcher class which downloads many RSS feeds concurrently.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterable, Optional
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    import requests
+
+    from rss_reader_pckg.rss.transport import Transport
+
+
+@dataclass
+class FetchResult:
+    """
+    A class to represent the outcome of fetching a single RSS feed.
+    """
+    url: str
+    content: Optional[bytes] = None
+    status: Optional[int] = None
+    error: Optional[Exception] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    response: Optional['requests.Response'] = None
+    transport: Optional['Transport'] = field(default=None, repr=False)
+
+    CHUNK_SIZE = 64 * 1024
+
+    @property
+    def ok(self) -> bool:
+        """
+        :return: Whether the feed was downloaded successfully.
+        """
+        return self.error is None and self.status == 200
+
+    @property
+    def not_modified(self) -> bool:
+        """
+        :return: Whether the server reported that the feed did not change since the previous fetch.
+        """
+        return self.error is None and self.status == 304
+
+    def chunks(self) -> Iterable[bytes]:
+        """
+        :return: The body of the response, read from the network in chunks if the request was streamed.
+        """
+        if self.response is not None:
+            return self.transport.iter_content(self.response, self.CHUNK_SIZE)
+        return [self.content]
+
+    def close(self):
+        """
+        This method releases the connection of a streamed response, the unread part of the body is discarded.
+        """
+        if self.response is not None:
+            self.response.close()
+
+
+class FeedFetcher:
+    """
+    This class downloads feeds on a bounded thread pool, limiting the amount of simultaneous connections per host.
+    Requests go through the given transport, or through the transport shared by the whole application,
+    so connections are kept open and reused between fetches.
+    """
+
+    def __init__(self, max_workers: int = 16, per_host: int = 4, transport: Optional['Transport'] = None):
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self._transport = transport
+        self._host_limits: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def transport(self) -> 'Transport':
+        """
+        :return: The transport performing the requests of this fetcher.
+        """
+        if self._transport is None:
+            from rss_reader_pckg.rss.transport import shared_transport
+            self._transport = shared_transport()
+        return self._transport
+
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        """
+        This method returns the semaphore guarding the connections to the host of `url`.
+        :param url: The url which is going to be requested.
+        :return: A semaphore shared by all urls of the same host.
+        """
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    @staticmethod
+    def _conditional_headers(validators: Optional[dict]) -> dict:
+        """
+        This method creates the headers of a conditional GET request from stored validators.
+        :param validators: A dictionary with the `etag` and `last_modified` of the previous fetch.
+        :return: A dictionary of request headers.
+        """
+        headers = {}
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+        return headers
+
+    def fetch(self, url: str, validators: Optional[dict] = None, stream: bool = False) -> FetchResult:
+        """
+        This method requests a single feed, errors of the request are propagated to the caller.
+        :param url: The url of the RSS feed.
+        :param validators: Validators of the previous fetch, if given the request is conditional.
+        :param stream: Whether to leave the body unread, so it can be consumed through `FetchResult.chunks`.
+        :return: A FetchResult with the downloaded content.
+        """
+        with self._host_limit(url):
+            logging.info(f'Requesting RSS from {url}')
+            res = self.transport.get(url, headers=self._conditional_headers(validators), stream=stream)
+        if res.status_code == 304:
+            logging.info(f'RSS from {url} was not modified since the previous fetch.')
+        return FetchResult(url, None if stream else res.content, res.status_code,
+                           etag=res.headers.get('ETag'), last_modified=res.headers.get('Last-Modified'),
+                           response=res if stream else None, transport=self.transport)
+
+    def safe_fetch(self, url: str, validators: Optional[dict] = None) -> FetchResult:
+        """
+        This method requests a single feed, storing any error of the request inside the result.
+        :param url: The url of the RSS feed.
+        :param validators: Validators of the previous fetch, if given the request is conditional.
+        :return: A FetchResult with either the downloaded content or the error.
+        """
+        import requests
+        try:
+            return self.fetch(url, validators)
+        except requests.RequestException as e:
+            logging.error(f'Failed to request RSS from {url}!')
+            return FetchResult(url, error=e)
+
+    def fetch_all(self, urls: list[str], validators: Optional[dict[str, dict]] = None) -> list[FetchResult]:
+        """
+        This method requests all given feeds concurrently, so the total time depends on the slowest feed.
+        :param urls: The urls of the RSS feeds.
+        :param validators: Validators of previous fetches by url, used to make conditional requests.
+        :return: A list of FetchResult objects in the same order as `urls`.
+        """
+        if not urls:
+            return []
+        validators = validators or {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as pool:
+            results = list(pool.map(self.safe_fetch, urls, [validators.get(url) for url in urls]))
+        logging.info(f'Fetched {sum(result.ok or result.not_modified for result in results)} of {len(urls)} feeds.')
+        return results
@@ -3,7 +3,9 @@ This module contains functions which help the RSS classes to operate
 """
 
 import logging
+import os
 import re
+from typing import Optional
 
 from rss_reader_pckg.rss.rss_exception import RSSException
 
@@ -68,3 +70,41 @@ def validate_url(url: str):
     if not re.match(r'(https?://[^\s"<]+)', url):
         logging.error('Invalid RSS URL was provided!')
         raise RSSException('Argument provided was not a valid web url.', is_logged=True)
+
+
+def read_feed_list(path: str) -> list[str]:
+    """
+    This function reads RSS urls from a feed list file, one url per line.
+    Empty lines and lines starting with `#` are ignored.
+    :param path: Path to the feed list file.
+    :return: A list of RSS urls.
+    """
+    if not os.path.exists(path):
+        logging.error('Given feed list file was not found!')
+        raise RSSException(f'Feed list file {path} does not exist.', is_logged=True)
+    with open(path, 'r', encoding='utf-8') as f:
+        urls = [line.strip() for line in f]
+    urls = [url for url in urls if url and not url.startswith('#')]
+    logging.info(f'Read {len(urls)} url(s) from feed list {path}')
+    return urls
+
+
+def schedule_number(text: Optional[str]) -> Optional[int]:
+    """
+    This function reads the number of a `<ttl>` or `<hour>` element of a channel.
+    :param text: The text of the element.
+    :return: The number, or None if the text is not a number.
+    """
+    text = (text or '').strip()
+    return int(text) if text.isdigit() else None
+
+
+def process_pool_context():
+    """
+    This function chooses how worker processes are started. Workers are started from a clean interpreter,
+    because forking while other threads hold locks is not safe.
+    :return: A multiprocessing context for process pools.
+    """
+    import multiprocessing
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
@@ -1,12 +1,51 @@
 """
 This module contains functions to convert an RSS Feed object to HTML.
+The document is rendered incrementally: the styles live in one stylesheet shared by all items, the frame of the
+document is a fixed template and every item is rendered into its own fragment, which can be reused between reports.
 """
+import hashlib
+import json
 import logging
+import os
+from typing import Iterator, Optional, TextIO
 
 from airium import Airium
 
+from rss_reader_pckg.rss.image_store import ImageStore
 from rss_reader_pckg.rss.rss_classes import Feed, Item
 
+STYLESHEET = """
+      body {{ background-color: #FF8C00; }}
+      .feed-title {{ display: flex; justify-content: center; align-items: center; }}
+      .column {{ box-sizing: border-box; height: 100%; padding-left:15%; padding-right:15%; display: flex;
+                flex-direction: column; }}
+      .item {{ box-shadow: 0 0 5px 2px rgba(0,0,0,.35); border-radius: 8px; padding: 8px;
+              background-color: {item_color}; margin-bottom: 10px; }}
+      .image {{ height: 128px; }}
+      .source-link {{ background-color: #f44336; color: white; padding: 5px 10px; text-align: center;
+                     text-decoration: none; display: inline-block; }}
+"""
+DOCUMENT_HEAD = """<!DOCTYPE html>
+<html lang="en">
+  <head>
+    <meta charset="utf-8" />
+    <title>RSS Feed Report</title>
+    <style>{stylesheet}    </style>
+  </head>
+  <body>
+    <div>
+{heading}      <div class="column">
+"""
+DOCUMENT_HEADING = """      <h1 class="feed-title">{title}</h1>
+"""
+DOCUMENT_TAIL = """
+      </div>
+    </div>
+  </body>
+</html>"""
+# Item fragments are nested inside the column div of the document.
+ITEM_LEVEL = 4
+
 
 def html_media(a: Airium, item: Item):
     """
@@ -22,58 +61,171 @@ def html_media(a: Airium, item: Item):
         a.br()
 
 
-def html_images(a: Airium, item: Item, is_cache: bool = False):
+def image_sources(item: Item, image_store: Optional[ImageStore] = None) -> list[str]:
     """
-    This function creates the HTML for images from cache or from url.
-    :param a: The Airium object to create HTML.
+    This function finds the sources of the images of an item in cache or on the web.
     :param item: Item from which to get the images.
-    :param is_cache: Whether to take images from cache or from web.
+    :param image_store: The store to take cached images from, if not given images are taken from web.
+    :return: The sources of the images.
+    """
+    if not image_store:
+        return list(item.image_urls)
+    return [image_store.resolve(url) or url for url in item.image_urls]
+
+
+def html_images(a: Airium, sources: list[str]):
+    """
+    This function creates the HTML for images.
+    :param a: The Airium object to create HTML.
+    :param sources: The sources of the images.
     """
     a.h4(_t='Images:')
-    for image_link in item.image_links.elements:
-        link = 'cache/' + image_link.value.split('/')[-1] if is_cache else image_link.value
-        a.img(src=link, style='height: 128px; width 128px;')
+    for source in sources:
+        a.img(src=source, klass='image')
         a.br()
 
 
-def html_feed(feed: Feed, for_pdf: bool = False, is_cache: bool = False) -> str:
+def html_item(item: Item, sources: list[str]) -> str:
+    """
+    This function renders the HTML fragment of a single item.
+    :param item: The Item to render.
+    :param sources: The sources of the images of the item.
+    :return: A string containing the fragment.
+    """
+    a = Airium(current_level=ITEM_LEVEL)
+    with a.div(klass='item'):
+        a.h3(_t=item.title)
+        a.h4(_t=item.date)
+        a.p(_t=f'Description - {item.description}')
+        if sources:
+            html_images(a, sources)
+        if len(item.media_links) > 1:
+            html_media(a, item)
+
+        a.br()
+        a.a(_t='Source Link', href=item.link, klass='source-link')
+    return str(a)
+
+
+class FragmentCache:
+    """
+    This class keeps rendered item fragments in a JSON file by the keys of their items.
+    Every fragment is stored with a digest of its item and image sources, so a fragment is only reused while
+    neither of them changed. The least recently used fragments are dropped beyond `max_fragments`.
+    """
+
+    def __init__(self, path: str, max_fragments: int = 10000):
+        self.path = path
+        self.max_fragments = max_fragments
+        self.rendered = 0
+        self._fragments: Optional[dict[str, list[str]]] = None
+        self._is_changed = False
+
+    @property
+    def fragments(self) -> dict[str, list[str]]:
+        """
+        This property lazily reads the stored fragments.
+        :return: A dictionary of digests and fragments by item key.
+        """
+        if self._fragments is None:
+            self._fragments = {}
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._fragments = json.load(f)
+        return self._fragments
+
+    def render(self, item: Item, sources: list[str]) -> str:
+        """
+        This method returns the stored fragment of an item, rendering it only if the item was never rendered
+        or changed since.
+        :param item: The Item to render.
+        :param sources: The sources of the images of the item.
+        :return: A string containing the fragment.
+        """
+        key = item.key
+        digest = hashlib.sha1(repr((item.to_record(), sources)).encode()).hexdigest()
+        stored = self.fragments.pop(key, None)
+        if stored is None or stored[0] != digest:
+            stored = [digest, html_item(item, sources)]
+            self.rendered += 1
+        self.fragments[key] = stored
+        self._is_changed = True
+        return stored[1]
+
+    def save(self):
+        """
+        This method atomically writes the stored fragments, keeping only the most recently used ones.
+        """
+        if not self._is_changed:
+            return
+        for key in list(self.fragments)[:max(0, len(self.fragments) - self.max_fragments)]:
+            del self.fragments[key]
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.fragments, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._is_changed = False
+        logging.info(f'Rendered {self.rendered} item fragment(s), the others were reused.')
+
+
+def iter_html(feed: Feed, for_pdf: bool = False, is_cache: bool = False, image_store: Optional[ImageStore] = None,
+              fragment_cache: Optional[FragmentCache] = None, with_title: bool = True) -> Iterator[str]:
+    """
+    This function renders the HTML document of a Feed object piece by piece.
+    :param feed: The Feed object to create HTML from.
+    :param for_pdf: Depending on this the styles will change to match pdf.
+    :param is_cache: Whether to take images from cache or from web.
+    :param image_store: The store of cached images, the default store is used if it is not given.
+    :param fragment_cache: The store of rendered item fragments, items are always rendered if it is not given.
+        New fragments are kept in memory until the caller saves the store.
+    :param with_title: Whether the document starts with the title of the feed.
+    :return: An iterator over the pieces of the document.
+    """
+    if is_cache and image_store is None:
+        image_store = ImageStore()
+    stylesheet = STYLESHEET.format(item_color='white' if for_pdf else '#DAA520')
+    heading = DOCUMENT_HEADING.format(title=feed.title) if with_title else ''
+    yield DOCUMENT_HEAD.format(stylesheet=stylesheet, heading=heading)
+    for position, item in enumerate(feed.items):
+        sources = image_sources(item, image_store if is_cache else None)
+        if position:
+            yield '\n'
+        yield fragment_cache.render(item, sources) if fragment_cache else html_item(item, sources)
+    yield DOCUMENT_TAIL
+
+
+def html_feed(feed: Feed, for_pdf: bool = False, is_cache: bool = False,
+              image_store: Optional[ImageStore] = None, fragment_cache: Optional[FragmentCache] = None,
+              with_title: bool = True) -> str:
     """
     This function creates the HTML template from Feed object.
     :param feed: The Feed object to create HTML from.
     :param for_pdf: Depending on this the styles will change to match pdf.
     :param is_cache: Whether to take images from cache or from web.
+    :param image_store: The store of cached images, the default store is used if it is not given.
+    :param fragment_cache: The store of rendered item fragments, items are always rendered if it is not given.
+    :param with_title: Whether the document starts with the title of the feed.
     :return A string containing the HTML template.
     """
-    bg_color = '#DAA520' if not for_pdf else 'white'
-    a = Airium()
-    center_style = 'display: flex; justify-content: center; align-items: center;'
-    column_div_style = ('box-sizing: border-box; height: 100%; padding-left:15%; padding-right:15%;'
-                        ' display: flex; flex-direction: column;')
-    item_div_style = (f'box-shadow: 0 0 5px 2px rgba(0,0,0,.35); border-radius: 8px; padding:'
-                      f' 8px; background-color: {bg_color}; margin-bottom: 10px;')
-    source_link_style = ('background-color: #f44336; color: white; padding: 5px 10px;'
-                         ' text-align: center; text-decoration: none; display: inline-block;')
-    a('<!DOCTYPE html>')
-    with a.html(lang='en'):
-        with a.head():
-            a.meta(charset='utf-8')
-            a.title(_t='RSS Feed Report')
-        with a.body(style='background-color: #FF8C00;').div():
-            a.h1(_t=feed.title, style=center_style)
-            with a.div(style=column_div_style):
-                for item in feed.items:
-                    with a.div(style=item_div_style):
-                        a.h3(_t=item.title)
-                        a.h4(_t=item.date)
-                        a.p(_t=f'Description - {item.description}')
-                        if len(item.image_links) > 0:
-                            html_images(a, item, is_cache)
-                        if len(item.media_links) > 1:
-                            html_media(a, item)
-
-                        a.br()
-                        a.a(_t='Source Link', href=item.link, style=source_link_style)
-
+    html = ''.join(iter_html(feed, for_pdf, is_cache, image_store, fragment_cache, with_title))
+    if fragment_cache:
+        fragment_cache.save()
     if not for_pdf:
         logging.info('Successfully created the results into a HTML file.')
-    return str(a)
+    return html
+
+
+def write_html(feed: Feed, file: TextIO, is_cache: bool = False, image_store: Optional[ImageStore] = None,
+               fragment_cache: Optional[FragmentCache] = None):
+    """
+    This function streams the HTML document of a Feed object into a file, one item fragment at a time.
+    :param feed: The Feed object to create HTML from.
+    :param file: The text file to which to write.
+    :param is_cache: Whether to take images from cache or from web.
+    :param image_store: The store of cached images, the default store is used if it is not given.
+    :param fragment_cache: The store of rendered item fragments, items are always rendered if it is not given.
+    """
+    file.writelines(iter_html(feed, False, is_cache, image_store, fragment_cache))
+    if fragment_cache:
+        fragment_cache.save()
+    logging.info('Successfully created the results into a HTML file.')
@@ -0,0 +1,223 @@
+"""
+This module contains the ImageStore class which downloads images of RSS items into a content addressed store.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Iterable, Optional
+from urllib.parse import urlsplit
+
+from rss_reader_pckg.rss.metrics import metrics
+
+if TYPE_CHECKING:
+    from rss_reader_pckg.rss.transport import Transport
+
+IMAGE_EXTENSIONS = frozenset(('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.bmp', '.ico', '.avif'))
+STORED_FILE = re.compile(r'[0-9a-f]{64}(\.\w+)?')
+
+
+class ImageStore:
+    """
+    This class downloads images on a pool of workers through the transport shared by the whole application.
+    Every image is stored once under the SHA-256 of its content, and an index maps image urls to the stored files,
+    so images which were already downloaded are skipped and equal images of different urls share a file.
+    The modification time of a stored file is its last access: it is updated whenever the image is downloaded
+    or used by a report, so the least recently used images are the first evicted by `collect_garbage`.
+    If `max_bytes` is given, the store is brought back into that budget after every batch of downloads.
+    """
+
+    def __init__(self, cache_dir: str = 'cache', max_workers: int = 8, transport: Optional['Transport'] = None,
+                 max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.directory = f'{cache_dir}/images'
+        self.max_workers = max_workers
+        self._index_path = f'{self.directory}/index.json'
+        self._index: Optional[dict[str, str]] = None
+        self._lock = threading.Lock()
+        self._transport = transport
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pending: list[Future] = []
+
+    @property
+    def index(self) -> dict[str, str]:
+        """
+        This property lazily reads the index of stored images.
+        :return: A dictionary of stored file names by image url.
+        """
+        if self._index is None:
+            self._index = {}
+            if os.path.exists(self._index_path):
+                with open(self._index_path, 'r', encoding='utf-8') as f:
+                    self._index = json.load(f)
+        return self._index
+
+    def _save_index(self):
+        """
+        This method atomically writes the index of stored images.
+        """
+        with self._lock:
+            tmp_path = f'{self._index_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f)
+            os.replace(tmp_path, self._index_path)
+
+    def is_stored(self, url: str) -> bool:
+        """
+        :param url: An image url.
+        :return: Whether the image was already downloaded.
+        """
+        file_name = self.index.get(url)
+        return file_name is not None and os.path.exists(f'{self.directory}/{file_name}')
+
+    def resolve(self, url: str) -> Optional[str]:
+        """
+        This method finds the cached file of an image.
+        Images cached before the store was introduced are found by the last segment of their url.
+        :param url: An image url.
+        :return: Path of the cached image, or None if the image was never downloaded.
+        """
+        if self.is_stored(url):
+            path = f'{self.directory}/{self.index[url]}'
+            self._touch(path)
+            return path
+        legacy_path = f'{self.cache_dir}/{url.split("/")[-1]}'
+        if url.split('/')[-1] and os.path.isfile(legacy_path):
+            return legacy_path
+        return None
+
+    @staticmethod
+    def _touch(path: str):
+        """
+        This method records an access of a stored image.
+        :param path: Path of the stored image.
+        """
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _extension(url: str) -> str:
+        """
+        :param url: An image url.
+        :return: The extension of the image file, or an empty string if the url has no known image extension.
+        """
+        extension = os.path.splitext(urlsplit(url).path)[1].lower()
+        return extension if extension in IMAGE_EXTENSIONS else ''
+
+    def download(self, url: str) -> Optional[str]:
+        """
+        This method downloads a single image unless it is already stored.
+        :param url: An image url.
+        :return: Name of the stored file, or None if the image could not be downloaded.
+        """
+        import requests
+        if self.is_stored(url):
+            return self.index[url]
+        digest = hashlib.sha256()
+        with metrics.timer('images.download'), tempfile.NamedTemporaryFile('wb', dir=self.directory,
+                                                                           delete=False) as f:
+            try:
+                with self._transport.get(url, stream=True) as res:
+                    is_downloaded = res.status_code == 200
+                    if not is_downloaded:
+                        logging.info(f'Image {url} responded with status {res.status_code}, skipping it.')
+                    else:
+                        for chunk in self._transport.iter_content(res):
+                            digest.update(chunk)
+                            f.write(chunk)
+            except requests.RequestException as e:
+                logging.error(f'Failed to download image {url}: {e}')
+                is_downloaded = False
+        if not is_downloaded:
+            metrics.count('images.failed')
+            os.remove(f.name)
+            return None
+        metrics.count('images.bytes', os.path.getsize(f.name))
+        file_name = f'{digest.hexdigest()}{self._extension(url)}'
+        if os.path.exists(f'{self.directory}/{file_name}'):
+            os.remove(f.name)
+            self._touch(f'{self.directory}/{file_name}')
+        else:
+            os.replace(f.name, f'{self.directory}/{file_name}')
+        with self._lock:
+            self.index[url] = file_name
+        return file_name
+
+    def download_all(self, urls: Iterable[str], background: bool = False):
+        """
+        This method downloads all given images which are not stored yet on the pool of workers.
+        :param urls: Image urls.
+        :param background: If set, the method returns right away and the downloads finish during `wait`.
+        """
+        urls = [url for url in dict.fromkeys(urls) if url and not self.is_stored(url)]
+        if not urls:
+            return
+        if self._pool is None:
+            from rss_reader_pckg.rss.transport import shared_transport
+            os.makedirs(self.directory, exist_ok=True)
+            self._transport = self._transport or shared_transport()
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._pending += [self._pool.submit(self.download, url) for url in urls]
+        logging.info(f'Downloading {len(urls)} new image(s) to the cache.')
+        if not background:
+            self.wait()
+
+    def wait(self):
+        """
+        This method waits for all started downloads and stores the updated index.
+        """
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        wait(pending)
+        self._save_index()
+        logging.info('Downloaded all images to the cache.')
+        if self.max_bytes is not None:
+            self.collect_garbage(max_bytes=self.max_bytes)
+
+    def collect_garbage(self, referenced_urls: Optional[set[str]] = None,
+                        max_bytes: Optional[int] = None) -> tuple[int, int]:
+        """
+        This method removes stored images which are not used anymore, and then the least recently used images
+        until the store fits into its byte budget. Index entries of missing files are dropped as well.
+        :param referenced_urls: Urls of the images of all cached items, if given images of other urls are removed.
+        :param max_bytes: The byte budget of the stored images, if not given it is unlimited.
+        :return: The amount of removed files and the amount of bytes they took.
+        """
+        self.wait()
+        if not os.path.isdir(self.directory):
+            return 0, 0
+        files = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and STORED_FILE.fullmatch(entry.name):
+                stat = entry.stat()
+                files[entry.name] = (stat.st_mtime, stat.st_size)
+        index = {url: file_name for url, file_name in self.index.items()
+                 if file_name in files and (referenced_urls is None or url in referenced_urls)}
+        used = set(index.values())
+        removed = [file_name for file_name in files if file_name not in used]
+        if max_bytes is not None:
+            size = sum(files[file_name][1] for file_name in used)
+            for file_name in sorted(used, key=lambda name: files[name][0]):
+                if size <= max_bytes:
+                    break
+                size -= files[file_name][1]
+                removed.append(file_name)
+            removed_set = set(removed)
+            index = {url: file_name for url, file_name in index.items() if file_name not in removed_set}
+        for file_name in removed:
+            os.remove(f'{self.directory}/{file_name}')
+        if index != self.index:
+            self._index = index
+            self._save_index()
+        reclaimed = sum(files[file_name][1] for file_name in removed)
+        logging.info(f'Removed {len(removed)} image(s) of {reclaimed} bytes from the cache.')
+        return len(removed), reclaimed
@@ -0,0 +1,81 @@
+"""
+This module contains the fast extraction engine which parses lxml item elements into Item objects in a single pass.
+"""
+
+import logging
+from typing import Optional
+
+from lxml import etree
+
+from rss_reader_pckg.rss.dates import format_date, timestamp
+from rss_reader_pckg.rss.feed_formats import item_format
+from rss_reader_pckg.rss.rss_classes import Item
+from rss_reader_pckg.rss.sanitize import ItemContent
+
+
+def extract_item(item: etree._Element) -> Item:
+    """
+    This function walks an lxml `<item>` or `<entry>` element once, collecting its title, date, link, description,
+    images and every url found in its text and attributes. Which elements hold the fields depends on the format
+    of the feed, which is told by the item element itself. It produces the same Item as `RSSParser._parse_item`.
+    :param item: An lxml `<item>` or Atom `<entry>` element.
+    :return: A parsed Item.
+    """
+    item_name = etree.QName(item)
+    feed_format = item_format(item_name.localname, item_name.namespace)
+    field_tags = feed_format.field_tags
+    fields: dict[str, etree._Element] = {}
+    descriptions: dict[str, str] = {}
+    content = ItemContent()
+    for element in item.iter():
+        if not isinstance(element.tag, str):
+            continue
+        is_description = False
+        if element is not item:
+            name = etree.QName(element)
+            local_name = name.localname
+            if local_name in field_tags and feed_format.accepts(local_name, name.namespace):
+                if local_name == 'link':
+                    content.add_image(feed_format.image_link(element.attrib))
+                if local_name not in fields and (local_name != 'link' or feed_format.is_link(element.attrib)):
+                    fields[local_name] = element
+                    is_description = local_name in feed_format.description_tags
+        for value in element.attrib.values():
+            content.add_text(value)
+        if is_description:
+            descriptions[local_name] = content.add_description(_text(element))
+        else:
+            content.add_text(element.text)
+        if element is not item:
+            content.add_text(element.tail)
+
+    for name in feed_format.image_tags:
+        if name in fields:
+            content.add_image(fields[name].get('url'))
+    if 'image' in fields:
+        content.add_image(_text(fields['image']))
+
+    raw_date = next((fields[name].text for name in feed_format.date_tags if name in fields), None)
+    link = fields.get('link')
+    if link is not None:
+        link = link.get(feed_format.link_attribute) if feed_format.link_attribute else link.text
+    guid = _text(fields.get(feed_format.guid_tag)).strip() if feed_format.guid_tag else ''
+    parsed_item = Item(title=_text(fields.get('title')).strip(),
+                       date=format_date(raw_date) if raw_date else None,
+                       link=link,
+                       description=next((descriptions[name] for name in feed_format.description_tags
+                                         if name in descriptions), None),
+                       media_links=content.media,
+                       image_links=content.images,
+                       timestamp=timestamp(raw_date) if raw_date else None,
+                       guid=guid or None)
+    logging.debug('Finished parsing item with title: %s', parsed_item.title_text)
+    return parsed_item
+
+
+def _text(element: Optional[etree._Element]) -> str:
+    """
+    :param element: An lxml element.
+    :return: The whole text inside the element, or an empty string if there is no element.
+    """
+    return ''.join(element.itertext()) if element is not None else ''
@@ -0,0 +1,154 @@
+"""
+This module contains the Metrics registry which records timers and counters of the stages of the application.
+Recording is disabled by default, and then every recording method returns after a single attribute check,
+so the instrumented hot paths cost next to nothing unless `--profile` or `--metrics` is given.
+"""
+
+import json
+import re
+import threading
+import time
+from typing import Optional
+
+
+class Timer:
+    """
+    This class is a context manager which records the duration of its block into a timer of the registry.
+    `count` is the amount of units processed by the block, e.g. parsed items, so timers report the time per unit.
+    """
+    __slots__ = ('metrics', 'name', 'count', 'start')
+
+    def __init__(self, metrics: 'Metrics', name: str, count: int = 1):
+        self.metrics = metrics
+        self.name = name
+        self.count = count
+        self.start: Optional[float] = None
+
+    def __enter__(self) -> 'Timer':
+        if self.metrics.enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.start is not None:
+            self.metrics.observe(self.name, time.perf_counter() - self.start, self.count)
+
+
+class Metrics:
+    """
+    This class collects named timers and counters from all threads of the application.
+    A timer keeps the amount of timed units, their total duration and the longest single observation.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.timers: dict[str, list[float]] = {}
+        self.counters: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def enable(self):
+        """
+        This method starts recording, dropping anything recorded before.
+        """
+        with self._lock:
+            self.timers, self.counters = {}, {}
+        self.enabled = True
+
+    def timer(self, name: str, count: int = 1) -> Timer:
+        """
+        :param name: The name of the timer.
+        :param count: The amount of units processed by the timed block.
+        :return: A context manager timing its block.
+        """
+        return Timer(self, name, count)
+
+    def observe(self, name: str, seconds: float, count: int = 1):
+        """
+        This method records a duration measured elsewhere, e.g. in another process.
+        :param name: The name of the timer.
+        :param seconds: The duration.
+        :param count: The amount of units processed during the duration.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            timer = self.timers.setdefault(name, [0, 0.0, 0.0])
+            timer[0] += count
+            timer[1] += seconds
+            timer[2] = max(timer[2], seconds)
+
+    def count(self, name: str, value: float = 1):
+        """
+        This method increases a counter.
+        :param name: The name of the counter.
+        :param value: The increase.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self) -> dict:
+        """
+        :return: The recorded timers and counters as a JSON serializable dictionary.
+        """
+        with self._lock:
+            timers = {name: {'count': count, 'total_seconds': total, 'mean_seconds': total / count if count else 0.0,
+                             'max_seconds': longest}
+                      for name, (count, total, longest) in sorted(self.timers.items())}
+            return {'timers': timers, 'counters': dict(sorted(self.counters.items()))}
+
+    def to_table(self) -> str:
+        """
+        :return: A summary table of the recorded timers and counters.
+        """
+        snapshot = self.snapshot()
+        lines = [f'{"timer":<18}{"count":>9}{"total ms":>12}{"mean ms":>11}{"max ms":>11}']
+        for name, timer in snapshot['timers'].items():
+            lines.append(f'{name:<18}{timer["count"]:>9}{timer["total_seconds"] * 1000:>12.1f}'
+                         f'{timer["mean_seconds"] * 1000:>11.3f}{timer["max_seconds"] * 1000:>11.1f}')
+        if snapshot['counters']:
+            lines.append(f'{"counter":<18}{"value":>9}')
+            lines += [f'{name:<18}{value:>9g}' for name, value in snapshot['counters'].items()]
+        return '\n'.join(lines)
+
+    def to_json(self) -> str:
+        """
+        :return: The recorded timers and counters in JSON format.
+        """
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """
+        :return: The recorded timers and counters in the Prometheus text format, timers as summaries.
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for name, timer in snapshot['timers'].items():
+            metric = f'rss_reader_{_metric_name(name)}_seconds'
+            lines += [f'# TYPE {metric} summary', f'{metric}_sum {timer["total_seconds"]:.6f}',
+                      f'{metric}_count {timer["count"]}']
+        for name, value in snapshot['counters'].items():
+            metric = f'rss_reader_{_metric_name(name)}_total'
+            lines += [f'# TYPE {metric} counter', f'{metric} {value:g}']
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str):
+        """
+        This method writes the recorded metrics to a file, in JSON format if its name ends with `.json`
+        and in the Prometheus text format otherwise.
+        :param path: Path of the file.
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json() if path.endswith('.json') else self.to_prometheus())
+
+
+def _metric_name(name: str) -> str:
+    """
+    :param name: The name of a timer or a counter.
+    :return: The name with the characters which are not allowed in Prometheus metric names replaced.
+    """
+    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+
+
+metrics = Metrics()
@@ -0,0 +1,50 @@
+"""
+This module contains functions which write the results of the program to the user without building them in memory.
+"""
+
+import logging
+import sys
+from typing import Optional, TextIO
+
+from rss_reader_pckg.rss.metrics import metrics
+from rss_reader_pckg.rss.rss_classes import Feed
+
+OUTPUT_FORMATS = ('text', 'json', 'jsonl')
+
+
+def write_feed(feed: Feed, stream: TextIO, output_format: str = 'text'):
+    """
+    This function writes a feed to a stream one item at a time.
+    The text and JSON formats are equal to printing the representation or `to_json` of the feed,
+    the JSON Lines format writes one compact JSON object per item.
+    :param feed: The feed to write.
+    :param stream: A text stream, e.g. `sys.stdout` or an opened file.
+    :param output_format: One of `text`, `json` or `jsonl`.
+    """
+    if output_format == 'jsonl':
+        chunks = feed.iter_json_lines()
+    elif output_format == 'json':
+        chunks = feed.iter_json()
+    else:
+        chunks = feed.iter_text()
+    with metrics.timer(f'render.{output_format}', len(feed.items)):
+        for chunk in chunks:
+            stream.write(chunk)
+        if output_format != 'jsonl':
+            stream.write('\n')
+        stream.flush()
+
+
+def save_feed(feed: Feed, path: Optional[str] = None, output_format: str = 'text'):
+    """
+    This function writes a feed to a file, or to the standard output if no path is given.
+    :param feed: The feed to write.
+    :param path: Path of the output file.
+    :param output_format: One of `text`, `json` or `jsonl`.
+    """
+    if path is None:
+        write_feed(feed, sys.stdout, output_format)
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        write_feed(feed, f, output_format)
+    logging.info(f'Saved the results to {path}')
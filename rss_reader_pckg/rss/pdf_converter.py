@@ -1,12 +1,36 @@
 """
 This module contains functions to convert an RSS Feed object to PDF.
+Large feeds are split into chunks of items, every chunk is converted on a pool of processes
+and the parts are concatenated into one document, so the memory of a conversion is bounded by its chunk.
 """
 
-import time
-from typing import BinaryIO
+import logging
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import BinaryIO, Optional
 
 from xhtml2pdf import pisa
 
+from rss_reader_pckg.rss.helpers import process_pool_context
+from rss_reader_pckg.rss.html_converter import FragmentCache, iter_html
+from rss_reader_pckg.rss.image_store import ImageStore
+from rss_reader_pckg.rss.rss_classes import Feed
+
+PDF_CHUNK_SIZE = 200
+
+
+def local_link(uri: str, rel: Optional[str] = None) -> str:
+    """
+    This function is called by xhtml2pdf for every linked resource. Cached images are given by absolute paths,
+    so they are embedded from disk whatever the working directory of the converting process is.
+    :param uri: The uri of the resource.
+    :param rel: The uri of the document linking to the resource.
+    :return: The absolute path of a local file, or the uri itself.
+    """
+    return os.path.abspath(uri) if os.path.isfile(uri) else uri
+
 
 def pdf_feed(html: str, file: BinaryIO) -> bool:
     """
@@ -17,6 +41,87 @@ def pdf_feed(html: str, file: BinaryIO) -> bool:
     """
     pisa_status = pisa.CreatePDF(
         html,
-        dest=file)
+        dest=file,
+        link_callback=local_link)
+
+    return pisa_status.err
+
+
+def pdf_part(html: str, path: str) -> bool:
+    """
+    This function converts the HTML of a chunk into a PDF file inside a worker process.
+    :param html: The HTML of the chunk.
+    :param path: Path of the PDF file of the chunk.
+    :return: Success or failure of conversion.
+    """
+    with open(path, 'wb') as f:
+        return bool(pdf_feed(html, f))
+
 
-    return pisa_status.err
\ No newline at end of file
+def pdf_feed_chunks(feed: Feed, file: BinaryIO, image_store: Optional[ImageStore] = None,
+                    fragment_cache: Optional[FragmentCache] = None, chunk_size: int = PDF_CHUNK_SIZE,
+                    workers: Optional[int] = None) -> bool:
+    """
+    This function creates a PDF from a Feed object chunk by chunk. The HTML of the chunks is rendered
+    while earlier chunks are being converted, and at most two chunks per worker wait for conversion.
+    Images are taken from the image store when they were cached, and from the web otherwise.
+    :param feed: The Feed object to create PDF from.
+    :param file: The file object to which to write.
+    :param image_store: The store of cached images, the default store is used if it is not given.
+    :param fragment_cache: The store of rendered item fragments, items are always rendered if it is not given.
+    :param chunk_size: The amount of items converted at once.
+    :param workers: The amount of converting processes, by default one per CPU.
+    :return: Success or failure of conversion.
+    """
+    image_store = image_store or ImageStore()
+    chunks = [feed.items[start:start + chunk_size] for start in range(0, len(feed.items), chunk_size)] or [[]]
+
+    def chunk_html(position: int) -> str:
+        chunk_feed = Feed(feed.title, feed.url, chunks[position])
+        return ''.join(iter_html(chunk_feed, True, True, image_store, fragment_cache, with_title=position == 0))
+
+    if len(chunks) == 1:
+        is_failed = bool(pdf_feed(chunk_html(0), file))
+        if fragment_cache:
+            fragment_cache.save()
+        return is_failed
+
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    logging.info(f'Converting {len(feed.items)} item(s) to PDF in {len(chunks)} chunks on {workers} process(es).')
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [os.path.join(directory, f'part_{position}.pdf') for position in range(len(chunks))]
+        if workers == 1:
+            failures = [pdf_part(chunk_html(position), path) for position, path in enumerate(paths)]
+        else:
+            failures = []
+            with ProcessPoolExecutor(max_workers=workers, mp_context=process_pool_context()) as pool:
+                pending: deque[Future] = deque()
+                for position, path in enumerate(paths):
+                    if len(pending) >= 2 * workers:
+                        failures.append(pending.popleft().result())
+                    pending.append(pool.submit(pdf_part, chunk_html(position), path))
+                failures += [future.result() for future in pending]
+        if fragment_cache:
+            fragment_cache.save()
+        return _merge_parts(paths, file) or any(failures)
+
+
+def _merge_parts(paths: list[str], file: BinaryIO) -> bool:
+    """
+    This function concatenates PDF files into one document.
+    :param paths: Paths of the PDF files in the order of their pages.
+    :param file: The file object to which to write.
+    :return: Success or failure of concatenation.
+    """
+    from pypdf import PdfWriter
+    writer = PdfWriter()
+    try:
+        for path in paths:
+            writer.append(path)
+        writer.write(file)
+    except Exception as e:
+        logging.error(f'Failed to concatenate the parts of the PDF: {e}')
+        return True
+    finally:
+        writer.close()
+    return False
@@ -0,0 +1,248 @@
+"""
+This module contains the IngestPipeline class which fetches, parses and caches many RSS feeds in three stages:
+feeds are downloaded on threads, parsed on a pool of processes and written to the cache by a single writer.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+from rss_reader_pckg.rss.fetcher import FeedFetcher, FetchResult
+from rss_reader_pckg.rss.helpers import process_pool_context
+from rss_reader_pckg.rss.metrics import metrics
+from rss_reader_pckg.rss.rss_cache import CacheReader
+from rss_reader_pckg.rss.rss_classes import Feed, Item
+
+
+def parse_feed_content(content: bytes, engine: str = 'lxml', limit: Optional[int] = None) -> tuple[str, list[tuple]]:
+    """
+    This function parses an RSS document inside a worker process.
+    Items are returned as plain records, which are much cheaper to send between processes than Item objects.
+    :param content: The RSS document.
+    :param engine: The engine used to extract the fields of the items, `bs4` or `lxml`.
+    :param limit: Limit the number of items to be parsed.
+    :return: The title of the channel and the records of its items.
+    """
+    if engine == 'bs4':
+        from rss_reader_pckg.rss.rss_parser import parse_soup
+        title, items = parse_soup(content, limit)
+        return title, [item.to_record() for item in items]
+    from rss_reader_pckg.rss.lxml_extractor import extract_item
+    from rss_reader_pckg.rss.stream_parser import StreamParser
+    stream_parser = StreamParser()
+    records = []
+    for element in stream_parser.iter_items([content]):
+        records.append(extract_item(element).to_record())
+        if limit and len(records) >= limit:
+            break
+    return stream_parser.title, records
+
+
+def parse_feed_timed(content: bytes, engine: str = 'lxml',
+                     limit: Optional[int] = None) -> tuple[str, list[tuple], float]:
+    """
+    This function parses an RSS document inside a worker process like `parse_feed_content` and measures the parsing,
+    because the metrics of worker processes are not recorded.
+    :param content: The RSS document.
+    :param engine: The engine used to extract the fields of the items, `bs4` or `lxml`.
+    :param limit: Limit the number of items to be parsed.
+    :return: The title of the channel, the records of its items and the duration of the parsing in seconds.
+    """
+    start = time.perf_counter()
+    title, records = parse_feed_content(content, engine, limit)
+    return title, records, time.perf_counter() - start
+
+
+@dataclass
+class IngestResult:
+    """
+    A class to represent the outcome of ingesting a single feed.
+    `complete` is false when the parsing of the feed may have been cut short by the limit.
+    """
+    source: str
+    feed: Optional[Feed] = None
+    error: Optional[str] = None
+    not_modified: bool = False
+    complete: bool = True
+    fetch_result: Optional[FetchResult] = field(default=None, repr=False)
+
+
+@dataclass
+class IngestStats:
+    """
+    A class to represent the totals of a run of the pipeline.
+    """
+    feeds: int = 0
+    items: int = 0
+    not_modified: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def items_per_second(self) -> float:
+        return self.items / self.seconds if self.seconds else 0.0
+
+
+class IngestPipeline:
+    """
+    This class ingests feeds in three stages connected by bounded queues:
+        - fetch: feeds are downloaded on a pool of threads, or read from disk when a source is a local file,
+        - parse: documents are parsed on a pool of processes, so parsing is not limited by the GIL,
+        - write: parsed feeds are cached in batches by the calling thread.
+    A stage waits when the next one falls behind, so at most `queue_size` downloaded documents
+    and `2 * parse_workers` parsed feeds are held in memory at once.
+    """
+
+    def __init__(self, rss_cache: CacheReader, fetcher: Optional[FeedFetcher] = None,
+                 parse_workers: Optional[int] = None, engine: str = 'lxml', queue_size: int = 16,
+                 batch_size: int = 8):
+        self.rss_cache = rss_cache
+        self.fetcher = fetcher if fetcher else FeedFetcher()
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.engine = engine
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+
+    def _fetch(self, source: str) -> FetchResult:
+        """
+        This method downloads a feed, or reads it if the source is a local file.
+        :param source: The url or the path of the RSS feed.
+        :return: The result of fetching the feed.
+        """
+        if os.path.isfile(source):
+            with open(source, 'rb') as f:
+                return FetchResult(source, f.read(), 200)
+        return self.fetcher.safe_fetch(source, self.rss_cache.validators.get(source))
+
+    def _fetch_stage(self, sources: list[str], fetched: queue.Queue):
+        """
+        This method downloads all sources on the fetcher threads, waiting while the fetched queue is full.
+        :param sources: The urls and paths of the RSS feeds.
+        :param fetched: The queue receiving the results of fetching.
+        """
+        def fetch_one(source: str):
+            try:
+                result = self._fetch(source)
+            except Exception as e:
+                result = FetchResult(source, error=e)
+            fetched.put(result)
+
+        with ThreadPoolExecutor(max_workers=min(self.fetcher.max_workers, len(sources))) as pool:
+            list(pool.map(fetch_one, sources))
+
+    def _parse_stage(self, count: int, fetched: queue.Queue, parsed: queue.Queue, pool: ProcessPoolExecutor,
+                     slots: threading.BoundedSemaphore, limit: Optional[int]):
+        """
+        This method sends fetched documents to the process pool, waiting while all parse slots are taken.
+        Results which need no parsing are passed on right away. If the pool breaks, e.g. because a worker
+        was killed, this document and all the remaining ones are passed on as failed.
+        :param count: The amount of sources.
+        :param fetched: The queue of fetch results.
+        :param parsed: The queue receiving the parsed feeds.
+        :param pool: The pool of parsing processes.
+        :param slots: A semaphore limiting the parsed feeds not written yet.
+        :param limit: Limit the number of items to be parsed from each feed.
+        """
+        pool_error: Optional[Exception] = None
+        for _ in range(count):
+            result: FetchResult = fetched.get()
+            slots.acquire()
+            if result.not_modified:
+                parsed.put(IngestResult(result.url, not_modified=True, fetch_result=result))
+            elif not result.ok:
+                parsed.put(IngestResult(result.url, error=str(result.error or f'status {result.status}')))
+            elif pool_error is not None:
+                parsed.put(IngestResult(result.url, error=f'the parsing pool is broken: {pool_error!r}'))
+            else:
+                try:
+                    future = pool.submit(parse_feed_timed, result.content, self.engine, limit)
+                except (BrokenExecutor, RuntimeError) as e:
+                    pool_error = e
+                    parsed.put(IngestResult(result.url, error=repr(e)))
+                    continue
+                result.content = None
+                future.add_done_callback(lambda done, fetch_result=result: parsed.put((fetch_result, done)))
+
+    @staticmethod
+    def _to_ingest_result(entry, limit: Optional[int] = None) -> IngestResult:
+        """
+        :param entry: An IngestResult, or a fetch result with the future of its parsing.
+        :param limit: Limit the number of items parsed from each feed.
+        :return: The IngestResult of the entry.
+        """
+        if isinstance(entry, IngestResult):
+            return entry
+        fetch_result, future = entry
+        if future.exception() is not None:
+            return IngestResult(fetch_result.url, error=repr(future.exception()))
+        title, records, seconds = future.result()
+        metrics.observe('parse', seconds, len(records))
+        feed = Feed(title or fetch_result.url, fetch_result.url, [Item.from_record(record) for record in records])
+        return IngestResult(fetch_result.url, feed, complete=not (limit and len(records) >= limit),
+                            fetch_result=fetch_result)
+
+    def _write(self, batch: list[IngestResult]):
+        """
+        This method caches a batch of parsed feeds with a single write and stores their validators.
+        Validators of the feeds cut short by the limit are not stored, so their next fetch caches the rest.
+        :param batch: Successfully parsed feeds.
+        """
+        self.rss_cache.cache_feeds([result.feed for result in batch])
+        for result in batch:
+            fetch_result = result.fetch_result
+            if result.complete and (fetch_result.etag or fetch_result.last_modified):
+                self.rss_cache.validators.save(fetch_result.url, fetch_result.etag, fetch_result.last_modified)
+
+    def run(self, sources: list[str], limit: Optional[int] = None) -> tuple[list[IngestResult], IngestStats]:
+        """
+        This method ingests all given feeds and caches their items.
+        :param sources: The urls of the RSS feeds, or paths of saved RSS documents.
+        :param limit: Limit the number of items to be parsed from each feed.
+        :return: The result of every source in the order of `sources`, and the totals of the run.
+        """
+        start = time.perf_counter()
+        sources = list(dict.fromkeys(sources))
+        results: dict[str, IngestResult] = {}
+        if not sources:
+            return [], IngestStats()
+        fetched = queue.Queue(maxsize=self.queue_size)
+        parsed = queue.Queue()
+        slots = threading.BoundedSemaphore(2 * self.parse_workers)
+        with ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=process_pool_context()) as pool:
+            stages = [threading.Thread(target=self._fetch_stage, args=(sources, fetched), daemon=True),
+                      threading.Thread(target=self._parse_stage,
+                                       args=(len(sources), fetched, parsed, pool, slots, limit), daemon=True)]
+            for stage in stages:
+                stage.start()
+            batch = []
+            for _ in range(len(sources)):
+                result = self._to_ingest_result(parsed.get(), limit)
+                slots.release()
+                results[result.source] = result
+                if result.feed is not None:
+                    batch.append(result)
+                if len(batch) >= self.batch_size:
+                    self._write(batch)
+                    batch = []
+            if batch:
+                self._write(batch)
+            for stage in stages:
+                stage.join()
+        self.rss_cache.image_store.wait()
+
+        ordered = [results[source] for source in sources]
+        stats = IngestStats(feeds=sum(result.feed is not None for result in ordered),
+                            items=sum(len(result.feed.items) for result in ordered if result.feed),
+                            not_modified=sum(result.not_modified for result in ordered),
+                            failed=sum(result.error is not None for result in ordered),
+                            seconds=time.perf_counter() - start)
+        for result in ordered:
+            if result.error is not None:
+                logging.error(f'Skipping {result.source}, it could not be ingested: {result.error}')
+        logging.info(f'Ingested {stats.items} item(s) of {stats.feeds} feed(s) in {stats.seconds:.2f}s.')
+        return ordered, stats
@@ -2,52 +2,105 @@
 This module contains classes to represent the caching of the RSS Feeds.
 """
 
+import json
 import logging
 import os
-import pickle
-import shutil
-import sys
 from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Optional
 
-import requests
-from dateutil import parser
-
+# RSSCache is imported here as well, so caches pickled before the backends were introduced can still be loaded.
+from rss_reader_pckg.rss.cache_backends import CACHE_BACKENDS, CacheBackend, RSSCache, pub_day  # noqa: F401
+from rss_reader_pckg.rss.cache_backends import PickleCacheBackend, SQLiteCacheBackend
 from rss_reader_pckg.rss.helpers import validate_method_args
-
+from rss_reader_pckg.rss.image_store import ImageStore
+from rss_reader_pckg.rss.metrics import metrics
 from rss_reader_pckg.rss.rss_classes import Feed, Item
+from rss_reader_pckg.rss.rss_exception import RSSException
 
 
-@dataclass
-class RSSCache:
+class ValidatorStore:
     """
-    A class to represent the RSS feed for caching and its methods.
+    This class persists the `ETag` and `Last-Modified` validators of every fetched feed in a JSON file.
     """
-    rss_feeds: list[Feed]
 
-    def append(self, new_feed: Feed):
+    def __init__(self, path: str):
+        self._path = path
+        self._validators: Optional[dict[str, dict]] = None
+
+    @property
+    def validators(self) -> dict[str, dict]:
+        """
+        This property lazily reads the stored validators.
+        :return: A dictionary of validators by feed url.
+        """
+        if self._validators is None:
+            self._validators = {}
+            if os.path.exists(self._path):
+                with open(self._path, 'r', encoding='utf-8') as f:
+                    self._validators = json.load(f)
+        return self._validators
+
+    def get(self, url: str) -> Optional[dict]:
         """
-        This method appends a new parsed feed to an existing RSSCache object.
-        :param new_feed: A new parsed Feed object
+        :param url: The url of the RSS feed.
+        :return: The validators of the previous fetch of `url`, if there was one.
         """
-        is_existing_title = False
-        for feed in self.rss_feeds:
-            if new_feed.title == feed.title:
-                unique_items = self._get_titles_set(feed.items)
-                diff_titles = self._get_titles_set(new_feed.items).difference(unique_items)
-                feed.items += [current_item for current_item in new_feed.items
-                               if current_item.title in diff_titles]
-                is_existing_title = True
-        if not is_existing_title:
-            self.rss_feeds.append(new_feed)
+        return self.validators.get(url)
 
-    @staticmethod
-    def _get_titles_set(items: list[Item]) -> set[str]:
+    def save(self, url: str, etag: Optional[str], last_modified: Optional[str]):
         """
-        This method returns a set object containing the titles of rss items.
-        :param items: RSS Items list
-        :return: The set of titles.
+        This method stores the validators of a successful fetch, feeds without any validators are forgotten.
+        :param url: The url of the RSS feed.
+        :param etag: The `ETag` header of the response.
+        :param last_modified: The `Last-Modified` header of the response.
         """
-        return set(map(lambda item: item.title.value, items))
+        if etag or last_modified:
+            self.validators[url] = {'etag': etag, 'last_modified': last_modified}
+        elif self.validators.pop(url, None) is None:
+            return
+        tmp_path = f'{self._path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.validators, f)
+        os.replace(tmp_path, self._path)
+        logging.info(f'Stored validators of {url}')
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    A class to represent the limits of the cache, limits which are not set are not enforced.
+    `max_age` is in days and applies to the publish dates of the items, `max_items` applies to every feed
+    and `image_budget` is the amount of bytes of stored images. The limits are always enforced by
+    `CacheReader.collect_garbage`, and after every write as well if `on_write` is set.
+    """
+    max_age: Optional[int] = None
+    max_items: Optional[int] = None
+    image_budget: Optional[int] = None
+    on_write: bool = False
+
+    def oldest_day(self, today: Optional[date] = None) -> Optional[str]:
+        """
+        :param today: The current day, today by default.
+        :return: The first publish day of the kept items in the format of YYYYMMDD, or None if there is no max age.
+        """
+        if self.max_age is None:
+            return None
+        return ((today or date.today()) - timedelta(days=self.max_age)).strftime('%Y%m%d')
+
+
+@dataclass
+class GarbageReport:
+    """
+    A class to represent the results of a garbage collection of the cache.
+    """
+    items: int
+    images: int
+    reclaimed_bytes: int
+
+    def __str__(self) -> str:
+        return (f'Removed {self.items} news and {self.images} image(s) from the cache, '
+                f'reclaimed {self.reclaimed_bytes / 1024 / 1024:.2f} MiB.')
 
 
 class CacheReader:
@@ -55,81 +108,162 @@ class CacheReader:
     This class represents the methods for caching rss data and retrieving already cached data.
     """
 
-    def __init__(self, cache_path: str = 'rss_cache.bin'):
-        self.image_paths = None
-        self._cache_path = f'cache/{cache_path}'
-
-        if not os.path.exists('cache'):
-            os.mkdir('cache')
+    def __init__(self, cache_path: Optional[str] = None, cache_dir: str = 'cache', backend: str = 'sqlite',
+                 image_workers: int = 8, background_images: bool = False,
+                 retention: Optional[RetentionPolicy] = None):
+        if backend not in CACHE_BACKENDS:
+            logging.error('Unknown cache backend was requested!')
+            raise RSSException(f'Cache backend must be one of: {", ".join(CACHE_BACKENDS)}.', is_logged=True)
+        backend_class = CACHE_BACKENDS[backend]
+        self.cache_dir = cache_dir
+        self.retention = retention or RetentionPolicy()
+        self.image_store = ImageStore(cache_dir, image_workers,
+                                      max_bytes=self.retention.image_budget if self.retention.on_write else None)
+        self.background_images = background_images
+        self._cache_path = f'{cache_dir}/{cache_path or backend_class.default_file}'
+        self.backend: CacheBackend = backend_class(self._cache_path)
+        self.validators = ValidatorStore(f'{cache_dir}/validators.json')
 
-    @property
-    def cache(self) -> RSSCache:
-        """
-        This cache property retrieves the RSS feed data from a pickle file.
-        :return: An instance of the RSSCache class.
-        """
-        logging.info('Reading cached results.')
-        if os.path.exists(self._cache_path):
-            with open(self._cache_path, 'rb') as c:
-                logging.info('Loading cached data.')
-                return pickle.load(c)
-        else:
-            raise FileNotFoundError
+        if not os.path.exists(cache_dir):
+            os.mkdir(cache_dir)
+        if isinstance(self.backend, SQLiteCacheBackend) and not self.backend.exists():
+            self._import_pickle_cache()
 
-    @cache.setter
-    def cache(self, obj: RSSCache):
+    def _import_pickle_cache(self):
         """
-        This cache setter is used to store the RSS feed data in a pickle file.
-        :param obj:RSSCache: RSSCache object to be stored in the cache file.
+        This method copies the news of a pickle cache, the default of older versions, into a new SQLite cache,
+        so upgrading keeps the cached history. The pickle files are left in place.
         """
-        with open(self._cache_path, 'wb') as c:
-            sys.setrecursionlimit(10000)
-            pickle.dump(obj, c)
-            logging.info('Finished caching data.')
+        legacy = PickleCacheBackend(f'{self.cache_dir}/{PickleCacheBackend.default_file}')
+        if not legacy.exists():
+            return
+        try:
+            feeds = legacy.cache.rss_feeds
+        except Exception as e:
+            logging.error(f'The pickle cache {legacy.path} could not be imported: {e!r}')
+            return
+        self.backend.append_many(feeds)
+        logging.info(f'Imported {sum(len(feed.items) for feed in feeds)} item(s) of {len(feeds)} feed(s) '
+                     f'from the pickle cache {legacy.path} into {self._cache_path}.')
 
     @validate_method_args
     def cache_results(self, current_items: Feed):
         """
-        This method will serialize passed results into a BIN file along with the existing cache.
+        This method will store passed results in the cache backend along with the existing cache.
         :param current_items: Current feed items to add to cache.
         """
-        for item in current_items.items:
-            self.download_images(item)
-        existing_cache = None
-        if os.path.exists(self._cache_path) and os.path.getsize(self._cache_path):
-            existing_cache = self.cache
-            existing_cache.append(current_items)
-        else:
-            current_items = RSSCache([current_items])
-        self.cache = existing_cache if existing_cache else current_items
+        current_items = self._retained(current_items)
+        self.download_images(current_items.items)
+        with metrics.timer('cache.save', len(current_items.items)):
+            self.backend.append(current_items)
         logging.info(f'Parsing results were successfully cached to: {self._cache_path}')
+        self._evict_on_write()
+
+    def cache_feeds(self, feeds: list[Feed]):
+        """
+        This method stores several feeds in the cache backend with a single write.
+        :param feeds: Parsed Feed objects to add to cache.
+        """
+        feeds = [self._retained(feed) for feed in feeds]
+        self.download_images([item for feed in feeds for item in feed.items])
+        with metrics.timer('cache.save', sum(len(feed.items) for feed in feeds)):
+            self.backend.append_many(feeds)
+        logging.info(f'{len(feeds)} feed(s) were successfully cached to: {self._cache_path}')
+        self._evict_on_write()
+
+    def _retained(self, feed: Feed) -> Feed:
+        """
+        This method leaves out the items which are too old to be cached when the retention is enforced on write,
+        so they are not stored and evicted again by every write.
+        :param feed: A parsed Feed object.
+        :return: The feed with the items which may be cached.
+        """
+        oldest_day = self.retention.oldest_day() if self.retention.on_write else None
+        if oldest_day is None:
+            return feed
+        return Feed(feed.title, feed.url, [item for item in feed.items if (pub_day(item) or oldest_day) >= oldest_day])
+
+    def _evict_on_write(self):
+        """
+        This method enforces the item limits of the retention policy after a write, if it is enabled.
+        The image budget is enforced by the image store once its downloads are finished.
+        """
+        if self.retention.on_write and (self.retention.max_age is not None or self.retention.max_items is not None):
+            self.backend.evict(self.retention.oldest_day(), self.retention.max_items)
+
+    def _backend_size(self) -> int:
+        """
+        :return: The amount of bytes taken by the files of the cache backend.
+        """
+        return sum(os.path.getsize(path) for path in self.backend.files() if os.path.exists(path))
+
+    def collect_garbage(self) -> GarbageReport:
+        """
+        This method enforces the retention policy: it removes the news which are too old or exceed the amount
+        of news kept of their feed, compacts the cache backend, and removes the images which are not used by any
+        cached news anymore and the least recently used images above the image budget.
+        :return: The amounts of removed news and images and of reclaimed bytes.
+        """
+        size = self._backend_size()
+        items = self.backend.evict(self.retention.oldest_day(), self.retention.max_items)
+        self.backend.compact()
+        reclaimed = size - self._backend_size()
+        images, image_bytes = self.image_store.collect_garbage(self.backend.image_urls(), self.retention.image_budget)
+        report = GarbageReport(items, images, reclaimed + image_bytes)
+        logging.info(str(report))
+        return report
 
-    def download_images(self, item: Item):
+    def download_images(self, items: list[Item]):
         """
-        This method downloads all available images into the cache folder.
-        :param item: An RSS Item object.
+        This method downloads all available images of the items into the image store of the cache.
+        Images which are already stored are not downloaded again.
+        :param items: A list of RSS Item objects.
         """
-        self.image_paths = [image_path.value.split('/')[-1] for image_path in item.image_links.elements]
-        for image_path, image_link in zip(self.image_paths, item.image_links.elements):
-            res = requests.get(image_link.value, stream=True)
-            if res.status_code == 200:
-                with open(f'cache/{image_path}', 'wb') as f:
-                    shutil.copyfileobj(res.raw, f)
-        logging.info('Downloaded all images to the cache.')
+        urls = [url for item in items for url in item.image_urls]
+        self.image_store.download_all(urls, background=self.background_images)
 
-    def fetch_by_filters(self, date: str, url: str) -> list[Item]:
+    def fetch_by_filters(self, date: str, url: Optional[str], limit: Optional[int] = None) -> list[Item]:
         """
         This method fetches news from cache by date and url.
         :param date: A date string.
         :param url: An RSS url.
+        :param limit: The amount of news to fetch.
         :return: A list of Item objects.
         """
-        feed_list = []
-        for feed in self.cache.rss_feeds:
-            if url and url != feed.url:
-                continue
-            for item in feed.items:
-                item_date = parser.parse(item.date.value).strftime('%Y%m%d')
-                if item_date == date:
-                    feed_list.append(item)
-        return feed_list
+        with metrics.timer('cache.load'):
+            return self.backend.fetch_by_filters(date, url, limit)
+
+    def fetch_by_dates(self, start: str, end: str, url: Optional[str], limit: Optional[int] = None) -> list[Item]:
+        """
+        This method fetches news from cache published between two days and by url.
+        :param start: The first day in the format of YYYYMMDD.
+        :param end: The last day in the format of YYYYMMDD.
+        :param url: An RSS url.
+        :param limit: The amount of news to fetch.
+        :return: A list of Item objects.
+        """
+        with metrics.timer('cache.load'):
+            return self.backend.fetch_by_dates(start, end, url, limit)
+
+    def search(self, query: str, start: Optional[str], end: Optional[str], url: Optional[str],
+               limit: Optional[int]) -> list[Item]:
+        """
+        This method finds cached news by the words of their titles and descriptions.
+        :param query: The searched words.
+        :param start: The first day in the format of YYYYMMDD, if not given news of all days are searched.
+        :param end: The last day in the format of YYYYMMDD, if not given news of all days are searched.
+        :param url: An RSS url.
+        :param limit: The amount of news to find.
+        :return: A list of Item objects, the best matches first.
+        """
+        with metrics.timer('cache.search'):
+            return self.backend.search(query, start, end, url, limit)
+
+    def fetch_feed(self, url: str) -> Optional[Feed]:
+        """
+        This method fetches a whole feed from cache by its url.
+        :param url: An RSS url.
+        :return: The cached Feed object, or None if the feed was never cached.
+        """
+        with metrics.timer('cache.load'):
+            return self.backend.fetch_feed(url)
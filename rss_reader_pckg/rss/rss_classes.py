@@ -2,11 +2,12 @@
 This module contains classes to represent and manipulate RSS data.
 """
 
+import hashlib
 import json
 import logging
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import Iterable, Iterator, Optional, Union
 
 
 class ElementType(Enum):
@@ -69,17 +70,122 @@ class ElementCollection:
         return repr_str
 
 
-@dataclass
+def _text(value: Union[Element, str, None]) -> Optional[str]:
+    """
+    :param value: An Element or its plain value.
+    :return: The plain value as a built-in string, so no string subclass keeps its parsed document alive.
+    """
+    value = value.value if isinstance(value, Element) else value
+    return None if value is None else str(value)
+
+
+def _urls(value: Union[ElementCollection, Iterable[str], None]) -> tuple[str, ...]:
+    """
+    :param value: An ElementCollection or an iterable of plain urls.
+    :return: A tuple of the urls which are not empty.
+    """
+    if value is None:
+        return ()
+    if isinstance(value, ElementCollection):
+        return tuple(str(element.value) for element in value.elements if element.value)
+    return tuple(str(url) for url in value if url)
+
+
 class Item:
     """
     A class to represent an Item with its Elements.
+    The values are kept as plain strings and tuples of urls in slots, the Elements and ElementCollections
+    are only created when they are accessed.
     """
-    title: Element
-    date: Element
-    link: Element
-    description: Element
-    media_links: ElementCollection
-    image_links: ElementCollection
+    __slots__ = ('title_text', 'date_text', 'link_text', 'description_text', 'media_urls', 'image_urls',
+                 'timestamp', 'guid')
+
+    def __init__(self, title: Union[Element, str, None], date: Union[Element, str, None],
+                 link: Union[Element, str, None], description: Union[Element, str, None],
+                 media_links: Union[ElementCollection, Iterable[str], None],
+                 image_links: Union[ElementCollection, Iterable[str], None], timestamp: Optional[float] = None,
+                 guid: Optional[str] = None):
+        self.title_text = _text(title)
+        self.date_text = _text(date)
+        self.link_text = _text(link)
+        self.description_text = _text(description)
+        self.media_urls = _urls(media_links)
+        self.image_urls = _urls(image_links)
+        self.timestamp = timestamp
+        self.guid = _text(guid)
+
+    @property
+    def key(self) -> str:
+        """
+        The key identifies an item inside its feed: it is the guid of the item, or its link if there is no guid,
+        or a hash of its title, date and description if there is neither.
+        Guids and links are not prefixed, so an item cached by its link is found again when its guid is the link.
+        :return: The key of the item.
+        """
+        guid = self.guid.strip() if self.guid else None
+        if guid:
+            return guid
+        link = self.link_text.strip() if self.link_text else None
+        if link:
+            return link
+        content = '\x1f'.join(value or '' for value in (self.title_text, self.date_text, self.description_text))
+        return f'sha1:{hashlib.sha1(content.encode()).hexdigest()}'
+
+    @property
+    def title(self) -> Element:
+        return Element(ElementType.TITLE, self.title_text)
+
+    @property
+    def date(self) -> Element:
+        return Element(ElementType.PUB_DATE, self.date_text)
+
+    @property
+    def link(self) -> Element:
+        return Element(ElementType.LINK, self.link_text)
+
+    @property
+    def description(self) -> Element:
+        return Element(ElementType.DESCRIPTION, self.description_text)
+
+    @property
+    def media_links(self) -> ElementCollection:
+        return ElementCollection(ElementType.MEDIA, [Element(ElementType.MEDIA, url) for url in self.media_urls])
+
+    @property
+    def image_links(self) -> ElementCollection:
+        return ElementCollection(ElementType.IMAGE, [Element(ElementType.IMAGE, url) for url in self.image_urls])
+
+    def to_record(self) -> tuple:
+        """
+        :return: A plain tuple with all values of the Item.
+        """
+        return (self.title_text, self.date_text, self.link_text, self.description_text, self.media_urls,
+                self.image_urls, self.timestamp, self.guid)
+
+    @classmethod
+    def from_record(cls, record: tuple) -> 'Item':
+        """
+        :param record: A tuple created by `to_record`.
+        :return: The Item with the values of the record.
+        """
+        return cls(*record)
+
+    def __getstate__(self) -> tuple:
+        return self.to_record()
+
+    def __setstate__(self, state: Union[tuple, dict]):
+        if isinstance(state, dict):
+            # Items pickled before the slots were introduced keep their Elements in a dictionary.
+            state = (state['title'], state['date'], state['link'], state['description'], state['media_links'],
+                     state['image_links'], state.get('timestamp'), state.get('guid'))
+        Item.__init__(self, *state)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Item):
+            return NotImplemented
+        return self.to_record() == other.to_record()
+
+    __hash__ = None
 
     @property
     def value(self) -> dict:
@@ -87,13 +193,13 @@ class Item:
         Get the value's of an Item's Elements in a form of a dictionary.
         :return: Item's value dictionary
         """
-        return {'title': self.title.value,
+        return {'title': self.title_text,
                 'content': {
-                    'date': self.date.value,
-                    'link': self.link.value,
-                    'description': self.description.value,
-                    'media': [media_link.value for media_link in self.media_links.elements if media_link.value],
-                    'images': [image_link.value for image_link in self.image_links.elements if image_link.value]}
+                    'date': self.date_text,
+                    'link': self.link_text,
+                    'description': self.description_text,
+                    'media': list(self.media_urls),
+                    'images': list(self.image_urls)}
                 }
 
     def __repr__(self) -> str:
@@ -124,24 +230,47 @@ class Feed:
 
                 :return: A representation of an RSS feed.
                 """
-        json_dict = {
-            'title': self.title,
-            'items': [item.value for item in self.items]
-        }
-        if self.url:
-            json_dict['url'] = self.url
+        return ''.join(self.iter_json())
+
+    def iter_json(self) -> Iterator[str]:
+        """
+        This method produces the JSON representation of the feed piece by piece, one item at a time.
+        The joined pieces are equal to `json.dumps` of the whole feed with an indent of 2.
+        :return: An iterator over the pieces of the JSON document.
+        """
         logging.info('Retrieving results in JSON format')
-        return json.dumps(json_dict, indent=2)
+        yield f'{{\n  "title": {json.dumps(self.title)},\n  "items": ['
+        for item_index, item in enumerate(self.items):
+            item_json = json.dumps(item.value, indent=2).replace('\n', '\n    ')
+            yield f'{"," if item_index else ""}\n    {item_json}'
+        yield '\n  ]' if self.items else ']'
+        if self.url:
+            yield f',\n  "url": {json.dumps(self.url)}'
+        yield '\n}'
 
-    def __repr__(self):
-        repr_str = ''
+    def iter_json_lines(self) -> Iterator[str]:
+        """
+        This method produces a compact JSON object for every item, each on its own line.
+        :return: An iterator over the lines.
+        """
+        logging.info('Retrieving results in JSON Lines format')
+        for item in self.items:
+            yield json.dumps(item.value, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+    def iter_text(self) -> Iterator[str]:
+        """
+        This method produces the regular representation of the feed piece by piece, one item at a time.
+        :return: An iterator over the pieces of the representation.
+        """
         if not self.items:
-            repr_str += 'There were no items to fetch.'
-            return repr_str
+            yield 'There were no items to fetch.'
+            return
         if self.url:
-            repr_str += f'Feed URL: {self.url}\n'
-        repr_str += f'Feed Title: {self.title}\n\n'
+            yield f'Feed URL: {self.url}\n'
+        yield f'Feed Title: {self.title}\n\n'
         for item in self.items:
-            repr_str += repr(item)
+            yield repr(item)
         logging.info('Printing results to the user in regular format')
-        return repr_str
+
+    def __repr__(self):
+        return ''.join(self.iter_text())
@@ -5,20 +5,44 @@ This module contains the RSSParser class which performs all main actions and par
 import logging
 import os
 import re
-from typing import Optional
+from typing import TYPE_CHECKING, Iterable, Optional
 
 from bs4 import BeautifulSoup
-from bs4.element import PageElement, ResultSet
-import requests
-from dateutil import parser
-from dateutil.parser import ParserError
-
-from .helpers import validate_method_args, validate_limit, validate_url
-from .html_converter import html_feed
-from .pdf_converter import pdf_feed
+from bs4.element import PageElement, ResultSet, Tag
+
+from .dates import format_date, parse_date, timestamp
+from .feed_formats import FeedFormat, detect_format, item_format
+from .fetcher import FeedFetcher, FetchResult
+from .helpers import schedule_number, validate_method_args, validate_limit, validate_url
+from .metrics import metrics
 from .rss_cache import CacheReader
 from .rss_classes import Item, Element, ElementType, ElementCollection, Feed
 from .rss_exception import RSSException
+from .sanitize import ItemContent
+
+if TYPE_CHECKING:
+    from lxml import etree
+
+    from .html_converter import FragmentCache
+
+# lxml and the HTML and PDF converters are imported by the methods which use them,
+# so commands which never stream a feed or convert the results do not pay for loading them.
+
+
+ENGINES = ('bs4', 'lxml')
+
+
+def parse_soup(content: bytes, limit: Optional[int] = None) -> tuple[str, list[Item]]:
+    """
+    This function parses the items of an RSS document with the bs4 engine, without requesting or caching anything.
+    :param content: The RSS document.
+    :param limit: Limit the number of items to be parsed.
+    :return: The title of the channel and its parsed items.
+    """
+    soup_parser = RSSParser.__new__(RSSParser)
+    soup_parser.load_soup(content)
+    items = [soup_parser._parse_item(item) for item in soup_parser.items(limit)]
+    return str(soup_parser.soup.title.string), items
 
 
 class RSSParser:
@@ -26,35 +50,240 @@ class RSSParser:
     This is a class which combines data and methods regarding the parsing of an RSS.
     """
 
-    def __init__(self):
+    def __init__(self, rss_cache: Optional[CacheReader] = None, fetcher: Optional[FeedFetcher] = None,
+                 stream: bool = False, engine: str = 'bs4'):
+        if engine not in ENGINES:
+            logging.error('Unknown extraction engine was requested!')
+            raise RSSException(f'Engine must be one of: {", ".join(ENGINES)}.', is_logged=True)
         self.is_offline = None
+        self.stream = stream
+        self.engine = engine
         self.url = None
         self.parsed_items: Optional[list[Item]] = None
+        self.feeds: list[Feed] = []
         self.soup = None
         self._title = None
-        self.rss_cache = CacheReader()
+        self.ttl: Optional[int] = None
+        self.skip_hours: frozenset[int] = frozenset()
+        self.is_complete = True
+        self.rss_cache = rss_cache if rss_cache else CacheReader()
+        self.fetcher = fetcher if fetcher else FeedFetcher()
         logging.info('RSS parser is created')
 
-    def request_soup(self, url: str) -> None:
+    def request_soup(self, url: str, conditional: bool = True) -> FetchResult:
         """
         This method requests `url` and creates a BeautifulSoup object with its content.
-        :return: A bs4 soup object to parse xml.
+        If the feed was fetched before, the request is conditional and the soup is not created
+        when the server reports that the feed was not modified.
+        In stream mode, or with the lxml engine, the soup is never created and the body of the response
+        is left to be read by `parse_stream`.
+        :param url: The url of the RSS feed.
+        :param conditional: Whether to send the validators of the previous fetch.
+        :return: The result of the request.
         """
         if not url:
             logging.error('RSS URL must be provided!')
             raise RSSException('Argument url must be of type str.', is_logged=True)
         validate_url(url)
         self.url = url
-        req = requests.get(url)
+        result = self.fetcher.fetch(url, self.rss_cache.validators.get(url) if conditional else None, self.stream)
         logging.info('RSS is requested from given URL')
-        self.soup = BeautifulSoup(req.content, features='xml')
+        if not (result.not_modified or self._streams):
+            self.load_soup(result.content)
+        return result
+
+    @property
+    def _streams(self) -> bool:
+        """
+        :return: Whether feeds are parsed through the stream parser instead of a soup.
+        """
+        return self.stream or self.engine == 'lxml'
+
+    def load_soup(self, content: bytes) -> None:
+        """
+        This method creates a BeautifulSoup object from already downloaded RSS content,
+        recording the `<ttl>` and `<skipHours>` of the channel.
+        :param content: The raw xml of the RSS feed.
+        """
+        self.soup = BeautifulSoup(content, features='xml')
+        channel = self.soup.find('channel')
+        if channel is not None:
+            ttl = channel.find('ttl', recursive=False)
+            self.ttl = schedule_number(ttl.text) if ttl else None
+            skip_hours = channel.find('skipHours', recursive=False)
+            hours = [schedule_number(hour.text) for hour in skip_hours.find_all('hour')] if skip_hours else []
+            self.skip_hours = frozenset(hour for hour in hours if hour is not None)
+
+    def load_cached_feed(self, url: str, limit: Optional[str] = None) -> bool:
+        """
+        This method takes the items of a feed from cache instead of parsing them.
+        :param url: The url of the RSS feed.
+        :param limit: Limit the number of items to be taken.
+        :return: Whether the feed was found in cache.
+        """
+        cached_feed = self.rss_cache.fetch_feed(url)
+        if cached_feed is None:
+            return False
+        limit = validate_limit(limit) if limit is not None else len(cached_feed.items)
+        self.url = url
+        self.feed_title = cached_feed.title
+        self.parsed_items = cached_feed.items[:limit]
+        self.is_offline = True
+        logging.info(f'Took {len(self.parsed_items)} unchanged item(s) of {url} from cache.')
+        return True
+
+    def parse_result(self, result: FetchResult, limit: Optional[str] = None) -> Feed:
+        """
+        This method parses a fetched RSS feed and caches its items, storing the validators of the response.
+        If the feed was not modified, its items are served from cache without any parsing.
+        Validators are only stored when the whole feed was cached, otherwise a later request would be answered
+        as not modified and the items left out by the limit would never reach the cache.
+        :param result: The result of fetching the feed, its soup must be already loaded unless it was not modified.
+        :param limit: Limit the number of items to be parsed.
+        :return: The parsed Feed object.
+        """
+        try:
+            if result.not_modified:
+                if self.load_cached_feed(result.url, limit):
+                    return self.feed
+                logging.info('Feed was not found in cache, requesting it without validators.')
+                result = self.request_soup(result.url, conditional=False)
+            if self._streams:
+                self.parse_stream(result.chunks(), limit)
+            else:
+                items = self.items(limit)
+                self.parse_items(items)
+                self.is_complete = limit is None or len(self.items(len(items) + 1)) <= len(items)
+        finally:
+            result.close()
+        if self.is_complete:
+            self.rss_cache.validators.save(result.url, result.etag, result.last_modified)
+        else:
+            logging.info(f'Only {len(self.parsed_items)} item(s) of {result.url} were cached, '
+                         f'its validators are not stored.')
+        return self.feed
+
+    @staticmethod
+    def _element_to_soup(element: 'etree._Element') -> PageElement:
+        """
+        This method converts a single lxml item element into a bs4 item, so it can be parsed as a part of a soup.
+        :param element: An lxml `<item>` element.
+        :return: The bs4 `<item>` element.
+        """
+        from lxml import etree
+        item = BeautifulSoup(etree.tostring(element, with_tail=False), features='xml').find(True)
+        for attr in [attr for attr in item.attrs if attr == 'xmlns' or attr.startswith('xmlns:')]:
+            del item[attr]
+        return item
+
+    def parse_stream(self, chunks: Iterable[bytes], limit: Optional[str] = None) -> None:
+        """
+        This method parses items while the RSS document is being read and caches them.
+        Reading stops as soon as the limit is reached, and only the item being parsed is kept in memory.
+        A feed cut short by the limit is marked as not complete.
+        Items are extracted by the lxml engine, or converted to bs4 items first when the bs4 engine is used.
+        :param chunks: An iterable over the bytes of the RSS document.
+        :param limit: Limit the number of items to be parsed.
+        """
+        from .lxml_extractor import extract_item
+        from .stream_parser import StreamParser
+        limit = validate_limit(limit) if limit is not None else None
+        stream_parser = StreamParser()
+        self.parsed_items = []
+        with metrics.timer('parse') as timer:
+            for element in stream_parser.iter_items(chunks):
+                if self.engine == 'lxml':
+                    self.parsed_items.append(extract_item(element))
+                else:
+                    self.parsed_items.append(self._parse_item(self._element_to_soup(element)))
+                if limit and len(self.parsed_items) >= limit:
+                    self.is_complete = False
+                    break
+            timer.count = len(self.parsed_items)
+        self.feed_title = stream_parser.title or self.url
+        self.ttl = stream_parser.ttl
+        self.skip_hours = frozenset(stream_parser.skip_hours)
+        self.rss_cache.cache_results(self.feed)
+
+    def parse_source(self, url: str, limit: Optional[str] = None) -> Feed:
+        """
+        This method requests a single RSS feed, parses its items until the limit is reached and caches them.
+        :param url: The url of the RSS feed.
+        :param limit: Limit the number of items to be parsed.
+        :return: The parsed Feed object.
+        """
+        result = self.request_soup(url)
+        return self.parse_result(result, limit)
+
+    def parse_sources(self, urls: list[str], limit: Optional[str] = None) -> None:
+        """
+        This method requests all given RSS feeds concurrently, parses each of them into a Feed and merges
+        their items into the results of this parser. Feeds which could not be fetched or parsed are skipped.
+        :param urls: The urls of the RSS feeds.
+        :param limit: Limit the number of items to be parsed from each feed.
+        """
+        for url in urls:
+            validate_url(url)
+        if limit is not None:
+            validate_limit(limit)
+        validators = {url: self.rss_cache.validators.get(url) for url in urls}
+        for result in self.fetcher.fetch_all(urls, validators):
+            if not (result.ok or result.not_modified):
+                logging.error(f'Skipping {result.url}, it could not be fetched: {result.error or result.status}')
+                continue
+            feed_parser = RSSParser(self.rss_cache, self.fetcher, self.stream, self.engine)
+            feed_parser.url = result.url
+            try:
+                if result.ok and not self._streams:
+                    feed_parser.load_soup(result.content)
+                self.feeds.append(feed_parser.parse_result(result, limit))
+            except Exception as e:
+                logging.error(f'Skipping {result.url}, it could not be parsed: {e!r}')
+        self._merge_feeds()
+
+    def ingest_sources(self, sources: list[str], limit: Optional[str] = None,
+                       parse_workers: Optional[int] = None) -> None:
+        """
+        This method ingests all given RSS feeds through the multi-process pipeline and merges their items
+        into the results of this parser. Feeds are parsed on `parse_workers` processes and cached in batches.
+        Feeds which could not be fetched or parsed are skipped.
+        :param sources: The urls of the RSS feeds, or paths of saved RSS documents.
+        :param limit: Limit the number of items to be parsed from each feed.
+        :param parse_workers: The amount of parsing processes, by default one per CPU.
+        """
+        from .pipeline import IngestPipeline
+        for source in sources:
+            if not os.path.isfile(source):
+                validate_url(source)
+        limit = validate_limit(limit) if limit is not None else None
+        pipeline = IngestPipeline(self.rss_cache, self.fetcher, parse_workers, self.engine)
+        results, _ = pipeline.run(sources, limit)
+        for result in results:
+            if result.feed is not None:
+                self.feeds.append(result.feed)
+            elif result.not_modified and self.load_cached_feed(result.source, limit):
+                self.feeds.append(self.feed)
+        self.url = None
+        self.is_offline = None
+        self._merge_feeds()
+
+    def _merge_feeds(self) -> None:
+        """
+        This method merges the items of all parsed feeds into the results of this parser.
+        """
+        if not self.feeds:
+            logging.error('None of the given feeds could be fetched!')
+            raise RSSException('None of the given feeds could be fetched.', is_logged=True)
+        self.feed_title = f'News fetched from {len(self.feeds)} feeds.'
+        self.parsed_items = [item for feed in self.feeds for item in feed.items]
+        logging.info(f'Merged {len(self.parsed_items)} items from {len(self.feeds)} feeds.')
 
     @property
     def feed_title(self) -> str:
         """
         :return: RSS Title
         """
-        return self._title if self._title else self.soup.title.string
+        return self._title if self._title else str(self.soup.title.string)
 
     @feed_title.setter
     def feed_title(self, value):
@@ -62,15 +291,33 @@ class RSSParser:
 
     def items(self, limit: Optional[str] = None) -> ResultSet:
         """
-        This method retrieves all items from an RSS.
+        This method retrieves all items from an RSS, the `<entry>` elements of an Atom feed.
         :return: An object containing all raw items.
         """
+        root = self.soup.find(True)
+        item_tag = detect_format(root.name).item_tag if root is not None else 'item'
         if limit is None:
             logging.info('Getting all items from feed')
-            return self.soup.findAll('item', limit=limit)
+            return self.soup.find_all(item_tag, limit=limit)
         limit = validate_limit(limit)
 
-        return self.soup.findAll('item', limit=limit)
+        return self.soup.find_all(item_tag, limit=limit)
+
+    @staticmethod
+    def _validate_date(date: str) -> str:
+        """
+        This method checks that a date matches the format of yyyymmdd.
+        :param date: Date in the format of yyyymmdd.
+        :return: The date in the format shown to the user.
+        """
+        if len(date) != 8:
+            logging.error('The length of parameter --date should be 8 characters long!')
+            raise RSSException('Date provided was not 8 characters', is_logged=True)
+        try:
+            return parse_date(date).strftime('%d/%m/%Y')
+        except ValueError:
+            logging.error('Faulty date was provided!')
+            raise RSSException('Date was not matching following format "yymmdd".', is_logged=True)
 
     def parse_items_by_date(self, date: str, url: Optional[str], limit: Optional[str]) -> None:
         """
@@ -81,20 +328,74 @@ class RSSParser:
         :param url:Optional[str]: The url of the rss feed to be matched.
         :param limit:Optional[str]: Limit the number of items to be retrieved.
         """
-        if len(date) != 8:
-            logging.error('The length of parameter --date should be 8 characters long!')
-            raise RSSException('Date provided was not 8 characters', is_logged=True)
-        try:
-            vis_date = parser.parse(date).strftime('%d/%m/%Y')
-        except ParserError:
-            logging.error('Faulty date was provided!')
-            raise RSSException('Date was not matching following format "yymmdd".', is_logged=True)
+        vis_date = self._validate_date(date)
+        self._parse_cached_items(date, date, url, limit, f'{vis_date} Date')
+
+    def parse_items_by_date_range(self, date_from: Optional[str], date_to: Optional[str], url: Optional[str],
+                                  limit: Optional[str]) -> None:
+        """
+        This method checks the cache for all feeds that match the given URL and were published between
+        the given dates, both dates included. A missing date leaves that side of the range open.
+        :param date_from:Optional[str]: The first date in the format of yymmdd.
+        :param date_to:Optional[str]: The last date in the format of yymmdd.
+        :param url:Optional[str]: The url of the rss feed to be matched.
+        :param limit:Optional[str]: Limit the number of items to be retrieved.
+        """
+        vis_from = self._validate_date(date_from) if date_from else 'the beginning'
+        vis_to = self._validate_date(date_to) if date_to else 'now'
+        self._parse_cached_items(date_from or '00000000', date_to or '99999999', url, limit,
+                                 f'{vis_from} - {vis_to} Dates')
+
+    def search_cached_items(self, query: str, date: Optional[str], date_from: Optional[str], date_to: Optional[str],
+                            url: Optional[str], limit: Optional[str]) -> None:
+        """
+        This method searches the cache for the news containing all words of the query in their titles
+        or descriptions, the best matches first. The search can be narrowed by a date or a range of dates,
+        by the URL of a feed and by a limit.
+        :param query: The searched words.
+        :param date: Date in the format of yyyymmdd.
+        :param date_from: The first date in the format of yyyymmdd.
+        :param date_to: The last date in the format of yyyymmdd.
+        :param url: The url of the rss feed to be matched.
+        :param limit: Limit the number of items to be retrieved.
+        """
+        if not re.search(r'\w', query):
+            logging.error('Search query has no words!')
+            raise RSSException('Search query must contain at least one word.', is_logged=True)
+        filters = f'"{query}" Search'
+        start = end = None
+        if date_from or date_to:
+            vis_from = self._validate_date(date_from) if date_from else 'the beginning'
+            vis_to = self._validate_date(date_to) if date_to else 'now'
+            start, end = date_from, date_to
+            filters += f', {vis_from} - {vis_to} Dates'
+        elif date:
+            filters += f', {self._validate_date(date)} Date'
+            start = end = date
+        self._parse_cached_items(start, end, url, limit, filters, query)
 
+    def _parse_cached_items(self, start: Optional[str], end: Optional[str], url: Optional[str],
+                            limit: Optional[str], date_str: str, query: Optional[str] = None) -> None:
+        """
+        This method takes the items published between two days from cache as the results of the parser.
+        :param start: The first day in the format of yyyymmdd.
+        :param end: The last day in the format of yyyymmdd.
+        :param url: The url of the rss feed to be matched.
+        :param limit: Limit the number of items to be retrieved.
+        :param date_str: The description of the filters shown to the user.
+        :param query: The searched words, if given only the news matching them are taken, the best matches first.
+        """
         try:
-            feed_list = self.rss_cache.fetch_by_filters(date, url)
+            if query is None:
+                feed_list = self.rss_cache.fetch_by_dates(start, end, url, validate_limit(limit) if limit else None)
+            else:
+                feed_list = self.rss_cache.search(query, start, end, url, validate_limit(limit) if limit else None)
         except FileNotFoundError:
             logging.error('There is no cache available!')
             raise RSSException('Cache was not yet created.', is_logged=True)
+        except NotImplementedError as e:
+            logging.error(f'Cached news can not be searched: {e}')
+            raise RSSException('Search needs the sqlite cache backend.', is_logged=True)
 
         feed_str = ''
         if url:
@@ -108,9 +409,9 @@ class RSSParser:
         if not feed_list:
             logging.error('No news were found for given filters!')
             raise RSSException('Found no news with given filters.', is_logged=True)
-        self.feed_title = f'News fetched from cache by - {vis_date} Date{feed_str}.'
+        self.feed_title = f'News fetched from cache by - {date_str}{feed_str}.'
         self.parsed_items = feed_list[:limit]
-        logging.info(f'Parsed items from cache with following filters Date: {vis_date}{feed_str}')
+        logging.info(f'Parsed items from cache with following filters: {date_str}{feed_str}')
         self.is_offline = True
 
     @validate_method_args
@@ -120,25 +421,84 @@ class RSSParser:
         :param item: A PageElement to be parsed into an Item.
         :return: A parsed Item.
         """
+        feed_format = item_format(item.name, item.namespace)
+        fields = self._find_fields(item, feed_format)
+        raw_date = next((str(fields[name].string) for name in feed_format.date_tags
+                         if name in fields and fields[name].string), None)
         title = self._parse_title(item)
-        date = self._parse_date(item)
-        link = self._parse_link(item)
-        images = self._parse_images(item)
-        media = self._parse_media(item, images)
-        description = self._parse_description(item)
+        date = self._parse_date(raw_date)
+        link = self._parse_link(fields, feed_format)
+        guid = self._parse_guid(fields, feed_format)
+        content = self._scan_item(item, feed_format, fields)
+        images = self._parse_images(content)
+        media = self._parse_media(content)
+        description = self._parse_description(content)
         parsed_item = Item(title=title, date=date, link=link, description=description, media_links=media,
-                           image_links=images)
-        logging.info(f'Finished parsing item with title: {parsed_item.title}')
+                           image_links=images, timestamp=timestamp(raw_date) if raw_date else None, guid=guid)
+        logging.debug('Finished parsing item with title: %s', parsed_item.title_text)
 
         return parsed_item
 
+    @staticmethod
+    def _find_fields(item: PageElement, feed_format: FeedFormat) -> dict:
+        """
+        This method finds the first element of every field of an item in the given format.
+        Atom `<link>` elements other than the alternate link of the entry are skipped.
+        :param item: An item to be searched.
+        :param feed_format: The format of the feed of the item.
+        :return: The elements of the item by their local names.
+        """
+        fields = {}
+        for element in item.find_all(True):
+            name = element.name
+            if name in feed_format.field_tags and name not in fields and \
+                    feed_format.accepts(name, element.namespace) and \
+                    (name != 'link' or feed_format.is_link(element.attrs)):
+                fields[name] = element
+        return fields
+
+    @staticmethod
+    def _scan_item(item: PageElement, feed_format: FeedFormat, fields: dict) -> ItemContent:
+        """
+        This method visits every string and attribute of a PageElement once, collecting its images,
+        its urls and its plain text description. Namespace declarations are not part of the content.
+        When a format has several description elements, e.g. the `<summary>` and `<content>` of an Atom entry,
+        the preferred one which is present becomes the description.
+        :param item: An item to be scanned.
+        :param feed_format: The format of the feed of the item.
+        :param fields: The elements of the fields of the item.
+        :return: The collected content of the item.
+        """
+        content = ItemContent()
+        if feed_format.link_attribute:
+            for link in item.find_all('link'):
+                if feed_format.accepts('link', link.namespace):
+                    content.add_image(feed_format.image_link(link.attrs))
+        for name in feed_format.image_tags:
+            if name in fields:
+                content.add_image(fields[name].get('url'))
+        if 'image' in fields:
+            content.add_image(fields['image'].text)
+        descriptions = [fields[name] for name in reversed(feed_format.description_tags) if name in fields]
+        for element in (item, *item.descendants):
+            if isinstance(element, Tag):
+                for name, value in element.attrs.items():
+                    if not (name == 'xmlns' or name.startswith('xmlns:')):
+                        content.add_text(value)
+            elif element.parent not in descriptions:
+                content.add_text(element)
+        for description in descriptions:
+            content.add_description(description.text)
+        return content
+
     @validate_method_args
     def parse_items(self, items: ResultSet) -> None:
         """
         This method parses all given items and assigns them to a class attribute.
         :param items: A ResultSet object with raw items from a rss.
         """
-        self.parsed_items = [self._parse_item(item) for item in items]
+        with metrics.timer('parse', len(items)):
+            self.parsed_items = [self._parse_item(item) for item in items]
         self.rss_cache.cache_results(self.feed)
 
     @staticmethod
@@ -151,94 +511,100 @@ class RSSParser:
         """
         title_elem = Element(ElementType.TITLE)
         title_elem.value = item.title.string.strip()
-        logging.info(f'Got item\'s title: {title_elem.value}')
+        logging.debug('Got item\'s title: %s', title_elem.value)
         if not title_elem.value:
-            logging.info('Title was not found')
+            logging.debug('Title was not found')
         return title_elem
 
     @staticmethod
-    @validate_method_args
-    def _parse_date(item: PageElement) -> Element:
+    def _parse_date(raw_date: Optional[str]) -> Element:
         """
-        This method parses the date of a page element and returns it as an Element object.
-        :param item: An item from which to get the date.
+        This method formats the date of a page element and returns it as an Element object.
+        :param raw_date: The text of the date element of an item, if it has one.
         :return: An Element object with the value of the date.
         """
         date_elem = Element(ElementType.PUB_DATE)
-        date_elem.value = item.pubDate.string
-        date_elem.value = parser.parse(date_elem.value).strftime('%Y-%m-%d %H:%M:%S')
-        logging.info(f'Got item\'s publish date: {date_elem.value}')
+        date_elem.value = format_date(raw_date) if raw_date else None
+        logging.debug('Got item\'s publish date: %s', date_elem.value)
         if not date_elem.value:
-            logging.info('Publish date was not found')
+            logging.debug('Publish date was not found')
         return date_elem
 
     @staticmethod
-    @validate_method_args
-    def _parse_link(item: PageElement) -> Element:
+    def _parse_link(fields: dict, feed_format: FeedFormat) -> Element:
         """
         This method parses the link of a page element and returns it as an Element object.
-        :param item: An item from which to get the link.
+        The link of an Atom entry is the `href` of its `<link>`, not its text.
+        :param fields: The elements of the fields of an item.
+        :param feed_format: The format of the feed of the item.
         :return: An Element object with the value of the link.
         """
         link_elem = Element(ElementType.LINK)
-        link_elem.value = item.link.string
-        logging.info(f'Got item\'s link: {link_elem.value}')
+        link = fields.get('link')
+        if link is not None:
+            link_elem.value = link.get(feed_format.link_attribute) if feed_format.link_attribute else link.string
+        logging.debug('Got item\'s link: %s', link_elem.value)
         if not link_elem.value:
-            logging.info('Link was not found')
+            logging.debug('Link was not found')
         return link_elem
 
     @staticmethod
-    def _parse_media(item: PageElement, images: ElementCollection) -> ElementCollection:
+    def _parse_guid(fields: dict, feed_format: FeedFormat) -> Optional[str]:
         """
-        This method takes a PageElement object and returns an ElementCollection of media URLs.
-        :param item: An item from which to get the media links.
+        This method parses the guid of a page element, which identifies the item inside its feed.
+        The `<id>` of an Atom entry is its guid.
+        :param fields: The elements of the fields of an item.
+        :param feed_format: The format of the feed of the item.
+        :return: The guid without surrounding whitespace, or None if the item has no guid.
+        """
+        guid = fields.get(feed_format.guid_tag) if feed_format.guid_tag else None
+        if guid is None:
+            return None
+        return guid.get_text().strip() or None
+
+    @staticmethod
+    @validate_method_args
+    def _parse_media(content: ItemContent) -> ElementCollection:
+        """
+        This method returns an ElementCollection of the media URLs of a scanned item, its images excluded.
+        :param content: The content of an item.
         :return: An ElementCollection object with the value of media links.
         """
-        media_urls = re.findall(r'(https?://[^\s"<]+)', str(item))
-        media_collection = None
-        if media_urls:
-            media_urls = set(map(lambda x: Element(ElementType.MEDIA, x), media_urls))
-            image_urls = [image_url.value for image_url in images.elements]
-            media_urls = [media_url for media_url in media_urls if media_url.value not in image_urls]
-            media_collection = ElementCollection(ElementType.MEDIA, list(media_urls))
-            logging.info(f'Got item\'s media urls, {len(media_collection)} found.')
+        media_collection = ElementCollection(ElementType.MEDIA, [Element(ElementType.MEDIA, url)
+                                                                 for url in content.media])
+        logging.debug('Got item\'s media urls, %d found.', len(media_collection))
         if not media_collection:
-            logging.info('Media was not found')
+            logging.debug('Media was not found')
         return media_collection
 
     @staticmethod
     @validate_method_args
-    def _parse_images(item: PageElement) -> ElementCollection:
+    def _parse_images(content: ItemContent) -> ElementCollection:
         """
-        This method takes a PageElement object and returns an ElementCollection of media URLs.
-        :param item: An item from which to get the media links.
-        :return: An ElementCollection object with the value of media links.
+        This method returns an ElementCollection of the image URLs of a scanned item.
+        :param content: The content of an item.
+        :return: An ElementCollection object with the value of image links.
         """
-        images = [item.enclosure, item.content, item.thumbnail]
-        images = [tag['url'] for tag in images if tag]
-        if item.image:
-            images.append(item.image.text)
-        image_urls = set(map(lambda x: Element(ElementType.IMAGE, x), images))
-        image_collection = ElementCollection(ElementType.IMAGE, list(image_urls))
-        logging.info(f'Got item\'s media urls, {len(image_collection)} found.')
+        image_collection = ElementCollection(ElementType.IMAGE, [Element(ElementType.IMAGE, url)
+                                                                 for url in content.images])
+        logging.debug('Got item\'s image urls, %d found.', len(image_collection))
         if not image_collection:
-            logging.info('Images were not found')
+            logging.debug('Images were not found')
         return image_collection
 
     @staticmethod
     @validate_method_args
-    def _parse_description(item: PageElement) -> Element:
+    def _parse_description(content: ItemContent) -> Element:
         """
-        This method parses the description of a page element and returns it as an Element object.
-        :param item: An item from which to get the description.
+        This method returns the plain text description of a scanned item as an Element object.
+        :param content: The content of an item.
         :return: An Element object with the value of the description.
         """
-        desc_elem = Element(ElementType.DESCRIPTION)
-        if getattr(item, 'description'):
-            desc_elem.value = re.sub('<[^>]*>', '', item.description.text)
-            logging.info(f'Got item\'s description: {desc_elem.value}')
-        if not desc_elem.value:
-            logging.info('Description was not found')
+        desc_elem = Element(ElementType.DESCRIPTION, content.description)
+        if desc_elem.value:
+            logging.debug('Got item\'s description: %s', desc_elem.value)
+        else:
+            logging.debug('Description was not found')
         return desc_elem
 
     def json_results(self) -> str:
@@ -249,33 +615,46 @@ class RSSParser:
         """
         return self.feed.to_json()
 
-    def save_pdf(self, path: str):
+    def _fragment_cache(self) -> 'FragmentCache':
         """
-        This method saves the current operating feed into a PDF file.
+        :return: The store of rendered item fragments inside the cache folder.
         """
-        html = html_feed(self.feed, for_pdf=True, is_cache=self.is_offline)
-        if os.path.exists(path):
-            with open(f'{path}rss_feed.pdf', 'wb') as f:
-                pdf_feed(html, f)
-        else:
+        from .html_converter import FragmentCache
+        return FragmentCache(f'{self.rss_cache.cache_dir}/html_fragments.json')
+
+    def save_pdf(self, path: str, chunk_size: Optional[int] = None, workers: Optional[int] = None):
+        """
+        This method saves the current operating feed into a PDF file. Large feeds are converted in chunks
+        on a pool of processes, and cached images are embedded from disk.
+        :param path: The directory of the PDF file.
+        :param chunk_size: The amount of items converted at once.
+        :param workers: The amount of converting processes, by default one per CPU.
+        """
+        from .pdf_converter import PDF_CHUNK_SIZE, pdf_feed_chunks
+        if not os.path.exists(path):
             logging.error('Given path was not found, saving to current location instead!')
-            with open('rss_feed.pdf', 'wb') as f:
-                pdf_feed(html, f)
+            path = ''
+        with open(f'{path}rss_feed.pdf', 'wb') as f, metrics.timer('render.pdf', len(self.parsed_items)):
+            pdf_feed_chunks(self.feed, f, self.rss_cache.image_store, self._fragment_cache(),
+                            chunk_size or PDF_CHUNK_SIZE, workers)
         logging.info('Successfully saved the results into a PDF file.')
 
     def save_html(self, path: str) -> str:
         """
-        This method saves the current operating feed into an HTML file.
+        This method streams the current operating feed into an HTML file, reusing the fragments of items
+        which were rendered by earlier reports.
+        :return: The path of the HTML file.
         """
-        html = html_feed(self.feed, is_cache=self.is_offline)
+        from .html_converter import write_html
         if os.path.exists(path):
-            with open(f'{path}rss_feed.html', 'w', encoding='utf-8') as f:
-                f.write(html)
+            html_path = f'{path}rss_feed.html'
         else:
             logging.error('Given path was not found, saving to current location instead!')
-            with open('rss_feed.html', 'w', encoding='utf-8') as f:
-                f.write(html)
-        return html
+            html_path = 'rss_feed.html'
+        with open(html_path, 'w', encoding='utf-8') as f, metrics.timer('render.html', len(self.parsed_items)):
+            write_html(self.feed, f, is_cache=self.is_offline, image_store=self.rss_cache.image_store,
+                       fragment_cache=self._fragment_cache())
+        return html_path
 
     @property
     def feed(self):
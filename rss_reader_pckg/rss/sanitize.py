@@ -0,0 +1,85 @@
+"""
+This module contains the ItemContent class which sanitizes the contents of an RSS item in a single pass.
+It is shared by both extraction engines, so they produce the same descriptions and links.
+"""
+
+import html
+import re
+from typing import Optional
+
+URL_PATTERN = re.compile(r'https?://[^\s"<]+')
+MARKUP_TOKEN_PATTERN = re.compile(r'<[^>]*>|https?://[^\s"<]+')
+
+
+def _unescape(value: str) -> str:
+    """
+    :param value: A text which may contain HTML entities.
+    :return: The text with all HTML entities replaced by their characters.
+    """
+    return html.unescape(value) if '&' in value else value
+
+
+class ItemContent:
+    """
+    This class collects the plain text description, the image urls and every other url of an item
+    while its texts and attributes are visited once.
+    Urls keep the order in which they were found, duplicates are dropped and image urls are excluded
+    from the media urls by a set lookup.
+    """
+    __slots__ = ('_urls', '_images', 'description')
+
+    def __init__(self):
+        self._urls: dict[str, None] = {}
+        self._images: dict[str, None] = {}
+        self.description: Optional[str] = None
+
+    def add_text(self, text: Optional[str]):
+        """
+        This method collects the urls of a text or an attribute value of the item.
+        :param text: The text.
+        """
+        if text and 'http' in text:
+            for url in URL_PATTERN.findall(text):
+                self._urls[_unescape(url)] = None
+
+    def add_image(self, url: Optional[str]):
+        """
+        :param url: An image url of the item.
+        """
+        if url:
+            self._images[_unescape(url)] = None
+
+    def add_description(self, markup: str) -> str:
+        """
+        This method tokenizes the HTML of a description once, removing its tags and collecting the urls
+        of both its tags and its text. HTML entities of the remaining text are unescaped.
+        :param markup: The HTML of the description.
+        :return: The plain text description.
+        """
+        pieces = []
+        position = 0
+        for token in MARKUP_TOKEN_PATTERN.finditer(markup):
+            value = token.group()
+            if value[0] == '<':
+                pieces.append(markup[position:token.start()])
+                position = token.end()
+                self.add_text(value)
+            else:
+                self._urls[_unescape(value)] = None
+        pieces.append(markup[position:])
+        self.description = _unescape(''.join(pieces))
+        return self.description
+
+    @property
+    def images(self) -> list[str]:
+        """
+        :return: The image urls of the item.
+        """
+        return list(self._images)
+
+    @property
+    def media(self) -> list[str]:
+        """
+        :return: The urls of the item which are not image urls.
+        """
+        return [url for url in self._urls if url not in self._images]
@@ -0,0 +1,106 @@
+"""
+This module contains the StreamParser class which reads RSS and Atom items incrementally while the feed is downloaded.
+"""
+
+import logging
+from typing import Iterable, Iterator, Optional
+
+from lxml import etree
+
+from rss_reader_pckg.rss.feed_formats import RSS_2, FeedFormat, detect_format
+from rss_reader_pckg.rss.helpers import schedule_number
+
+
+def local_name(element: etree._Element) -> str:
+    """
+    This function returns the name of an element without its namespace.
+    :param element: An lxml element.
+    :return: The local name of the element.
+    """
+    return etree.QName(element).localname if isinstance(element.tag, str) else ''
+
+
+class StreamParser:
+    """
+    This class feeds chunks of a feed document into an lxml pull parser and yields every item element
+    as soon as it is complete. Processed items are cleared and detached from the document,
+    so only the item being parsed is kept in memory.
+    The format of the feed is detected from its root element: items are `<item>` elements in RSS 2.0 and 1.0
+    and `<entry>` elements in Atom. The title, `<ttl>` and `<skipHours>` of the channel are recorded along the way.
+    """
+
+    def __init__(self):
+        self.title: Optional[str] = None
+        self.ttl: Optional[int] = None
+        self.skip_hours: set[int] = set()
+        self.root: Optional[etree._Element] = None
+        self.feed_format: FeedFormat = RSS_2
+        self._parser = etree.XMLPullParser(events=('start', 'end'), resolve_entities=False, no_network=True)
+        self._depth = 0
+        self.item_count = 0
+
+    def _handle_event(self, event: str, element: etree._Element) -> bool:
+        """
+        This method tracks the position inside the document and records the title and schedule of the channel.
+        :param event: Either `start` or `end`.
+        :param element: The element of the event.
+        :return: Whether the event completes an item.
+        """
+        if event == 'start':
+            if self.root is None:
+                self.root = element
+                self.feed_format = detect_format(local_name(element))
+            self._depth += 1
+            return False
+        self._depth -= 1
+        name = local_name(element)
+        if name == self.feed_format.item_tag:
+            return True
+        if name == 'title' and self.title is None and local_name(element.getparent()) == self.feed_format.channel_tag:
+            self.title = (element.text or '').strip()
+        elif name == 'ttl' and self._depth == 2:
+            self.ttl = schedule_number(element.text)
+        elif name == 'hour' and local_name(element.getparent()) == 'skipHours':
+            hour = schedule_number(element.text)
+            if hour is not None:
+                self.skip_hours.add(hour)
+        return False
+
+    @staticmethod
+    def _release(element: etree._Element):
+        """
+        This method frees an already parsed element along with its preceding siblings.
+        :param element: The parsed element.
+        """
+        element.clear()
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+            del parent[0]
+
+    def _completed_items(self) -> Iterator[etree._Element]:
+        """
+        This method handles the events parsed so far and yields the items completed by them.
+        :return: An iterator over the completed item elements.
+        """
+        for event, element in self._parser.read_events():
+            if self._handle_event(event, element):
+                self.item_count += 1
+                yield element
+                self._release(element)
+
+    def iter_items(self, chunks: Iterable[bytes]) -> Iterator[etree._Element]:
+        """
+        This method parses chunks of a feed document and yields its items one by one.
+        The caller may stop iterating at any point, then the remaining chunks are never read.
+        A yielded element is only valid until the next one is requested.
+        :param chunks: An iterable over the bytes of the document.
+        :return: An iterator over the `<item>` or `<entry>` elements.
+        """
+        for chunk in chunks:
+            self._parser.feed(chunk)
+            yield from self._completed_items()
+        self._parser.close()
+        yield from self._completed_items()
+        logging.info(f'Streamed {self.item_count} item(s) from the feed.')
@@ -0,0 +1,159 @@
+"""
+This module contains the Transport class which performs every HTTP request of the application.
+It is imported only by the code which goes to the network, so commands working on the cache never load requests.
+"""
+
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import Callable, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+from rss_reader_pckg.rss.metrics import metrics
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+class ResponseTooLarge(requests.RequestException):
+    """
+    This exception is raised when the body of a response exceeds the size limit of the transport.
+    """
+
+
+class Transport:
+    """
+    This class wraps one requests Session with a pool of keep-alive connections per host.
+    Every request has connect and read timeouts. Responses with a status of RETRY_STATUSES are retried
+    with an exponential backoff with full jitter, unless the server asks to wait longer than `max_delay`
+    through its `Retry-After` header. Bodies are decompressed while they are read and are limited to `max_bytes`
+    after decompression, so neither a huge nor a highly compressed response can exhaust the memory.
+    Brotli is negotiated when the brotli package is installed.
+    """
+
+    def __init__(self, connect_timeout: float = 5.0, read_timeout: float = 30.0, retries: int = 3,
+                 backoff: float = 0.5, max_delay: float = 30.0, max_bytes: int = 64 * 1024 * 1024,
+                 per_host: int = 16, sleep: Callable[[float], None] = time.sleep):
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.max_bytes = max_bytes
+        self.sleep = sleep
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=per_host)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+
+    def _retry_delay(self, response: requests.Response, attempt: int) -> Optional[float]:
+        """
+        This method decides how long to wait before the next attempt of a request.
+        :param response: The response of the failed attempt.
+        :param attempt: The number of the failed attempt, starting from 0.
+        :return: The delay in seconds, or None if the request should not be retried.
+        """
+        if attempt >= self.retries or response.status_code not in RETRY_STATUSES:
+            return None
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            delay = parse_retry_after(retry_after)
+            if delay is not None:
+                return delay if delay <= self.max_delay else None
+        return random.uniform(0, min(self.max_delay, self.backoff * 2 ** attempt))
+
+    def _check_length(self, response: requests.Response):
+        """
+        This method rejects a response which announces a body larger than the size limit.
+        :param response: A response whose body was not read yet.
+        """
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > self.max_bytes:
+            response.close()
+            raise ResponseTooLarge(f'{response.url} has {length} bytes, the limit is {self.max_bytes}.')
+
+    def iter_content(self, response: requests.Response, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """
+        This method reads the decompressed body of a streamed response, stopping at the size limit.
+        :param response: A streamed response.
+        :param chunk_size: The size of the chunks read from the network.
+        :return: An iterator over the chunks of the body.
+        """
+        size = 0
+        for chunk in response.iter_content(chunk_size):
+            size += len(chunk)
+            metrics.count('fetch.bytes', len(chunk))
+            if size > self.max_bytes:
+                response.close()
+                raise ResponseTooLarge(f'{response.url} is larger than the limit of {self.max_bytes} bytes.')
+            yield chunk
+
+    def get(self, url: str, headers: Optional[dict] = None, stream: bool = False) -> requests.Response:
+        """
+        This method requests a url, retrying while the server is unavailable or limits the rate of requests.
+        :param url: The requested url.
+        :param headers: Additional headers of the request.
+        :param stream: Whether to leave the body unread, so it can be consumed through `iter_content`.
+        :return: The final response, which may still have a failure status once the retries are exhausted.
+        """
+        attempt = 0
+        with metrics.timer('fetch'):
+            while True:
+                response = self.session.get(url, headers=headers, stream=True, timeout=self.timeout)
+                delay = self._retry_delay(response, attempt)
+                if delay is None:
+                    break
+                response.close()
+                logging.info(f'{url} responded with status {response.status_code}, retrying in {delay:.2f}s.')
+                metrics.count('fetch.retries')
+                self.sleep(delay)
+                attempt += 1
+            self._check_length(response)
+            if not stream:
+                response._content = b''.join(self.iter_content(response))
+        return response
+
+
+def parse_retry_after(value: str) -> Optional[float]:
+    """
+    :param value: The value of a `Retry-After` header, either seconds or an HTTP date.
+    :return: The amount of seconds to wait, or None if the value is malformed.
+    """
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+_shared_transport: Optional[Transport] = None
+_shared_options: dict = {}
+_shared_lock = threading.Lock()
+
+
+def configure_shared_transport(**options):
+    """
+    This function sets the options of the transport shared by all network paths of the application.
+    :param options: Keyword arguments of Transport.
+    """
+    global _shared_transport, _shared_options
+    with _shared_lock:
+        _shared_options = options
+        _shared_transport = None
+
+
+def shared_transport() -> Transport:
+    """
+    :return: The transport shared by all network paths of the application, created on first use.
+    """
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            _shared_transport = Transport(**_shared_options)
+        return _shared_transport
@@ -1,20 +1,60 @@
 import logging
 import logging.config
+import sys
+from typing import TYPE_CHECKING, Optional
 
 from rss_reader_pckg.args import get_args
-from rss_reader_pckg.rss.rss_parser import RSSParser
+from rss_reader_pckg.rss.fetcher import FeedFetcher
+from rss_reader_pckg.rss.helpers import read_feed_list
+from rss_reader_pckg.rss.metrics import metrics
+from rss_reader_pckg.rss.output import save_feed
+from rss_reader_pckg.rss.rss_cache import CacheReader, RetentionPolicy
+from rss_reader_pckg.rss.rss_exception import RSSException
+
+if TYPE_CHECKING:
+    from rss_reader_pckg.rss.rss_parser import RSSParser
 
 CURRENT_VERSION = 'Version 1.3'
 logging.basicConfig(level=logging.ERROR, format='[%(asctime)s]-[%(levelname)s]: %(message)s',
                     datefmt='%d/%m/%Y %I:%M:%S %p')
 
 
-def cli_results(args, rss_parser: RSSParser):
-    if args.json:
-        print(rss_parser.json_results())
+def cli_results(args, rss_parser: 'RSSParser'):
+    if args.jsonl:
+        output_format = 'jsonl'
+    elif args.json:
+        output_format = 'json'
     else:
-        feed = rss_parser.feed
-        print(feed)
+        output_format = 'text'
+    save_feed(rss_parser.feed, args.output, output_format)
+
+
+def cached_source(sources: list[str]) -> Optional[str]:
+    """
+    This function picks the source which narrows a read of the cache, only one source can be given.
+    :param sources: The sources given as arguments and in the feed list.
+    :return: The url of the source, or None if no source was given.
+    """
+    if len(sources) > 1:
+        logging.error('Cached news can only be filtered by one source!')
+        raise RSSException(f'Searching the cache and the date filters take one source, {len(sources)} were given.',
+                           is_logged=True)
+    return sources[0] if sources else None
+
+
+def run_daemon(args, sources: list[str], rss_cache: CacheReader):
+    from rss_reader_pckg.rss.daemon import PollingDaemon
+    if not sources:
+        logging.error('Daemon mode needs at least one RSS URL!')
+        raise RSSException('Provide the feeds to poll as arguments or with --feed-list.', is_logged=True)
+    fetcher = FeedFetcher(args.workers, args.per_host)
+    daemon = PollingDaemon(sources, rss_cache, fetcher, args.stream, args.engine, args.poll_interval)
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        logging.info('Polling was stopped.')
+    finally:
+        rss_cache.image_store.wait()
 
 
 def main():
@@ -25,22 +65,53 @@ def main():
     if args.verbose:
         logging.basicConfig(level=logging.INFO, format='[%(asctime)s]-[%(levelname)s]: %(message)s',
                             datefmt='%d/%m/%Y %I:%M:%S %p')
+    if args.profile or args.metrics:
+        metrics.enable()
     try:
-        rss_parser = RSSParser()
-        if args.date:
-            rss_parser.parse_items_by_date(args.date, args.source, args.limit)
+        sources = args.source + (read_feed_list(args.feed_list) if args.feed_list else [])
+        image_budget = int(args.image_budget * 1024 * 1024) if args.image_budget is not None else None
+        retention = RetentionPolicy(args.max_age, args.max_items, image_budget, args.gc_on_write)
+        rss_cache = CacheReader(backend=args.cache_backend, image_workers=args.image_workers,
+                                background_images=args.background_images, retention=retention)
+        if args.cache_gc:
+            print(rss_cache.collect_garbage())
+            return
+        if not (args.search or args.date or args.date_from or args.date_to):
+            from rss_reader_pckg.rss.transport import configure_shared_transport
+            configure_shared_transport(connect_timeout=args.connect_timeout, read_timeout=args.read_timeout,
+                                       retries=args.retries, per_host=max(args.per_host, args.image_workers))
+        if args.daemon:
+            run_daemon(args, sources, rss_cache)
+            return
+        from rss_reader_pckg.rss.rss_parser import RSSParser
+        rss_parser = RSSParser(rss_cache, FeedFetcher(args.workers, args.per_host), args.stream, args.engine)
+        if args.search is not None:
+            rss_parser.search_cached_items(args.search, args.date, args.date_from, args.date_to,
+                                           cached_source(sources), args.limit)
+        elif args.date_from or args.date_to:
+            rss_parser.parse_items_by_date_range(args.date_from, args.date_to, cached_source(sources), args.limit)
+        elif args.date:
+            rss_parser.parse_items_by_date(args.date, cached_source(sources), args.limit)
+        elif args.parse_workers:
+            rss_parser.ingest_sources(sources, args.limit, args.parse_workers)
+        elif len(sources) > 1:
+            rss_parser.parse_sources(sources, args.limit)
         else:
-            rss_parser.request_soup(args.source)
-            items = rss_parser.items(args.limit)
-            rss_parser.parse_items(items)
+            rss_parser.parse_source(sources[0] if sources else None, args.limit)
         if args.to_html:
             rss_parser.save_html(args.to_html)
         if args.to_pdf:
-            rss_parser.save_pdf(args.to_pdf)
+            rss_parser.save_pdf(args.to_pdf, args.pdf_chunk_size, args.pdf_workers)
         cli_results(args, rss_parser)
+        rss_cache.image_store.wait()
     except Exception as e:
         if not (hasattr(e, 'is_logged') and e.is_logged):
             print(f'During operation of the program the following error occurred: {e}')
+    finally:
+        if args.profile:
+            print(metrics.to_table(), file=sys.stderr)
+        if args.metrics:
+            metrics.write(args.metrics)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,78 @@
+"""
+This module contains a local HTTP server which stands in for remote RSS hosts during tests.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional, Union
+
+Route = Union[bytes, Callable[[BaseHTTPRequestHandler], tuple[int, dict, bytes]]]
+
+
+class LocalFeedServer:
+    """
+    A threaded HTTP server serving fixed responses from a dictionary of routes.
+    A route is either the body to serve with status 200, or a callable receiving the request handler
+    and returning a status, headers and body.
+    """
+
+    def __init__(self, routes: dict[str, Route], delay: float = 0):
+        self.routes = routes
+        self.delay = delay
+        self.requests: list[tuple[str, dict]] = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def url(self, path: str) -> str:
+        return f'{self.base_url}{path}'
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append((self.path, dict(self.headers)))
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                try:
+                    time.sleep(server.delay)
+                    route = server.routes.get(self.path)
+                    if route is None:
+                        status, headers, body = 404, {}, b''
+                    elif callable(route):
+                        status, headers, body = route(self)
+                    else:
+                        status, headers, body = 200, {'Content-Type': 'application/rss+xml'}, route
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with server._lock:
+                        server.active -= 1
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> 'LocalFeedServer':
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
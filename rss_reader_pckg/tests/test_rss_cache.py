@@ -0,0 +1,337 @@
+import logging
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import unittest
+from datetime import date
+from unittest import mock
+
+from bs4 import BeautifulSoup
+
+from rss_reader_pckg.rss.cache_backends import PickleCacheBackend, RSSCache, SQLiteCacheBackend
+from rss_reader_pckg.rss.rss_cache import CacheReader, RetentionPolicy
+from rss_reader_pckg.rss.rss_classes import Feed, Item
+from rss_reader_pckg.rss.rss_parser import RSSParser
+
+FEED_URL = 'https://auto.onliner.by/feed'
+
+
+def parse_test_items():
+    rss_parser = RSSParser.__new__(RSSParser)
+    with open(f'{os.path.dirname(os.path.abspath(__file__))}/test_rss.xml', 'r', encoding='utf8') as f:
+        soup = BeautifulSoup(f.read(), features='xml')
+    return [rss_parser._parse_item(item) for item in soup.findAll('item')]
+
+
+def changed_item(item: Item, **changes) -> Item:
+    record = dict(zip(Item.__slots__, item.to_record()))
+    record.update(changes)
+    return Item.from_record(tuple(record.values()))
+
+
+class CacheBackendTests:
+    backend_class = None
+
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.backend = self.backend_class(f'{self.cache_dir.name}/{self.backend_class.default_file}')
+        self.items = parse_test_items()
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_empty_cache(self):
+        with self.assertRaises(FileNotFoundError):
+            self.backend.fetch_by_filters('20220626', None)
+        self.assertIsNone(self.backend.fetch_feed(FEED_URL))
+
+    def test_append_only_new_items(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[:3]))
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[1:]))
+        cached_feed = self.backend.fetch_feed(FEED_URL)
+        self.assertEqual(cached_feed.title, 'Авто Onlíner')
+        self.assertEqual([item.title.value for item in cached_feed.items],
+                         [item.title.value for item in self.items])
+
+    def test_items_with_the_same_guid_are_merged(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[:1]))
+        edited = changed_item(self.items[0], title_text='Edited title', link_text='https://auto.onliner.by/edited')
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, [edited]))
+        cached_items = self.backend.fetch_feed(FEED_URL).items
+        self.assertEqual([item.title_text for item in cached_items], [self.items[0].title_text])
+        self.assertEqual(cached_items[0].guid, self.items[0].guid)
+
+    def test_items_with_the_same_title_are_kept(self):
+        other = changed_item(self.items[0], guid=None, link_text='https://auto.onliner.by/other')
+        untitled = [changed_item(self.items[1], guid=None, link_text=None, description_text=description)
+                    for description in ('first', 'second', 'first')]
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[:1] + [other] + untitled))
+        cached_items = self.backend.fetch_feed(FEED_URL).items
+        self.assertEqual([item.title_text for item in cached_items],
+                         [self.items[0].title_text] * 2 + [self.items[1].title_text] * 2)
+
+    def test_feeds_are_matched_by_url(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[:2]))
+        self.backend.append(Feed('Авто Onlíner', 'https://other.by/feed', self.items[:2]))
+        self.backend.append(Feed('Renamed', FEED_URL, self.items))
+        self.assertEqual(len(self.backend.fetch_feed(FEED_URL).items), 5)
+        self.assertEqual(len(self.backend.fetch_feed('https://other.by/feed').items), 2)
+
+    def test_fetch_by_filters(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items))
+        self.backend.append(Feed('Other', 'https://other.by/feed', self.items[:1]))
+        by_date = self.backend.fetch_by_filters('20220626', None)
+        self.assertEqual(len(by_date), 3)
+        self.assertEqual(by_date[0].value, self.items[0].value)
+        self.assertEqual(len(self.backend.fetch_by_filters('20220626', FEED_URL)), 2)
+        self.assertEqual(len(self.backend.fetch_by_filters('20220625', FEED_URL)), 3)
+        self.assertEqual(self.backend.fetch_by_filters('20220101', None), [])
+
+    def test_fetch_by_dates(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[2:]))
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[:2]))
+        by_dates = self.backend.fetch_by_dates('20220625', '20220626', FEED_URL)
+        self.assertEqual([item.value for item in by_dates], [item.value for item in self.items[2:] + self.items[:2]])
+        self.assertEqual(len(self.backend.fetch_by_dates('20220626', '99999999', None)), 2)
+        self.assertEqual(self.backend.fetch_by_dates('20220627', '20220701', None), [])
+
+    def test_fetch_by_dates_stops_at_the_limit(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[2:]))
+        self.backend.append(Feed('Other', 'https://other.by/feed', self.items[:2]))
+        expected = self.backend.fetch_by_dates('00000000', '99999999', None)
+        for limit in (1, 3, 4, 10):
+            limited = self.backend.fetch_by_dates('00000000', '99999999', None, limit)
+            self.assertEqual([item.value for item in limited], [item.value for item in expected[:limit]])
+        self.assertEqual(len(self.backend.fetch_by_filters('20220626', 'https://other.by/feed', 1)), 1)
+
+    def test_evict_old_items(self):
+        undated = changed_item(self.items[0], guid='undated', date_text='')
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items + [undated]))
+        self.backend.append(Feed('Other', 'https://other.by/feed', self.items[2:]))
+        self.assertEqual(self.backend.evict('20220626', None), 6)
+        self.assertEqual([item.title_text for item in self.backend.fetch_feed(FEED_URL).items],
+                         [item.title_text for item in self.items[:2]] + [self.items[0].title_text])
+        self.assertIsNone(self.backend.fetch_feed('https://other.by/feed'))
+        self.assertEqual(self.backend.fetch_by_dates('00000000', '20220625', None), [])
+
+    def test_evict_items_above_the_limit(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, list(reversed(self.items))))
+        self.assertEqual(self.backend.evict(None, 2), 3)
+        self.assertEqual([item.title_text for item in self.backend.fetch_feed(FEED_URL).items],
+                         [item.title_text for item in reversed(self.items[:2])])
+        self.backend.compact()
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[:1]))
+        self.assertEqual(len(self.backend.fetch_feed(FEED_URL).items), 2)
+        self.assertEqual(self.backend.image_urls(), {url for item in self.items[:2] for url in item.image_urls})
+
+
+class TestPickleCacheBackend(CacheBackendTests, unittest.TestCase):
+    backend_class = PickleCacheBackend
+
+    def test_search_is_not_supported(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items))
+        with self.assertRaises(NotImplementedError):
+            self.backend.search('водитель', None, None, None, None)
+
+
+class TestPickleWriteAheadLog(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.path = f'{self.cache_dir.name}/{PickleCacheBackend.default_file}'
+        self.backend = PickleCacheBackend(self.path)
+        self.items = parse_test_items()
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def cached_titles(self) -> list[str]:
+        return [item.title_text for item in PickleCacheBackend(self.path).fetch_feed(FEED_URL).items]
+
+    def test_writes_append_new_items_to_the_log(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[:3]))
+        first_size = os.path.getsize(self.backend.log_path)
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items))
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items))
+        self.assertFalse(os.path.exists(self.path))
+        self.assertLess(os.path.getsize(self.backend.log_path), 2 * first_size)
+        self.assertEqual(self.cached_titles(), [item.title_text for item in self.items])
+
+    def test_torn_frame_is_ignored_and_overwritten(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[:2]))
+        with open(self.backend.log_path, 'ab') as log:
+            log.write(PickleCacheBackend.FRAME_HEADER.pack(1000) + b'torn')
+        self.assertEqual(len(self.cached_titles()), 2)
+        backend = PickleCacheBackend(self.path)
+        backend.append(Feed('Авто Onlíner', FEED_URL, self.items[2:]))
+        self.assertEqual(self.cached_titles(), [item.title_text for item in self.items])
+
+    def test_compaction(self):
+        self.backend.COMPACT_MIN_BYTES = 0
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[:2]))
+        self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.backend.log_path))
+        self.backend.COMPACT_MIN_BYTES = PickleCacheBackend.COMPACT_MIN_BYTES
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[2:]))
+        self.assertTrue(os.path.exists(self.backend.log_path))
+        self.backend.compact()
+        self.assertFalse(os.path.exists(self.backend.log_path))
+        self.assertFalse(os.path.exists(f'{self.path}.tmp'))
+        self.assertEqual(self.cached_titles(), [item.title_text for item in self.items])
+
+    def test_replaying_a_compacted_log_adds_nothing(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items))
+        with open(self.backend.log_path, 'rb') as log:
+            log_data = log.read()
+        self.backend.compact()
+        with open(self.backend.log_path, 'wb') as log:
+            log.write(log_data)
+        self.assertEqual(self.cached_titles(), [item.title_text for item in self.items])
+
+    def test_cache_pickled_without_item_keys(self):
+        cache = RSSCache([])
+        cache.append(Feed('Авто Onlíner', FEED_URL, self.items[:3]))
+        del cache.feed_positions, cache.item_keys
+        with open(self.path, 'wb') as f:
+            pickle.dump(cache, f)
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items))
+        self.assertEqual(self.cached_titles(), [item.title_text for item in self.items])
+
+
+class TestPickleCacheImport(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.items = parse_test_items()
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_pickle_cache_is_imported_by_default_reader(self):
+        path = f'{self.cache_dir.name}/{PickleCacheBackend.default_file}'
+        with open(path, 'wb') as f:
+            pickle.dump(RSSCache([Feed('Авто Onlíner', FEED_URL, self.items[:3])]), f)
+        PickleCacheBackend(path).append(Feed('Other', 'https://other.by/feed', self.items[3:]))
+        rss_cache = CacheReader(cache_dir=self.cache_dir.name)
+        self.assertIsInstance(rss_cache.backend, SQLiteCacheBackend)
+        self.assertEqual(len(rss_cache.fetch_by_dates('00000000', '99999999', None)), 5)
+        self.assertEqual(len(rss_cache.fetch_feed(FEED_URL).items), 3)
+        rss_cache = CacheReader(cache_dir=self.cache_dir.name)
+        self.assertEqual(len(rss_cache.fetch_by_dates('00000000', '99999999', None)), 5)
+
+
+class TestCacheGarbageCollection(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.items = [changed_item(item, image_urls=()) for item in parse_test_items()]
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_collect_garbage(self):
+        rss_cache = CacheReader(cache_dir=self.cache_dir.name, retention=RetentionPolicy(max_items=1))
+        rss_cache.cache_results(Feed('Авто Onlíner', FEED_URL, self.items))
+        report = rss_cache.collect_garbage()
+        self.assertEqual((report.items, report.images), (4, 0))
+        self.assertGreaterEqual(report.reclaimed_bytes, 0)
+        self.assertEqual(len(rss_cache.fetch_feed(FEED_URL).items), 1)
+
+    def test_retention_on_write(self):
+        retention = RetentionPolicy(max_age=(date.today() - date(2022, 6, 26)).days, max_items=1, on_write=True)
+        self.assertEqual(retention.oldest_day(), '20220626')
+        rss_cache = CacheReader(cache_dir=self.cache_dir.name, retention=retention)
+        rss_cache.cache_results(Feed('Авто Onlíner', FEED_URL, self.items[2:]))
+        self.assertIsNone(rss_cache.fetch_feed(FEED_URL))
+        rss_cache.cache_results(Feed('Авто Onlíner', FEED_URL, self.items))
+        self.assertEqual([item.title_text for item in rss_cache.fetch_feed(FEED_URL).items],
+                         [self.items[0].title_text])
+
+
+class TestSQLiteCacheBackend(CacheBackendTests, unittest.TestCase):
+    backend_class = SQLiteCacheBackend
+
+    def test_title_keys_are_migrated(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[:3]))
+        connection = sqlite3.connect(self.backend.path)
+        with connection:
+            connection.execute('UPDATE items SET item_key = title, guid = NULL')
+            connection.execute('PRAGMA user_version = 0')
+        connection.close()
+        backend = SQLiteCacheBackend(self.backend.path)
+        backend.append(Feed('Авто Onlíner', FEED_URL, self.items))
+        self.assertEqual([item.title_text for item in backend.fetch_feed(FEED_URL).items],
+                         [item.title_text for item in self.items])
+
+    def test_schema_is_set_up_once(self):
+        with mock.patch.object(SQLiteCacheBackend, '_set_up', wraps=self.backend._set_up) as set_up:
+            self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items))
+            self.backend.fetch_by_filters('20220626', None)
+            self.backend.search('водитель', None, None, None, None)
+            connection = self.backend._connect()
+            thread = threading.Thread(target=lambda: self.backend.fetch_feed(FEED_URL))
+            thread.start()
+            thread.join()
+            self.assertEqual(set_up.call_count, 1)
+            self.assertIs(self.backend._connect(), connection)
+            self.backend.close()
+            os.remove(self.backend.path)
+            self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[:1]))
+            self.assertEqual(set_up.call_count, 2)
+        self.assertEqual(len(self.backend.fetch_feed(FEED_URL).items), 1)
+
+    def search_titles(self, query: str, start=None, end=None, url=None, limit=None) -> list[str]:
+        return [item.title_text for item in self.backend.search(query, start, end, url, limit)]
+
+    def test_search_ranks_titles_first(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items))
+        titles = self.search_titles('Водитель')
+        self.assertEqual(titles, [self.items[0].title_text, self.items[2].title_text])
+        self.assertEqual(self.search_titles('водител*'), titles)
+        self.assertEqual(self.search_titles('лось водитель'), titles[:1])
+        self.assertEqual(self.search_titles('ёлка'), [])
+
+    def test_search_ranks_all_matches(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[:1]))
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items[1:]))
+        titles = [self.items[0].title_text, self.items[2].title_text]
+        self.assertEqual(self.search_titles('водитель'), titles)
+        self.assertEqual(self.search_titles('водитель', limit=1), titles[:1])
+        self.assertEqual(self.search_titles('водитель', url=FEED_URL, limit=1), titles[:1])
+        connection = sqlite3.connect(self.backend.path)
+        rank = connection.execute("SELECT v FROM items_fts_config WHERE k = 'rank'").fetchone()
+        connection.close()
+        self.assertEqual(rank, (SQLiteCacheBackend.SEARCH_RANK_CONFIG,))
+
+    def test_search_filters(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items))
+        self.backend.append(Feed('Other', 'https://other.by/feed', self.items[:1]))
+        self.assertEqual(len(self.search_titles('водитель')), 3)
+        self.assertEqual(self.search_titles('водитель', url=FEED_URL),
+                         [self.items[0].title_text, self.items[2].title_text])
+        self.assertEqual(self.search_titles('водитель', '20220625', '20220625'), [self.items[2].title_text])
+        self.assertEqual(self.search_titles('водитель', '20220626', None, FEED_URL), [self.items[0].title_text])
+        self.assertEqual(len(self.search_titles('водитель', limit=1)), 1)
+
+    def test_search_query_syntax_is_escaped(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items))
+        self.assertEqual(self.search_titles('"a" OR NOT (b'), [])
+        self.assertEqual(self.backend.search('--', None, None, None, None), [])
+
+    def test_search_index_is_built_for_old_caches(self):
+        self.backend.append(Feed('Авто Onlíner', FEED_URL, self.items))
+        connection = sqlite3.connect(self.backend.path)
+        with connection:
+            connection.executescript('DROP TABLE items_fts; DROP TRIGGER items_fts_insert; '
+                                     'DROP TRIGGER items_fts_delete; DROP TRIGGER items_fts_update; '
+                                     'PRAGMA user_version = 1;')
+        connection.close()
+        backend = SQLiteCacheBackend(self.backend.path)
+        self.assertEqual(len(backend.search('водитель', None, None, None, None)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import pickle
+import unittest
+
+from bs4 import NavigableString
+
+from rss_reader_pckg.rss.rss_classes import Element, ElementCollection, ElementType, Feed, Item
+
+TITLE = 'Ищем старые дизельные авто'
+LINK = 'https://auto.onliner.by/2022/06/26/ishhem-starye-dizelnye-avto'
+IMAGE = 'https://content.onliner.by/news/thumbnail/1.jpeg'
+
+
+def element_item() -> Item:
+    return Item(title=Element(ElementType.TITLE, TITLE),
+                date=Element(ElementType.PUB_DATE, '2022-06-26 08:00:09'),
+                link=Element(ElementType.LINK, LINK),
+                description=Element(ElementType.DESCRIPTION, 'Description'),
+                media_links=ElementCollection(ElementType.MEDIA, [Element(ElementType.MEDIA, LINK)]),
+                image_links=ElementCollection(ElementType.IMAGE, [Element(ElementType.IMAGE, IMAGE)]))
+
+
+class TestItem(unittest.TestCase):
+    def test_plain_and_element_values_are_equal(self):
+        plain_item = Item(TITLE, '2022-06-26 08:00:09', LINK, 'Description', [LINK], (IMAGE,))
+        self.assertEqual(plain_item, element_item())
+        self.assertEqual(plain_item.media_urls, (LINK,))
+
+    def test_string_subclasses_are_not_kept(self):
+        item = Item(NavigableString(TITLE), None, NavigableString(LINK), None, [NavigableString(LINK)], [])
+        self.assertIs(type(item.title_text), str)
+        self.assertIs(type(item.link_text), str)
+        self.assertIs(type(item.media_urls[0]), str)
+
+    def test_compatible_views(self):
+        item = element_item()
+        self.assertEqual(item.title.value, TITLE)
+        self.assertEqual(len(item.image_links), 1)
+        self.assertEqual(repr(item.media_links), f'[1]: {LINK} (Link)\n')
+        self.assertEqual(repr(Item(None, None, None, None, None, None)).splitlines()[:3],
+                         ['Title: Title was not found.', 'Date: Publish Date was not found.',
+                          'Link: Link was not found.'])
+
+    def test_json_output(self):
+        feed = json.loads(Feed('Feed', LINK, [element_item()]).to_json())
+        self.assertEqual(feed['items'][0], {'title': TITLE, 'content': {
+            'date': '2022-06-26 08:00:09', 'link': LINK, 'description': 'Description',
+            'media': [LINK], 'images': [IMAGE]}})
+
+    def test_pickle_round_trip(self):
+        item = element_item()
+        item.timestamp = 1656219609.0
+        self.assertEqual(pickle.loads(pickle.dumps(item)), item)
+
+    def test_legacy_pickled_state(self):
+        legacy_state = {'title': Element(ElementType.TITLE, TITLE),
+                        'date': Element(ElementType.PUB_DATE, '2022-06-26 08:00:09'),
+                        'link': Element(ElementType.LINK, LINK),
+                        'description': Element(ElementType.DESCRIPTION, 'Description'),
+                        'media_links': ElementCollection(ElementType.MEDIA, [Element(ElementType.MEDIA, LINK)]),
+                        'image_links': ElementCollection(ElementType.IMAGE, [Element(ElementType.IMAGE, IMAGE)])}
+        item = Item.__new__(Item)
+        item.__setstate__(legacy_state)
+        self.assertEqual(item, element_item())
+        self.assertIsNone(item.timestamp)
+
+
+if __name__ == '__main__':
+    unittest.main()
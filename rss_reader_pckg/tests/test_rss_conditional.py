@@ -0,0 +1,77 @@
+import logging
+import os
+import tempfile
+import unittest
+
+from rss_reader_pckg.rss.rss_cache import CacheReader
+from rss_reader_pckg.rss.rss_parser import RSSParser
+from rss_reader_pckg.tests.local_server import LocalFeedServer
+
+with open(f'{os.path.dirname(os.path.abspath(__file__))}/test_rss.xml', 'rb') as test_file:
+    TEST_RSS = test_file.read()
+
+ETAG = '"feed-v1"'
+LAST_MODIFIED = 'Sun, 26 Jun 2022 12:37:46 GMT'
+
+
+class TestConditionalGet(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.server = LocalFeedServer({'/feed.xml': self._feed_route}).__enter__()
+        self.rss = TEST_RSS.replace(b'https://content.onliner.by', self.server.base_url.encode())
+        self.url = self.server.url('/feed.xml')
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        self.cache_dir.cleanup()
+
+    def _feed_route(self, handler):
+        if handler.headers.get('If-None-Match') == ETAG:
+            return 304, {'ETag': ETAG}, b''
+        return 200, {'ETag': ETAG, 'Last-Modified': LAST_MODIFIED}, self.rss
+
+    def _parser(self) -> RSSParser:
+        return RSSParser(CacheReader(cache_dir=self.cache_dir.name))
+
+    def test_validators_are_sent(self):
+        self._parser().parse_source(self.url)
+        self._parser().parse_source(self.url)
+        feed_headers = [headers for path, headers in self.server.requests if path == '/feed.xml']
+        self.assertNotIn('If-None-Match', feed_headers[0])
+        self.assertEqual(feed_headers[1]['If-None-Match'], ETAG)
+        self.assertEqual(feed_headers[1]['If-Modified-Since'], LAST_MODIFIED)
+
+    def test_not_modified_served_from_cache(self):
+        first = self._parser().parse_source(self.url)
+        rss_parser = self._parser()
+        second = rss_parser.parse_source(self.url, '3')
+        self.assertIsNone(rss_parser.soup)
+        self.assertTrue(rss_parser.is_offline)
+        self.assertEqual(second.title, first.title)
+        self.assertEqual([item.value for item in second.items], [item.value for item in first.items[:3]])
+
+    def test_limited_parse_does_not_store_validators(self):
+        for stream in (False, True):
+            with self.subTest(stream=stream), tempfile.TemporaryDirectory() as cache_dir:
+                RSSParser(CacheReader(cache_dir=cache_dir), stream=stream).parse_source(self.url, '1')
+                rss_parser = RSSParser(CacheReader(cache_dir=cache_dir), stream=stream)
+                feed = rss_parser.parse_source(self.url)
+                self.assertFalse(rss_parser.is_offline)
+                self.assertEqual(len(feed.items), 5)
+                served = RSSParser(CacheReader(cache_dir=cache_dir), stream=stream).parse_source(self.url)
+                self.assertEqual([item.value for item in served.items], [item.value for item in feed.items])
+
+    def test_not_modified_without_cache_refetches(self):
+        rss_parser = self._parser()
+        rss_parser.parse_source(self.url)
+        os.remove(rss_parser.rss_cache.backend.path)
+        feed = self._parser().parse_source(self.url)
+        self.assertEqual(len(feed.items), 5)
+        feed_headers = [headers for path, headers in self.server.requests if path == '/feed.xml']
+        self.assertEqual(len(feed_headers), 3)
+        self.assertNotIn('If-None-Match', feed_headers[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
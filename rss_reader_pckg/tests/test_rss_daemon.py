@@ -0,0 +1,126 @@
+import logging
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+from rss_reader_pckg.rss.daemon import MAX_SEEN_KEYS, FeedSchedule, PollingDaemon, after_skip_hours, publish_period
+from rss_reader_pckg.rss.fetcher import FeedFetcher
+from rss_reader_pckg.rss.rss_cache import CacheReader
+from rss_reader_pckg.rss.rss_classes import Item
+from rss_reader_pckg.tests.local_server import LocalFeedServer
+
+with open(f'{os.path.dirname(os.path.abspath(__file__))}/test_rss.xml', 'rb') as test_file:
+    TEST_RSS = test_file.read()
+
+ETAG = '"feed-v1"'
+
+
+class FakeClock:
+    def __init__(self, now: float = 1656237600.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+class TestScheduling(unittest.TestCase):
+    def test_publish_period(self):
+        items = [Item(str(i), None, None, None, None, None, timestamp=1000.0 + gap)
+                 for i, gap in enumerate((0, 600, 1200, 3000))]
+        self.assertEqual(publish_period(items), 600)
+        self.assertIsNone(publish_period(items[:1]))
+
+    def test_skip_hours(self):
+        when = datetime(2022, 6, 26, 3, 30, tzinfo=timezone.utc).timestamp()
+        expected = datetime(2022, 6, 26, 5, 0, tzinfo=timezone.utc).timestamp()
+        self.assertEqual(after_skip_hours(when, frozenset((3, 4))), expected)
+        self.assertEqual(after_skip_hours(when, frozenset((5,))), when)
+
+    def test_adapt_interval(self):
+        daemon = PollingDaemon([], CacheReader.__new__(CacheReader), FeedFetcher(), interval=600)
+        schedule = FeedSchedule('url', interval=600)
+        self.assertEqual(daemon.adapt_interval(schedule, [], 0), 900)
+        self.assertEqual(daemon.adapt_interval(schedule, [], 2), 300)
+        schedule.ttl = 60
+        self.assertEqual(daemon.adapt_interval(schedule, [], 2), 3600)
+        schedule.failures = 3
+        self.assertEqual(daemon.backoff_delay(schedule), 4800)
+
+
+class TestPollingDaemon(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.status = 200
+        self.server = LocalFeedServer({'/feed.xml': self._feed_route}).__enter__()
+        self.rss = TEST_RSS.replace(b'https://content.onliner.by', self.server.base_url.encode())
+        self.url = self.server.url('/feed.xml')
+        self.clock = FakeClock()
+        self.daemon = PollingDaemon([self.url], CacheReader(cache_dir=self.cache_dir.name), FeedFetcher(),
+                                    interval=600, clock=self.clock, sleep=self.clock.sleep)
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        self.cache_dir.cleanup()
+
+    def _feed_route(self, handler):
+        if self.status != 200:
+            return self.status, {}, b''
+        if handler.headers.get('If-None-Match') == ETAG:
+            return 304, {'ETag': ETAG}, b''
+        return 200, {'ETag': ETAG}, self.rss
+
+    def test_polls_adapt_to_the_feed(self):
+        self.daemon.run(max_rounds=1)
+        schedule = self.daemon.schedules[self.url]
+        self.assertEqual(len(schedule.seen), 5)
+        self.assertEqual(schedule.interval, publish_period(self.daemon.rss_cache.fetch_feed(self.url).items))
+        first_interval = schedule.interval
+
+        self.daemon.run(max_rounds=1)
+        self.assertEqual(schedule.polls, 2)
+        self.assertEqual(schedule.interval, first_interval * 1.5)
+        self.assertEqual(self.server.requests[-1][1]['If-None-Match'], ETAG)
+        self.assertEqual(self.clock.now, 1656237600.0 + first_interval)
+
+    def test_seen_keys_are_bounded(self):
+        schedule = FeedSchedule(self.url)
+        self.assertEqual(schedule.remember([f'key{index}' for index in range(MAX_SEEN_KEYS)]), MAX_SEEN_KEYS)
+        self.assertEqual(schedule.remember(['key0', 'new']), 1)
+        self.assertEqual(len(schedule.seen), MAX_SEEN_KEYS)
+        self.assertNotIn('key1', schedule.seen)
+        self.assertIn('key0', schedule.seen)
+        self.assertEqual(schedule.remember(['key0', 'new']), 0)
+
+    def test_errors_back_off(self):
+        self.status = 500
+        self.daemon.poll_due()
+        schedule = self.daemon.schedules[self.url]
+        self.assertEqual(schedule.failures, 1)
+        self.assertEqual(self.daemon.next_poll, self.clock.now + 1200)
+        self.clock.now = self.daemon.next_poll
+        self.daemon.poll_due()
+        self.assertEqual(self.daemon.next_poll, self.clock.now + 2400)
+
+        self.status = 200
+        self.clock.now = self.daemon.next_poll
+        self.daemon.poll_due()
+        self.assertEqual(schedule.failures, 0)
+
+    def test_ttl_and_skip_hours_are_honoured(self):
+        self.rss = self.rss.replace(b'<generator>', b'<ttl>480</ttl><skipHours><hour>18</hour></skipHours>'
+                                                    b'<generator>', 1)
+        self.daemon.poll_due()
+        schedule = self.daemon.schedules[self.url]
+        self.assertEqual(schedule.ttl, 480)
+        self.assertEqual(schedule.skip_hours, frozenset((18,)))
+        self.assertEqual(schedule.interval, 8 * 3600)
+        self.assertEqual(self.daemon.next_poll, datetime(2022, 6, 26, 19, 0, tzinfo=timezone.utc).timestamp())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,18 @@
+import gc
 import logging
+import os
 import unittest
+import weakref
+from datetime import datetime, timezone
 
+from rss_reader_pckg.rss.dates import day_key, format_date, parse_date, timestamp
 from rss_reader_pckg.rss.rss_exception import RSSException
 from rss_reader_pckg.rss.rss_parser import RSSParser
+from rss_reader_pckg.tests.test_rss_formats import TEST_ATOM, soup_items
+
+
+with open(f'{os.path.dirname(os.path.abspath(__file__))}/test_rss.xml', 'rb') as test_file:
+    TEST_RSS = test_file.read()
 
 
 class TestRSSDateParser(unittest.TestCase):
@@ -23,6 +33,43 @@ class TestRSSDateParser(unittest.TestCase):
             self.rss_parser.parse_items_by_date('202206', None, None)
         self.assertEqual(e.exception.args[0], 'Date provided was not 8 characters')
 
+    def test_invalid_date_range(self):
+        with self.assertRaises(RSSException) as e:
+            self.rss_parser.parse_items_by_date_range('20220601', '2022063', None, None)
+        self.assertEqual(e.exception.args[0], 'Date provided was not 8 characters')
+
+
+class TestDateNormalization(unittest.TestCase):
+    def test_rfc_822(self):
+        self.assertEqual(format_date('Sun, 26 Jun 2022 12:37:46 +0300'), '2022-06-26 12:37:46')
+        self.assertEqual(timestamp('Sun, 26 Jun 2022 12:37:46 +0300'),
+                         datetime(2022, 6, 26, 9, 37, 46, tzinfo=timezone.utc).timestamp())
+
+    def test_iso_8601(self):
+        self.assertEqual(format_date('2022-06-25T22:54:49Z'), '2022-06-25 22:54:49')
+        self.assertEqual(format_date('2022-06-25T22:54:49+03:00'), '2022-06-25 22:54:49')
+        self.assertEqual(day_key('2022-06-25 22:54:49'), '20220625')
+
+    def test_fallback_format(self):
+        self.assertEqual(format_date('June 26, 2022 8:00 PM'), '2022-06-26 20:00:00')
+
+    def test_memoized(self):
+        parse_date.cache_clear()
+        day_key('Sat, 25 Jun 2022 14:14:11 +0300')
+        format_date('Sat, 25 Jun 2022 14:14:11 +0300')
+        self.assertEqual(parse_date.cache_info().hits, 1)
+
+    def test_memoized_dates_do_not_keep_documents(self):
+        for content in (TEST_ATOM, TEST_RSS):
+            parse_date.cache_clear()
+            soup_parser, items = soup_items(content)
+            self.assertTrue(items)
+            self.assertGreater(parse_date.cache_info().currsize, 0)
+            soup = weakref.ref(soup_parser.soup)
+            del soup_parser, items
+            gc.collect()
+            self.assertIsNone(soup())
+
 
 if __name__ == '__main__':
     unittest.main()
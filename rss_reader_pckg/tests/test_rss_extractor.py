@@ -0,0 +1,46 @@
+import logging
+import os
+import unittest
+
+from bs4 import BeautifulSoup
+
+from rss_reader_pckg.rss.lxml_extractor import extract_item
+from rss_reader_pckg.rss.rss_parser import RSSParser
+from rss_reader_pckg.rss.stream_parser import StreamParser
+
+with open(f'{os.path.dirname(os.path.abspath(__file__))}/test_rss.xml', 'rb') as test_file:
+    TEST_RSS = test_file.read()
+
+
+def comparable(item):
+    value = item.value
+    value['content']['media'] = sorted(value['content']['media'])
+    value['content']['images'] = sorted(value['content']['images'])
+    return value
+
+
+class TestLxmlExtractor(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        soup_parser = RSSParser.__new__(RSSParser)
+        soup_parser.soup = BeautifulSoup(TEST_RSS, features='xml')
+        self.expected = [soup_parser._parse_item(item) for item in soup_parser.items()]
+        self.extracted = [extract_item(element) for element in StreamParser().iter_items([TEST_RSS])]
+
+    def test_same_items_as_soup(self):
+        self.assertEqual(len(self.extracted), len(self.expected))
+        for extracted, expected in zip(self.extracted, self.expected):
+            self.assertEqual(comparable(extracted), comparable(expected))
+
+    def test_item_fields(self):
+        item = self.extracted[0]
+        self.assertEqual(item.title.value, 'Ночью под Борисовом лось вышел на дорогу, погиб водитель')
+        self.assertEqual(item.date.value, '2022-06-26 12:37:46')
+        self.assertEqual([image.value for image in item.image_links.elements],
+                         ['https://content.onliner.by/news/thumbnail/7d72bd56d1630b2a2e7d2fe5c8665f28.jpeg'])
+        self.assertNotIn('https://content.onliner.by/news/thumbnail/7d72bd56d1630b2a2e7d2fe5c8665f28.jpeg',
+                         [media.value for media in item.media_links.elements])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import logging
+import os
+import tempfile
+import time
+import unittest
+
+from rss_reader_pckg.rss.fetcher import FeedFetcher
+from rss_reader_pckg.rss.rss_cache import CacheReader
+from rss_reader_pckg.rss.rss_exception import RSSException
+from rss_reader_pckg.rss.rss_parser import RSSParser
+from rss_reader_pckg.tests.local_server import LocalFeedServer
+
+with open(f'{os.path.dirname(os.path.abspath(__file__))}/test_rss.xml', 'rb') as test_file:
+    TEST_RSS = test_file.read()
+
+
+class TestFeedFetcher(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.paths = [f'/feed{index}.xml' for index in range(4)]
+        self.cache_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_fetch_all_is_concurrent(self):
+        with LocalFeedServer({path: TEST_RSS for path in self.paths}, delay=0.3) as server:
+            start = time.perf_counter()
+            results = FeedFetcher(max_workers=4, per_host=4).fetch_all([server.url(p) for p in self.paths])
+            elapsed = time.perf_counter() - start
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(server.max_active, 4)
+        self.assertLess(elapsed, 1.0)
+
+    def test_per_host_limit(self):
+        with LocalFeedServer({path: TEST_RSS for path in self.paths}, delay=0.1) as server:
+            FeedFetcher(max_workers=4, per_host=1).fetch_all([server.url(p) for p in self.paths])
+        self.assertEqual(server.max_active, 1)
+
+    def test_failed_feed_is_reported(self):
+        with LocalFeedServer({'/feed.xml': TEST_RSS}) as server:
+            results = FeedFetcher().fetch_all([server.url('/feed.xml'), server.url('/missing.xml')])
+        self.assertTrue(results[0].ok)
+        self.assertFalse(results[1].ok)
+        self.assertEqual(results[1].status, 404)
+
+    def test_parse_sources_merges_feeds(self):
+        with LocalFeedServer({}) as server:
+            local_rss = TEST_RSS.replace(b'https://content.onliner.by', server.base_url.encode())
+            server.routes.update({path: local_rss for path in self.paths[:2]})
+            rss_parser = RSSParser(CacheReader(cache_dir=self.cache_dir.name))
+            rss_parser.parse_sources([server.url(p) for p in self.paths[:2]] + [server.url('/missing.xml')], '2')
+        self.assertEqual(len(rss_parser.feeds), 2)
+        self.assertEqual([feed.url for feed in rss_parser.feeds], [server.url(p) for p in self.paths[:2]])
+        self.assertEqual(len(rss_parser.parsed_items), 4)
+        self.assertEqual(rss_parser.feed_title, 'News fetched from 2 feeds.')
+
+    def test_parse_sources_skips_malformed_feeds(self):
+        malformed = (b'<rss><channel><title>Broken</title><item><pubDate>yesterday</pubDate></item>'
+                     b'<item><title>Unclosed</title></channel>')
+        for stream in (False, True):
+            with self.subTest(stream=stream), LocalFeedServer({'/broken.xml': malformed}) as server:
+                local_rss = TEST_RSS.replace(b'https://content.onliner.by', server.base_url.encode())
+                server.routes['/feed.xml'] = local_rss
+                rss_parser = RSSParser(CacheReader(cache_dir=self.cache_dir.name), stream=stream)
+                rss_parser.parse_sources([server.url('/broken.xml'), server.url('/feed.xml')], '2')
+            self.assertEqual([feed.url for feed in rss_parser.feeds], [server.url('/feed.xml')])
+            self.assertEqual(len(rss_parser.parsed_items), 2)
+
+    def test_parse_sources_all_failed(self):
+        with LocalFeedServer({}) as server:
+            rss_parser = RSSParser(CacheReader(cache_dir=self.cache_dir.name))
+            with self.assertRaises(RSSException) as e:
+                rss_parser.parse_sources([server.url('/missing.xml')])
+        self.assertEqual(e.exception.args[0], 'None of the given feeds could be fetched.')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import logging
+import unittest
+
+from rss_reader_pckg.rss.feed_formats import ATOM, RSS_1, RSS_2, detect_format
+from rss_reader_pckg.rss.lxml_extractor import extract_item
+from rss_reader_pckg.rss.pipeline import parse_feed_content
+from rss_reader_pckg.rss.rss_parser import RSSParser
+from rss_reader_pckg.rss.stream_parser import StreamParser
+from rss_reader_pckg.tests.test_rss_extractor import comparable
+
+TEST_ATOM = b'''<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:media="http://search.yahoo.com/mrss/">
+  <title>Atom news</title>
+  <link href="https://example.com/"/>
+  <updated>2022-06-26T12:37:46Z</updated>
+  <entry>
+    <title>Elk on the road</title>
+    <link rel="alternate" href="https://example.com/news/1"/>
+    <link rel="enclosure" type="image/jpeg" href="https://example.com/images/1.jpeg"/>
+    <link rel="related" href="https://example.com/related/1"/>
+    <id>urn:uuid:1</id>
+    <published>2022-06-26T12:37:46+03:00</published>
+    <updated>2022-06-27T08:00:00+03:00</updated>
+    <summary>A short &lt;b&gt;summary&lt;/b&gt;.</summary>
+    <content type="html">The whole story.</content>
+    <media:content url="https://example.com/video/1.mp4" type="video/mp4"/>
+    <media:thumbnail url="https://example.com/thumbnails/1.jpeg"/>
+  </entry>
+  <entry>
+    <title>Updated only</title>
+    <link href="https://example.com/news/2"/>
+    <id>urn:uuid:2</id>
+    <updated>2022-06-25T10:00:00Z</updated>
+    <content type="html">Only content.</content>
+  </entry>
+</feed>
+'''
+
+TEST_RSS_1 = b'''<?xml version="1.0" encoding="utf-8"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/"
+         xmlns:dc="http://purl.org/dc/elements/1.1/">
+  <channel rdf:about="https://example.com/">
+    <title>RDF news</title>
+    <link>https://example.com/</link>
+    <description>News in RSS 1.0</description>
+  </channel>
+  <item rdf:about="https://example.com/news/1">
+    <title>Elk on the road</title>
+    <link>https://example.com/news/1</link>
+    <description>A short story.</description>
+    <dc:date>2022-06-26T12:37:46+03:00</dc:date>
+  </item>
+</rdf:RDF>
+'''
+
+
+def soup_items(content):
+    soup_parser = RSSParser.__new__(RSSParser)
+    soup_parser.load_soup(content)
+    return soup_parser, [soup_parser._parse_item(item) for item in soup_parser.items()]
+
+
+def stream_items(content):
+    stream_parser = StreamParser()
+    return stream_parser, [extract_item(element) for element in stream_parser.iter_items([content])]
+
+
+class TestFeedFormats(unittest.TestCase):
+    def test_detect_format(self):
+        self.assertIs(detect_format('feed'), ATOM)
+        self.assertIs(detect_format('RDF'), RSS_1)
+        self.assertIs(detect_format('rss'), RSS_2)
+
+    def test_accepts_foreign_tags_only(self):
+        self.assertTrue(ATOM.accepts('content', ATOM.namespace))
+        self.assertFalse(ATOM.accepts('content', 'http://search.yahoo.com/mrss/'))
+        self.assertTrue(ATOM.accepts('thumbnail', 'http://search.yahoo.com/mrss/'))
+        self.assertTrue(RSS_2.accepts('content', 'http://search.yahoo.com/mrss/'))
+
+
+class TestAtomFeed(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.soup_parser, self.expected = soup_items(TEST_ATOM)
+        self.stream_parser, self.extracted = stream_items(TEST_ATOM)
+
+    def test_same_items_as_soup(self):
+        self.assertEqual(len(self.expected), 2)
+        self.assertEqual([comparable(item) for item in self.extracted], [comparable(item) for item in self.expected])
+
+    def test_feed_title(self):
+        self.assertEqual(parse_feed_content(TEST_ATOM, 'bs4')[0], 'Atom news')
+        self.assertEqual(self.stream_parser.title, 'Atom news')
+
+    def test_entry_fields(self):
+        for item in (self.expected[0], self.extracted[0]):
+            self.assertEqual(item.title.value, 'Elk on the road')
+            self.assertEqual(item.link.value, 'https://example.com/news/1')
+            self.assertEqual(item.date.value, '2022-06-26 12:37:46')
+            self.assertEqual(item.guid, 'urn:uuid:1')
+            self.assertEqual(item.description.value, 'A short summary.')
+            self.assertEqual([image.value for image in item.image_links.elements],
+                             ['https://example.com/images/1.jpeg', 'https://example.com/thumbnails/1.jpeg'])
+            self.assertIn('https://example.com/video/1.mp4', [media.value for media in item.media_links.elements])
+
+    def test_updated_and_content_fallbacks(self):
+        for item in (self.expected[1], self.extracted[1]):
+            self.assertEqual(item.link.value, 'https://example.com/news/2')
+            self.assertEqual(item.date.value[:10], '2022-06-25')
+            self.assertEqual(item.description.value, 'Only content.')
+
+    def test_pipeline_engines_agree(self):
+        self.assertEqual(parse_feed_content(TEST_ATOM, 'bs4'), parse_feed_content(TEST_ATOM, 'lxml'))
+
+
+class TestRSS1Feed(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.soup_parser, self.expected = soup_items(TEST_RSS_1)
+        self.stream_parser, self.extracted = stream_items(TEST_RSS_1)
+
+    def test_same_items_as_soup(self):
+        self.assertEqual(len(self.expected), 1)
+        self.assertEqual([comparable(item) for item in self.extracted], [comparable(item) for item in self.expected])
+
+    def test_item_fields(self):
+        self.assertEqual(self.stream_parser.title, 'RDF news')
+        item = self.extracted[0]
+        self.assertEqual(item.link.value, 'https://example.com/news/1')
+        self.assertEqual(item.date.value, '2022-06-26 12:37:46')
+        self.assertEqual(item.description.value, 'A short story.')
+
+
+if __name__ == '__main__':
+    unittest.main()
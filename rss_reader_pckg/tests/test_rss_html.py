@@ -0,0 +1,69 @@
+import io
+import logging
+import os
+import tempfile
+import unittest
+
+from rss_reader_pckg.rss.html_converter import FragmentCache, html_feed, write_html
+from rss_reader_pckg.rss.rss_classes import Feed, Item
+from rss_reader_pckg.tests.test_rss_cache import changed_item, parse_test_items
+
+
+class TestHTMLConverter(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.cache_dir.name, 'html_fragments.json')
+        self.items = parse_test_items()
+        self.feed = Feed('Авто Onlíner', 'https://auto.onliner.by/feed', self.items)
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_styles_are_shared(self):
+        html = html_feed(self.feed)
+        self.assertEqual(html.count('<style>'), 1)
+        self.assertNotIn(' style=', html)
+        self.assertEqual(html.count('class="item"'), 5)
+        self.assertIn('background-color: #DAA520', html)
+        self.assertIn('background-color: white', html_feed(self.feed, for_pdf=True))
+        for item in self.items:
+            self.assertIn(f'<h3>{item.title_text}</h3>', html)
+            self.assertIn(f'href="{item.link_text}" class="source-link"', html)
+
+    def test_streamed_document_matches(self):
+        stream = io.StringIO()
+        write_html(self.feed, stream, fragment_cache=FragmentCache(self.path))
+        self.assertEqual(stream.getvalue(), html_feed(self.feed))
+
+    def test_only_new_items_are_rendered(self):
+        fragment_cache = FragmentCache(self.path)
+        html_feed(Feed(self.feed.title, self.feed.url, self.items[1:]), fragment_cache=fragment_cache)
+        self.assertEqual(fragment_cache.rendered, 4)
+
+        fragment_cache = FragmentCache(self.path)
+        self.assertEqual(html_feed(self.feed, fragment_cache=fragment_cache), html_feed(self.feed))
+        self.assertEqual(fragment_cache.rendered, 1)
+
+    def test_changed_items_are_rendered_again(self):
+        html_feed(self.feed, fragment_cache=FragmentCache(self.path))
+        edited = changed_item(self.items[0], title_text='Edited title')
+        fragment_cache = FragmentCache(self.path)
+        html = html_feed(Feed(self.feed.title, self.feed.url, [edited]), fragment_cache=fragment_cache)
+        self.assertEqual(fragment_cache.rendered, 1)
+        self.assertIn('<h3>Edited title</h3>', html)
+
+    def test_least_recently_used_fragments_are_dropped(self):
+        fragment_cache = FragmentCache(self.path, max_fragments=2)
+        html_feed(self.feed, fragment_cache=fragment_cache)
+        self.assertEqual(list(FragmentCache(self.path).fragments), [item.key for item in self.items[-2:]])
+
+    def test_items_without_images(self):
+        item = Item('Title', '2022-06-26 12:37:46', 'https://onliner.by', 'Text', [], [])
+        html = html_feed(Feed('Feed', None, [item]))
+        self.assertNotIn('Images:', html)
+        self.assertNotIn('Media Links:', html)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import hashlib
+import logging
+import os
+import tempfile
+import unittest
+
+from rss_reader_pckg.rss.html_converter import html_feed
+from rss_reader_pckg.rss.image_store import ImageStore
+from rss_reader_pckg.rss.rss_classes import Element, ElementCollection, ElementType, Feed, Item
+from rss_reader_pckg.tests.local_server import LocalFeedServer
+
+FIRST_IMAGE = b'first image'
+SECOND_IMAGE = b'second image'
+
+
+class TestImageStore(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.store = ImageStore(self.cache_dir.name)
+        self.server = LocalFeedServer({'/a/logo.png': FIRST_IMAGE, '/b/logo.png': SECOND_IMAGE,
+                                       '/c/copy.png': FIRST_IMAGE}).__enter__()
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        self.cache_dir.cleanup()
+
+    def test_same_basename_is_not_overwritten(self):
+        first, second = self.server.url('/a/logo.png'), self.server.url('/b/logo.png')
+        self.store.download_all([first, second])
+        with open(self.store.resolve(first), 'rb') as f:
+            self.assertEqual(f.read(), FIRST_IMAGE)
+        with open(self.store.resolve(second), 'rb') as f:
+            self.assertEqual(f.read(), SECOND_IMAGE)
+        self.assertEqual(self.store.index[first], f'{hashlib.sha256(FIRST_IMAGE).hexdigest()}.png')
+
+    def test_equal_images_are_stored_once(self):
+        self.store.download_all([self.server.url('/a/logo.png'), self.server.url('/c/copy.png')])
+        self.assertEqual(self.store.resolve(self.server.url('/a/logo.png')),
+                         self.store.resolve(self.server.url('/c/copy.png')))
+        self.assertEqual(len([name for name in os.listdir(self.store.directory) if name.endswith('.png')]), 1)
+
+    def test_stored_images_are_skipped(self):
+        url = self.server.url('/a/logo.png')
+        self.store.download_all([url, url])
+        ImageStore(self.cache_dir.name).download_all([url])
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_background_download(self):
+        url = self.server.url('/a/logo.png')
+        self.store.download_all([url, self.server.url('/missing.png')], background=True)
+        self.store.wait()
+        self.assertIsNotNone(ImageStore(self.cache_dir.name).resolve(url))
+        self.assertIsNone(self.store.resolve(self.server.url('/missing.png')))
+
+    def test_unused_images_are_collected(self):
+        first, second = self.server.url('/a/logo.png'), self.server.url('/b/logo.png')
+        self.store.download_all([first, second])
+        with open(f'{self.store.directory}/{"0" * 64}.png', 'wb') as f:
+            f.write(b'orphan')
+        removed = self.store.collect_garbage({first})
+        self.assertEqual(removed, (2, len(SECOND_IMAGE) + len(b'orphan')))
+        self.assertIsNotNone(self.store.resolve(first))
+        self.assertIsNone(ImageStore(self.cache_dir.name).resolve(second))
+
+    def test_least_recently_used_images_are_evicted(self):
+        first, second = self.server.url('/a/logo.png'), self.server.url('/b/logo.png')
+        self.store.download_all([first, second])
+        os.utime(self.store.resolve(first), (0, 0))
+        os.utime(f'{self.store.directory}/{self.store.index[second]}', (1, 1))
+        self.store.resolve(first)
+        self.assertEqual(self.store.collect_garbage(max_bytes=len(FIRST_IMAGE)), (1, len(SECOND_IMAGE)))
+        self.assertIsNotNone(self.store.resolve(first))
+        self.assertIsNone(self.store.resolve(second))
+
+    def test_budget_is_enforced_after_downloads(self):
+        store = ImageStore(self.cache_dir.name, max_bytes=0)
+        store.download_all([self.server.url('/a/logo.png'), self.server.url('/b/logo.png')])
+        self.assertEqual(store.index, {})
+        self.assertEqual(os.listdir(store.directory), ['index.json'])
+
+    def test_html_images_resolve_through_index(self):
+        url = self.server.url('/a/logo.png')
+        self.store.download_all([url])
+        item = Item(Element(ElementType.TITLE, 'Title'), Element(ElementType.PUB_DATE, '2022-06-26 12:37:46'),
+                    Element(ElementType.LINK, 'https://onliner.by'), Element(ElementType.DESCRIPTION, ''),
+                    ElementCollection(ElementType.MEDIA, []),
+                    ElementCollection(ElementType.IMAGE, [Element(ElementType.IMAGE, url)]))
+        html = html_feed(Feed('Feed', None, [item]), is_cache=True, image_store=self.store)
+        self.assertIn(f'src="{self.store.resolve(url)}"', html)
+
+
+if __name__ == '__main__':
+    unittest.main()
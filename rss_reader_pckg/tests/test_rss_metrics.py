@@ -0,0 +1,69 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+
+from rss_reader_pckg.rss.metrics import Metrics
+from rss_reader_pckg.tests.test_rss_cache import parse_test_items
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics()
+
+    def test_disabled_metrics_record_nothing(self):
+        with self.metrics.timer('parse', 5):
+            pass
+        self.metrics.count('fetch.bytes', 100)
+        self.metrics.observe('parse', 1.0)
+        self.assertEqual(self.metrics.snapshot(), {'timers': {}, 'counters': {}})
+
+    def test_timers_and_counters(self):
+        self.metrics.enable()
+        with self.metrics.timer('parse') as timer:
+            timer.count = 4
+        self.metrics.observe('parse', 2.0, 4)
+        self.metrics.count('fetch.bytes', 100)
+        self.metrics.count('fetch.bytes', 50)
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot['timers']['parse']['count'], 8)
+        self.assertEqual(snapshot['timers']['parse']['max_seconds'], 2.0)
+        self.assertAlmostEqual(snapshot['timers']['parse']['mean_seconds'], 0.25, places=2)
+        self.assertEqual(snapshot['counters'], {'fetch.bytes': 150})
+
+    def test_enable_resets(self):
+        self.metrics.enable()
+        self.metrics.count('fetch.retries')
+        self.metrics.enable()
+        self.assertEqual(self.metrics.counters, {})
+
+    def test_output_formats(self):
+        self.metrics.enable()
+        self.metrics.observe('render.html', 0.5, 10)
+        self.metrics.count('fetch.bytes', 2048)
+        table = self.metrics.to_table()
+        self.assertIn('render.html', table)
+        self.assertIn('2048', table)
+        prometheus = self.metrics.to_prometheus()
+        self.assertIn('# TYPE rss_reader_render_html_seconds summary', prometheus)
+        self.assertIn('rss_reader_render_html_seconds_count 10', prometheus)
+        self.assertIn('rss_reader_fetch_bytes_total 2048', prometheus)
+        with tempfile.TemporaryDirectory() as directory:
+            self.metrics.write(os.path.join(directory, 'metrics.json'))
+            self.metrics.write(os.path.join(directory, 'metrics.prom'))
+            with open(os.path.join(directory, 'metrics.json'), 'r', encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['counters'], {'fetch.bytes': 2048})
+            with open(os.path.join(directory, 'metrics.prom'), 'r', encoding='utf-8') as f:
+                self.assertEqual(f.read(), prometheus)
+
+
+class TestItemLogging(unittest.TestCase):
+    def test_items_are_not_logged_when_verbose(self):
+        logging.disable(logging.NOTSET)
+        with self.assertNoLogs(level=logging.INFO):
+            parse_test_items()
+
+
+if __name__ == '__main__':
+    unittest.main()
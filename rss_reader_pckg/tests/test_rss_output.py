@@ -0,0 +1,58 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from rss_reader_pckg.rss.output import save_feed, write_feed
+from rss_reader_pckg.rss.rss_classes import Feed, Item
+
+LINK = 'https://auto.onliner.by/2022/06/26/ishhem-starye-dizelnye-avto'
+
+
+def make_feed(item_count: int, url=LINK) -> Feed:
+    items = [Item(f'Новость {i}', '2022-06-26 08:00:09', f'{LINK}/{i}', None, [LINK], [])
+             for i in range(item_count)]
+    return Feed('Onliner', url, items)
+
+
+def reference_json(feed: Feed) -> str:
+    json_dict = {'title': feed.title, 'items': [item.value for item in feed.items]}
+    if feed.url:
+        json_dict['url'] = feed.url
+    return json.dumps(json_dict, indent=2)
+
+
+def written(feed: Feed, output_format: str) -> str:
+    stream = io.StringIO()
+    write_feed(feed, stream, output_format)
+    return stream.getvalue()
+
+
+class TestOutput(unittest.TestCase):
+    def test_json_is_equal_to_dumping_the_whole_feed(self):
+        for feed in (make_feed(0), make_feed(1), make_feed(3), make_feed(2, url=None)):
+            self.assertEqual(feed.to_json(), reference_json(feed))
+            self.assertEqual(written(feed, 'json'), reference_json(feed) + '\n')
+
+    def test_text_is_equal_to_printing_the_feed(self):
+        for feed in (make_feed(0), make_feed(2)):
+            self.assertEqual(written(feed, 'text'), f'{feed!r}\n')
+        self.assertTrue(repr(make_feed(2)).startswith(f'Feed URL: {LINK}\nFeed Title: Onliner\n\n'))
+
+    def test_json_lines(self):
+        lines = written(make_feed(3), 'jsonl').splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[2])['title'], 'Новость 2')
+        self.assertEqual(written(make_feed(0), 'jsonl'), '')
+
+    def test_save_to_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'news.json')
+            save_feed(make_feed(2), path, 'json')
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['items'][1]['title'], 'Новость 1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,7 @@ from bs4 import BeautifulSoup
 
 from rss_reader_pckg.rss.rss_exception import RSSException
 from rss_reader_pckg.rss.rss_parser import RSSParser
+from rss_reader_pckg.rss_reader import cached_source
 
 logging.disable(logging.ERROR)
 
@@ -46,6 +47,13 @@ class TestRSSParser(unittest.TestCase):
         self.assertEqual(self.rss_parser._parse_title(item[0]).value,
                          'Ночью под Борисовом лось вышел на дорогу, погиб водитель')
 
+    def test_cache_reads_take_one_source(self):
+        self.assertIsNone(cached_source([]))
+        self.assertEqual(cached_source(['https://auto.onliner.by/feed']), 'https://auto.onliner.by/feed')
+        with self.assertRaises(RSSException) as e:
+            cached_source(['https://auto.onliner.by/feed', 'https://other.by/feed'])
+        self.assertEqual(e.exception.args[0], 'Searching the cache and the date filters take one source, 2 were given.')
+
 
 if __name__ == '__main__':
     unittest.main()
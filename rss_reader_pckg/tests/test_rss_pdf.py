@@ -0,0 +1,65 @@
+import io
+import logging
+import os
+import tempfile
+import unittest
+
+from pypdf import PdfReader
+
+from rss_reader_pckg.rss.image_store import ImageStore
+from rss_reader_pckg.rss.pdf_converter import local_link, pdf_feed_chunks
+from rss_reader_pckg.rss.rss_classes import Feed, Item
+from rss_reader_pckg.tests.local_server import LocalFeedServer
+
+PNG = bytes.fromhex('89504e470d0a1a0a0000000d49484452000000010000000108060000001f15c4890000000b49444154789c63f80f'
+                    '040009fb03fdfb5e6b2b0000000049454e44ae426082')
+
+
+def make_items(count: int, image_links: tuple = ()) -> list[Item]:
+    return [Item(f'News {index}', '2022-06-26 12:37:46', f'https://onliner.by/{index}', 'Text', [], image_links)
+            for index in range(count)]
+
+
+class TestPDFConverter(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.image_store = ImageStore(self.cache_dir.name)
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def convert(self, feed: Feed, **kwargs) -> PdfReader:
+        output = io.BytesIO()
+        self.assertFalse(pdf_feed_chunks(feed, output, self.image_store, **kwargs))
+        return PdfReader(output)
+
+    def test_chunks_are_concatenated(self):
+        feed = Feed('Feed', None, make_items(5))
+        single = self.convert(feed)
+        chunked = self.convert(feed, chunk_size=2, workers=1)
+        parallel = self.convert(feed, chunk_size=2, workers=2)
+        self.assertEqual(len(chunked.pages), 3 * len(single.pages))
+        self.assertEqual(len(parallel.pages), len(chunked.pages))
+        texts = [page.extract_text() for page in parallel.pages]
+        self.assertIn('Feed', texts[0])
+        self.assertNotIn('Feed', texts[1])
+        self.assertIn('News 4', texts[2])
+
+    def test_cached_images_are_embedded(self):
+        with LocalFeedServer({'/logo.png': PNG}) as server:
+            url = server.url('/logo.png')
+            self.image_store.download_all([url])
+            self.convert(Feed('Feed', None, make_items(3, (url,))), chunk_size=2, workers=1)
+            self.assertEqual(len(server.requests), 1)
+
+    def test_local_link(self):
+        path = os.path.join(self.cache_dir.name, 'image.png')
+        with open(path, 'wb') as f:
+            f.write(PNG)
+        self.assertEqual(local_link(os.path.relpath(path)), os.path.abspath(path))
+        self.assertEqual(local_link('https://onliner.by/image.png'), 'https://onliner.by/image.png')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import logging
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+
+from rss_reader_pckg.rss.pipeline import IngestPipeline, parse_feed_content
+from rss_reader_pckg.rss.rss_cache import CacheReader
+from rss_reader_pckg.rss.rss_parser import RSSParser
+from rss_reader_pckg.rss.rss_exception import RSSException
+from rss_reader_pckg.tests.local_server import LocalFeedServer
+
+with open(f'{os.path.dirname(os.path.abspath(__file__))}/test_rss.xml', 'rb') as test_file:
+    TEST_RSS = test_file.read()
+
+
+class TestIngestPipeline(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.server = LocalFeedServer({}).__enter__()
+        self.rss = TEST_RSS.replace(b'https://content.onliner.by', self.server.base_url.encode())
+        self.server.routes['/feed.xml'] = self.rss
+        self.paths = []
+        for index in range(3):
+            path = os.path.join(self.cache_dir.name, f'feed_{index}.xml')
+            with open(path, 'wb') as f:
+                f.write(self.rss.replace('Авто Onlíner'.encode(), f'Feed {index}'.encode()))
+            self.paths.append(path)
+        self.rss_cache = CacheReader(cache_dir=os.path.join(self.cache_dir.name, 'cache'))
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+        self.cache_dir.cleanup()
+
+    def test_records_match_items(self):
+        title, records = parse_feed_content(self.rss, 'lxml', 2)
+        self.assertEqual(title, 'Авто Onlíner')
+        self.assertEqual(len(records), 2)
+        bs4_title, bs4_records = parse_feed_content(self.rss, 'bs4')
+        self.assertEqual(len(bs4_records), 5)
+        self.assertEqual([record[0] for record in bs4_records[:2]], [record[0] for record in records])
+
+    def test_local_files_and_urls(self):
+        sources = self.paths + [self.server.url('/feed.xml'), self.server.url('/missing.xml')]
+        pipeline = IngestPipeline(self.rss_cache, parse_workers=2, queue_size=1, batch_size=2)
+        results, stats = pipeline.run(sources)
+        self.assertEqual([result.source for result in results], sources)
+        self.assertEqual((stats.feeds, stats.items, stats.failed), (4, 20, 1))
+        self.assertEqual(results[1].feed.title, 'Feed 1')
+        self.assertIsNotNone(results[-1].error)
+        for source in sources[:-1]:
+            self.assertEqual(len(self.rss_cache.fetch_feed(source).items), 5)
+
+    def test_limited_feeds_do_not_store_validators(self):
+        self.server.routes['/feed.xml'] = lambda handler: (200, {'ETag': '"v1"'}, self.rss)
+        url = self.server.url('/feed.xml')
+        results, _ = IngestPipeline(self.rss_cache, parse_workers=1).run([url], limit=2)
+        self.assertFalse(results[0].complete)
+        self.assertIsNone(self.rss_cache.validators.get(url))
+        results, _ = IngestPipeline(self.rss_cache, parse_workers=1).run([url])
+        self.assertTrue(results[0].complete)
+        self.assertEqual(self.rss_cache.validators.get(url)['etag'], '"v1"')
+        self.assertEqual(len(self.rss_cache.fetch_feed(url).items), 5)
+
+    def test_broken_pool_fails_the_remaining_feeds(self):
+        class BrokenPool:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                pass
+
+            def submit(self, *args):
+                raise BrokenProcessPool('a worker was killed')
+
+        sources = self.paths + [self.server.url('/missing.xml')]
+        outcome = []
+        with mock.patch('rss_reader_pckg.rss.pipeline.ProcessPoolExecutor', BrokenPool):
+            run = threading.Thread(target=lambda: outcome.append(IngestPipeline(self.rss_cache).run(sources)),
+                                   daemon=True)
+            run.start()
+            run.join(10)
+        self.assertFalse(run.is_alive())
+        results, stats = outcome[0]
+        self.assertEqual((stats.feeds, stats.failed), (0, 4))
+        self.assertTrue(all('a worker was killed' in result.error for result in results[:3]))
+
+    def test_parser_merges_ingested_feeds(self):
+        rss_parser = RSSParser(self.rss_cache)
+        rss_parser.ingest_sources(self.paths, '2', parse_workers=2)
+        self.assertEqual(rss_parser.feed_title, 'News fetched from 3 feeds.')
+        self.assertEqual(len(rss_parser.parsed_items), 6)
+        with self.assertRaises(RSSException):
+            RSSParser(self.rss_cache).ingest_sources([self.server.url('/missing.xml')], parse_workers=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from rss_reader_pckg.rss.lxml_extractor import extract_item
+from rss_reader_pckg.rss.rss_parser import RSSParser
+from rss_reader_pckg.rss.sanitize import ItemContent
+
+IMAGE = 'https://content.onliner.by/news/1.jpeg'
+ITEM = f'''<item xmlns:media="http://search.yahoo.com/mrss/">
+    <title>Title</title>
+    <link>https://auto.onliner.by/news?id=1&amp;page=2</link>
+    <pubDate>Sun, 26 Jun 2022 12:37:46 +0300</pubDate>
+    <description><![CDATA[<p><a href="https://auto.onliner.by/a?x=1&amp;y=2"><img src="{IMAGE}" /></a></p>
+<p>Fish &amp; chips&nbsp;&mdash; see https://auto.onliner.by/b and https://auto.onliner.by/b</p>]]></description>
+    <media:thumbnail url="{IMAGE}"/>
+</item>'''
+
+
+class TestItemContent(unittest.TestCase):
+    def test_description_tokens(self):
+        content = ItemContent()
+        description = content.add_description('<p>A &lt;b&gt; &amp; <a href="https://a.by/?q=1&amp;r=2">link</a>'
+                                              ' https://b.by</p>')
+        self.assertEqual(description, 'A <b> & link https://b.by')
+        self.assertEqual(content.media, ['https://a.by/?q=1&r=2', 'https://b.by'])
+
+    def test_images_are_excluded_from_media(self):
+        content = ItemContent()
+        content.add_text(f'{IMAGE} https://a.by {IMAGE} https://a.by')
+        content.add_image(IMAGE)
+        content.add_image(IMAGE)
+        self.assertEqual(content.images, [IMAGE])
+        self.assertEqual(content.media, ['https://a.by'])
+
+
+class TestEngines(unittest.TestCase):
+    def test_engines_sanitize_alike(self):
+        soup_item = BeautifulSoup(ITEM, features='xml').find('item')
+        parsed = RSSParser.__new__(RSSParser)._parse_item(soup_item)
+        extracted = extract_item(etree.fromstring(ITEM))
+        self.assertEqual(parsed, extracted)
+        self.assertEqual(extracted.description_text.splitlines()[1],
+                         'Fish & chips\xa0— see https://auto.onliner.by/b and https://auto.onliner.by/b')
+        self.assertEqual(extracted.image_urls, (IMAGE,))
+        self.assertEqual(sorted(extracted.media_urls),
+                         ['https://auto.onliner.by/a?x=1&y=2',
+                          'https://auto.onliner.by/b', 'https://auto.onliner.by/news?id=1&page=2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
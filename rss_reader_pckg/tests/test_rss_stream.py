@@ -0,0 +1,79 @@
+import logging
+import os
+import tempfile
+import unittest
+
+from bs4 import BeautifulSoup
+
+from rss_reader_pckg.rss.rss_cache import CacheReader
+from rss_reader_pckg.rss.rss_parser import RSSParser
+from rss_reader_pckg.rss.stream_parser import StreamParser
+from rss_reader_pckg.tests.local_server import LocalFeedServer
+
+with open(f'{os.path.dirname(os.path.abspath(__file__))}/test_rss.xml', 'rb') as test_file:
+    TEST_RSS = test_file.read()
+
+
+def chunked(content: bytes, size: int = 256):
+    for start in range(0, len(content), size):
+        yield content[start:start + size]
+
+
+class TestStreamParser(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.rss_parser = RSSParser(CacheReader(cache_dir=self.cache_dir.name), stream=True)
+        self.rss_parser.rss_cache.download_images = lambda items: None
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_items_are_released(self):
+        stream_parser = StreamParser()
+        titles = []
+        for element in stream_parser.iter_items(chunked(TEST_RSS)):
+            titles.append(element.findtext('title').strip())
+            self.assertIs(stream_parser.root.find('.//item'), element)
+        self.assertEqual(len(titles), 5)
+        self.assertEqual(stream_parser.title, 'Авто Onlíner')
+
+    def test_channel_schedule(self):
+        rss = TEST_RSS.replace(b'<generator>', b'<ttl>60</ttl><skipHours><hour>1</hour><hour>2</hour></skipHours>'
+                                               b'<generator>', 1)
+        stream_parser = StreamParser()
+        self.assertEqual(len(list(stream_parser.iter_items(chunked(rss)))), 5)
+        self.assertEqual(stream_parser.ttl, 60)
+        self.assertEqual(stream_parser.skip_hours, {1, 2})
+
+    def test_same_items_as_soup(self):
+        self.rss_parser.parse_stream(chunked(TEST_RSS))
+        soup_parser = RSSParser.__new__(RSSParser)
+        soup_parser.soup = BeautifulSoup(TEST_RSS, features='xml')
+        expected = [soup_parser._parse_item(item) for item in soup_parser.items()]
+        self.assertEqual(self.rss_parser.feed_title, 'Авто Onlíner')
+        self.assertEqual([item.value for item in self.rss_parser.parsed_items], [item.value for item in expected])
+
+    def test_limit_stops_reading(self):
+        chunks = list(chunked(TEST_RSS))
+        read = []
+
+        def tracked_chunks():
+            for chunk in chunks:
+                read.append(chunk)
+                yield chunk
+
+        self.rss_parser.parse_stream(tracked_chunks(), '1')
+        self.assertEqual(len(self.rss_parser.parsed_items), 1)
+        self.assertLess(len(read), len(chunks) // 2)
+
+    def test_stream_from_server(self):
+        with LocalFeedServer({'/feed.xml': TEST_RSS}) as server:
+            feed = self.rss_parser.parse_source(server.url('/feed.xml'), '2')
+        self.assertIsNone(self.rss_parser.soup)
+        self.assertEqual(len(feed.items), 2)
+        self.assertEqual(len(self.rss_parser.rss_cache.fetch_feed(server.url('/feed.xml')).items), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
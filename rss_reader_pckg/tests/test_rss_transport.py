@@ -0,0 +1,90 @@
+import gzip
+import logging
+import unittest
+from typing import Optional
+
+import requests
+
+from rss_reader_pckg.rss.fetcher import FeedFetcher
+from rss_reader_pckg.rss.transport import ResponseTooLarge, Transport, parse_retry_after
+from rss_reader_pckg.tests.local_server import LocalFeedServer
+
+
+def failing_route(statuses: list[int], headers: Optional[dict] = None):
+    def route(handler):
+        if statuses:
+            return statuses.pop(0), headers or {}, b''
+        return 200, {}, b'body'
+    return route
+
+
+class TestTransport(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.ERROR)
+        self.delays = []
+        self.server = LocalFeedServer({}).__enter__()
+        self.transport = Transport(backoff=1, max_delay=10, sleep=self.delays.append)
+
+    def tearDown(self):
+        self.server.__exit__(None, None, None)
+
+    def test_server_errors_are_retried_with_jitter(self):
+        self.server.routes['/feed.xml'] = failing_route([503, 500, 502])
+        response = self.transport.get(self.server.url('/feed.xml'))
+        self.assertEqual((response.status_code, response.content), (200, b'body'))
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertEqual(len(self.delays), 3)
+        for attempt, delay in enumerate(self.delays):
+            self.assertTrue(0 <= delay <= 2 ** attempt)
+
+    def test_retries_are_limited(self):
+        self.server.routes['/feed.xml'] = failing_route([503] * 10)
+        self.assertEqual(self.transport.get(self.server.url('/feed.xml')).status_code, 503)
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_retry_after_is_respected(self):
+        self.server.routes['/feed.xml'] = failing_route([429], {'Retry-After': '7'})
+        self.assertEqual(self.transport.get(self.server.url('/feed.xml')).status_code, 200)
+        self.assertEqual(self.delays, [7.0])
+        self.server.routes['/slow.xml'] = failing_route([429], {'Retry-After': '3600'})
+        self.assertEqual(self.transport.get(self.server.url('/slow.xml')).status_code, 429)
+        self.assertEqual(self.delays, [7.0])
+
+    def test_client_errors_are_not_retried(self):
+        self.assertEqual(self.transport.get(self.server.url('/missing.xml')).status_code, 404)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('120'), 120.0)
+        self.assertEqual(parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+        self.assertIsNone(parse_retry_after('soon'))
+
+    def test_compressed_responses(self):
+        body = b'<rss>' + b'x' * 10000 + b'</rss>'
+        self.server.routes['/feed.xml'] = lambda handler: (200, {'Content-Encoding': 'gzip'}, gzip.compress(body))
+        self.assertEqual(self.transport.get(self.server.url('/feed.xml')).content, body)
+        self.assertIn('gzip', self.server.requests[0][1]['Accept-Encoding'])
+
+    def test_size_limit(self):
+        self.server.routes['/large.xml'] = b'x' * 2048
+        self.server.routes['/bomb.xml'] = lambda handler: (200, {'Content-Encoding': 'gzip'},
+                                                           gzip.compress(b'x' * 100000))
+        transport = Transport(max_bytes=1024)
+        with self.assertRaises(ResponseTooLarge):
+            transport.get(self.server.url('/large.xml'))
+        with self.assertRaises(ResponseTooLarge):
+            transport.get(self.server.url('/bomb.xml'))
+        streamed = FeedFetcher(transport=transport).fetch(self.server.url('/bomb.xml'), stream=True)
+        with self.assertRaises(ResponseTooLarge):
+            list(streamed.chunks())
+
+    def test_read_timeout(self):
+        with LocalFeedServer({'/feed.xml': b'body'}, delay=0.5) as server:
+            with self.assertRaises(requests.Timeout):
+                Transport(read_timeout=0.1).get(server.url('/feed.xml'))
+            result = FeedFetcher(transport=Transport(read_timeout=0.1)).safe_fetch(server.url('/feed.xml'))
+            self.assertIsInstance(result.error, requests.Timeout)
+
+
+if __name__ == '__main__':
+    unittest.main()
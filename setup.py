@@ -5,16 +5,18 @@ setup(
     version='1.3',
     url='https://github.com/rubenispiryan/Homework/blob/final_task/',
     author='Ruben Ispiryan',
-    packages=['rss_reader_pckg', 'rss_reader_pckg.rss', 'rss_reader_pckg.tests'],
+    packages=['rss_reader_pckg', 'rss_reader_pckg.rss', 'rss_reader_pckg.tests', 'rss_reader_pckg.benchmarks'],
     install_requires=[
         'requests',
         'beautifulsoup4',
         'lxml',
         'python-dateutil',
         'xhtml2pdf',
+        'pypdf',
         'airium',
 
     ],
+    extras_require={'brotli': ['brotli']},
     entry_points={'console_scripts': ['rss_reader=rss_reader_pckg.rss_reader:main']},
     classifiers=[
         "Programming Language :: Python :: 3",